@@ -0,0 +1,56 @@
+"""Add reply thread and refresh token lookup indexes
+
+Revision ID: 81017f0808eb
+Revises: 8edff1b6fc30
+Create Date: 2026-10-18 10:02:17.540193
+
+"""
+import hashlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '81017f0808eb'
+down_revision: Union[str, None] = '8edff1b6fc30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_replies_ticket_id_created_at', 'replies', ['ticket_id', 'created_at'], unique=False)
+
+    op.add_column('tokens', sa.Column('token_hash', sa.String(length=64), nullable=True))
+    tokens = sa.table(
+        'tokens',
+        sa.column('id', sa.Integer),
+        sa.column('refresh_token', sa.String),
+        sa.column('token_hash', sa.String),
+    )
+    connection = op.get_bind()
+    seen = set()
+    for token_id, refresh_token in connection.execute(
+        sa.select(tokens.c.id, tokens.c.refresh_token)
+    ).all():
+        token_hash = hashlib.sha256(refresh_token.encode()).hexdigest()
+        if token_hash in seen:
+            # Tokens issued in the same second used to be byte-identical; the
+            # duplicates are indistinguishable, so keep only the first row.
+            connection.execute(tokens.delete().where(tokens.c.id == token_id))
+            continue
+        seen.add(token_hash)
+        connection.execute(
+            tokens.update()
+            .where(tokens.c.id == token_id)
+            .values(token_hash=token_hash)
+        )
+    op.alter_column('tokens', 'token_hash', existing_type=sa.String(length=64), nullable=False)
+    op.create_index(op.f('ix_tokens_token_hash'), 'tokens', ['token_hash'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_tokens_token_hash'), table_name='tokens')
+    op.drop_column('tokens', 'token_hash')
+    op.drop_index('ix_replies_ticket_id_created_at', table_name='replies')
@@ -0,0 +1,53 @@
+"""Add ticket version and updated_at for conditional GETs
+
+Revision ID: 906adadc4710
+Revises: 9cc407bd75f8
+Create Date: 2026-10-18 15:47:32.904117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '906adadc4710'
+down_revision: Union[str, None] = '9cc407bd75f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tickets', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('tickets', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    # Last activity so far: the newest reply, or the ticket itself.
+    tickets = sa.table(
+        'tickets',
+        sa.column('id', sa.Integer),
+        sa.column('created_date', sa.DateTime),
+        sa.column('updated_at', sa.DateTime),
+    )
+    replies = sa.table(
+        'replies',
+        sa.column('ticket_id', sa.Integer),
+        sa.column('created_at', sa.DateTime),
+    )
+    newest_reply = (
+        sa.select(sa.func.max(replies.c.created_at))
+        .where(replies.c.ticket_id == tickets.c.id)
+        .scalar_subquery()
+    )
+    op.execute(
+        tickets.update().values(
+            updated_at=sa.func.coalesce(
+                newest_reply, tickets.c.created_date, sa.func.now()
+            )
+        )
+    )
+    op.alter_column('tickets', 'updated_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    op.drop_column('tickets', 'updated_at')
+    op.drop_column('tickets', 'version')
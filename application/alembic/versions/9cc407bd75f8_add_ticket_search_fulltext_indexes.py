@@ -0,0 +1,40 @@
+"""Add FULLTEXT indexes for ticket search
+
+Revision ID: 9cc407bd75f8
+Revises: 81017f0808eb
+Create Date: 2026-10-18 14:21:06.318452
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9cc407bd75f8'
+down_revision: Union[str, None] = '81017f0808eb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# MATCH() needs an index over exactly its column list, hence the separate
+# title index used for the title boost.
+FULLTEXT_INDEXES = [
+    ('ft_tickets_title_description', 'tickets', ['title', 'description']),
+    ('ft_tickets_title', 'tickets', ['title']),
+    ('ft_replies_content', 'replies', ['content']),
+]
+
+
+def upgrade() -> None:
+    # Other databases search through the in-process index instead.
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    for name, table, columns in FULLTEXT_INDEXES:
+        op.create_index(name, table, columns, unique=False, mysql_prefix='FULLTEXT')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    for name, table, _ in reversed(FULLTEXT_INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,98 @@
+"""Add denormalized ticket activity summary columns
+
+Revision ID: a691837260fd
+Revises: 906adadc4710
+Create Date: 2026-10-18 20:58:11.402377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a691837260fd'
+down_revision: Union[str, None] = '906adadc4710'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tickets', sa.Column('reply_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('tickets', sa.Column('last_reply_at', sa.DateTime(), nullable=True))
+    op.add_column('tickets', sa.Column('last_reply_by_id', sa.Integer(), nullable=True))
+    op.add_column('tickets', sa.Column('last_activity_at', sa.DateTime(), nullable=True))
+    op.create_foreign_key('fk_tickets_last_reply_by_id', 'tickets', 'accounts', ['last_reply_by_id'], ['id'])
+
+    # Backfill from replies; python -m commands.repair_ticket_activity
+    # recomputes the same values later if anything drifts.
+    tickets = sa.table(
+        'tickets',
+        sa.column('id', sa.Integer),
+        sa.column('created_date', sa.DateTime),
+        sa.column('reply_count', sa.Integer),
+        sa.column('last_reply_at', sa.DateTime),
+        sa.column('last_reply_by_id', sa.Integer),
+        sa.column('last_activity_at', sa.DateTime),
+    )
+    replies = sa.table(
+        'replies',
+        sa.column('id', sa.Integer),
+        sa.column('ticket_id', sa.Integer),
+        sa.column('created_by_id', sa.Integer),
+        sa.column('created_at', sa.DateTime),
+    )
+
+    def newest_reply(column):
+        return (
+            sa.select(column)
+            .where(replies.c.ticket_id == tickets.c.id)
+            .order_by(replies.c.created_at.desc(), replies.c.id.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+
+    reply_count = (
+        sa.select(sa.func.count(replies.c.id))
+        .where(replies.c.ticket_id == tickets.c.id)
+        .scalar_subquery()
+    )
+    op.execute(
+        tickets.update().values(
+            reply_count=reply_count,
+            last_reply_at=newest_reply(replies.c.created_at),
+            last_reply_by_id=newest_reply(replies.c.created_by_id),
+        )
+    )
+    op.execute(
+        tickets.update().values(
+            last_activity_at=sa.func.coalesce(
+                tickets.c.last_reply_at, tickets.c.created_date, sa.func.now()
+            )
+        )
+    )
+    op.alter_column('tickets', 'last_activity_at', existing_type=sa.DateTime(), nullable=False)
+
+    # The /tickets/ ETag follows max(updated_at); whole seconds would let
+    # two changes within one second share an ETag.
+    if op.get_bind().dialect.name == 'mysql':
+        op.alter_column('tickets', 'updated_at', existing_type=sa.DateTime(), type_=mysql.DATETIME(fsp=6), existing_nullable=False)
+
+    op.create_index('ix_tickets_last_activity_at_id', 'tickets', ['last_activity_at', 'id'], unique=False)
+    op.create_index('ix_tickets_created_by_id_last_activity_at_id', 'tickets', ['created_by_id', 'last_activity_at', 'id'], unique=False)
+    op.create_index('ix_tickets_updated_at', 'tickets', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tickets_updated_at', table_name='tickets')
+    op.drop_index('ix_tickets_created_by_id_last_activity_at_id', table_name='tickets')
+    op.drop_index('ix_tickets_last_activity_at_id', table_name='tickets')
+    if op.get_bind().dialect.name == 'mysql':
+        op.alter_column('tickets', 'updated_at', existing_type=mysql.DATETIME(fsp=6), type_=sa.DateTime(), existing_nullable=False)
+    op.drop_constraint('fk_tickets_last_reply_by_id', 'tickets', type_='foreignkey')
+    op.drop_column('tickets', 'last_activity_at')
+    op.drop_column('tickets', 'last_reply_by_id')
+    op.drop_column('tickets', 'last_reply_at')
+    op.drop_column('tickets', 'reply_count')
@@ -1,12 +1,27 @@
+import datetime
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Request
 from fastapi import Depends, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
 from core.auth_bearer import JWTBearer
+from core.events import STAFF_INBOX, event_broker, sse_stream
+from core.export import csv_chunks, ndjson_chunks
+from core.json_stream import iter_json_records
+from core.responses import sse_response
+from core.settings import settings
+from core.slow_query import slow_query_log
 from dependencies.account_service import get_account_service
+from dependencies.session import get_session_factory
+from repositories.ticket_repository import TicketRepository
 from schemas import account_schema
-from schemas.ticket_schema import TicketSchema
+from schemas.ticket_schema import (
+    ExportFormat,
+    TicketImportReportSchema,
+    TicketSchema,
+)
 from services.account_services import AccountService
 
 router = APIRouter()
@@ -36,6 +51,121 @@ async def login(
     return {"accessToken": access_token, "refreshToken": _refresh_token}
 
 
+@router.get("/slowQueries", status_code=status.HTTP_200_OK)
+async def get_slow_queries(
+    limit: int = 20,
+    account_id=Depends(JWTBearer()),
+    account_service: AccountService = Depends(get_account_service),
+):
+    if not await account_service.is_staff(account_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only staff can view slow queries",
+        )
+    # At least one, and no more than the log keeps.
+    limit = min(max(1, limit), settings.SLOW_QUERY_MAX_FINGERPRINTS)
+    return {
+        "thresholdMs": settings.SLOW_QUERY_THRESHOLD_MS,
+        "data": slow_query_log.top(limit),
+    }
+
+
+@router.get("/events")
+async def stream_inbox_events(
+    request: Request,
+    last_event_id: Optional[str] = Header(default=None),
+    account_id=Depends(JWTBearer()),
+    account_service: AccountService = Depends(get_account_service),
+):
+    """Server-Sent Events for the staff inbox: ``ticket.created`` plus every
+    ticket's reply events, as sent by /api/ticket/{ticket_id}/events."""
+    if not await account_service.is_staff(account_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only staff can follow the inbox",
+        )
+    return sse_response(
+        sse_stream(event_broker, STAFF_INBOX, last_event_id, request.is_disconnected)
+    )
+
+
+@router.get("/tickets/export")
+async def export_tickets(
+    format: ExportFormat = ExportFormat.NDJSON,
+    includeReplies: bool = False,
+    createdFrom: Optional[datetime.datetime] = None,
+    createdTo: Optional[datetime.datetime] = None,
+    author: Optional[str] = None,
+    account_id=Depends(JWTBearer()),
+    account_service: AccountService = Depends(get_account_service),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+):
+    """Stream every ticket matching the filters, oldest first.
+
+    ``createdFrom`` is inclusive and ``createdTo`` exclusive; ``author`` is
+    a username.
+    """
+    if not await account_service.is_staff(account_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only staff can export tickets",
+        )
+
+    async def batches():
+        # The request's own session is closed before the body is sent.
+        async with session_factory() as session:
+            async for batch in TicketRepository(session).export_tickets(
+                created_from=createdFrom,
+                created_to=createdTo,
+                author=author,
+                include_replies=includeReplies,
+                batch_size=settings.EXPORT_BATCH_SIZE,
+            ):
+                yield batch
+
+    if format == ExportFormat.CSV:
+        body, media_type = csv_chunks(batches(), includeReplies), "text/csv"
+    else:
+        body, media_type = ndjson_chunks(batches()), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="tickets.{format.value}"'
+        },
+    )
+
+
+@router.post("/tickets/import", response_model=TicketImportReportSchema)
+async def import_tickets(
+    request: Request,
+    batchSize: Optional[int] = None,
+    account_id=Depends(JWTBearer()),
+    account_service: AccountService = Depends(get_account_service),
+):
+    """Bulk insert tickets from a JSON array or NDJSON request body.
+
+    Each record is ``{"title", "description", "createdBy", "createdDate"?}``
+    where ``createdBy`` is an existing username. The body is read and
+    validated as it arrives; send ``Content-Type: application/x-ndjson``
+    for NDJSON.
+    """
+    if not await account_service.is_staff(account_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only staff can import tickets",
+        )
+    content_type = request.headers.get("content-type", "")
+    records = iter_json_records(
+        request.stream(),
+        ndjson="ndjson" in content_type or "jsonl" in content_type,
+        max_record_bytes=settings.IMPORT_MAX_RECORD_BYTES,
+    )
+    return await account_service.import_tickets(
+        records, max(1, batchSize or settings.IMPORT_BATCH_SIZE)
+    )
+
+
 # @router.get("/getAllTickets", status_code=status.HTTP_200_OK)
 # async def get_all_tickets(
 #     page: Optional[int] = 0,
@@ -1,14 +1,34 @@
-from typing import List, Optional
+from typing import List, Optional, Union
 
-from fastapi import APIRouter, HTTPException
-from fastapi import Depends, status
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi import Depends, Query, status
 
 from core.auth_bearer import JWTBearer
+from core.conditional import (
+    is_conditional,
+    is_not_modified,
+    make_etag,
+    not_modified,
+    set_validators,
+)
 from core.errors_handler import ErrorMessage
+from core.events import event_broker, sse_stream, ticket_channel
+from core.pagination import decode_cursor
+from core.responses import json_response, sse_response
+from core.settings import settings
 from dependencies.account_service import get_account_service
 from schemas import ticket_schema
-from schemas.reply_schema import ReplySchema, ReplyCreateSchema
-from schemas.ticket_schema import TicketCreateSchema, TicketSchema
+from schemas.reply_schema import ReplyCreateSchema, ReplyPageSchema, ReplySchema
+from schemas.ticket_schema import (
+    TicketBatchRequestSchema,
+    TicketBatchSchema,
+    TicketCreateSchema,
+    TicketDetailSchema,
+    TicketPageSchema,
+    TicketSearchPageSchema,
+    TicketSort,
+    TotalStrategy,
+)
 from services.account_services import AccountService
 
 router = APIRouter()
@@ -24,13 +44,62 @@ async def add_reply_to_ticket(
     return await account_service.create_reply(ticket_id, reply_data, account_id)
 
 
-@router.get("/ticket/{ticket_id}/replies/", response_model=List[ReplySchema])
+@router.get(
+    "/ticket/{ticket_id}/replies/",
+    response_model=Union[List[ReplySchema], ReplyPageSchema],
+)
 async def get_replies(
     ticket_id: int,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
     account_id=Depends(JWTBearer()),
     account_service: AccountService = Depends(get_account_service),
 ):
-    return await account_service.get_replies_for_ticket(ticket_id)
+    # Without `limit` or `cursor` this is the original endpoint: every reply,
+    # oldest first, as a list. With either, one ReplyPageSchema page, newest
+    # first, `limit` (default REPLY_PAGE_SIZE, capped at REPLY_PAGE_MAX) per
+    # page; `cursor` is the previous page's `nextCursor`.
+    await account_service.check_ticket_access(ticket_id, account_id)
+    if limit is None and cursor is None:
+        replies = await account_service.get_all_replies_for_ticket(ticket_id)
+        return json_response(replies)
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ErrorMessage.INVALID_CURSOR.value,
+        )
+    limit = min(max(1, limit or settings.REPLY_PAGE_SIZE), settings.REPLY_PAGE_MAX)
+    replies = await account_service.get_replies_for_ticket(ticket_id, limit, after)
+    # Already projected to ReplyPageSchema's shape; skip re-validating it.
+    return json_response(replies)
+
+
+@router.get("/ticket/{ticket_id}/events")
+async def stream_ticket_events(
+    ticket_id: int,
+    request: Request,
+    last_event_id: Optional[str] = Header(default=None),
+    account_id=Depends(JWTBearer()),
+    account_service: AccountService = Depends(get_account_service),
+):
+    """Server-Sent Events for the ticket's new, edited and deleted replies.
+
+    Replaces polling /ticket/{ticket_id}/replies/. Events are
+    ``reply.created``/``reply.updated`` (a reply) and ``reply.deleted``
+    (``replyId``, ``ticketId``); ``reset`` means events were missed and
+    the replies should be refetched.
+    """
+    await account_service.check_ticket_access(ticket_id, account_id)
+    return sse_response(
+        sse_stream(
+            event_broker,
+            ticket_channel(ticket_id),
+            last_event_id,
+            request.is_disconnected,
+        )
+    )
 
 
 @router.put("/ticket/replies/{reply_id}", response_model=ReplySchema)
@@ -84,20 +153,119 @@ async def create_ticket(
     return await account_service.create_ticket(account_id, ticket_data)
 
 
-@router.get("/tickets/")
+@router.get("/tickets/", response_model=TicketPageSchema)
 async def get_tickets(
+    request: Request,
     page: Optional[int] = 0,
     pageSize: Optional[int] = 10,
+    cursor: Optional[str] = None,
+    total: Optional[TotalStrategy] = None,
+    sort: TicketSort = TicketSort.CREATED,
     account_id=Depends(JWTBearer()),
     account_service: AccountService = Depends(get_account_service),
 ):
-    return await account_service.get_tickets(account_id, page, pageSize)
+    # pageSize is clamped to 1..TICKET_PAGE_MAX and page to 0 and up.
+    # `cursor` (the `nextCursor` of the previous page) takes precedence over
+    # the legacy page/pageSize offset; it belongs to the `sort` it came from.
+    # `sort=activity` puts the most recently replied-to tickets first.
+    # `total=none` drops the count and leaves `hasMore` as the only
+    # end-of-list signal. The ETag follows the newest ticket id and the
+    # latest ticket change, so If-None-Match costs two index lookups when
+    # nothing changed.
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ErrorMessage.INVALID_CURSOR.value,
+        )
+    newest_id, updated_at = await account_service.get_tickets_version(account_id)
+    etag = make_etag(
+        "tickets",
+        account_id,
+        newest_id,
+        updated_at.isoformat() if updated_at else None,
+        request.url.query,
+    )
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    total_strategy = total or TotalStrategy(settings.TICKET_TOTAL_STRATEGY)
+    page_size = min(max(1, pageSize), settings.TICKET_PAGE_MAX)
+    tickets_page = await account_service.get_tickets(
+        account_id, max(0, page), page_size, after, total_strategy, sort
+    )
+    # Already projected to TicketPageSchema's shape; skip re-validating it.
+    response = json_response(tickets_page)
+    set_validators(response, etag)
+    return response
 
 
-@router.get("/ticket/{ticket_id}", response_model=TicketSchema)
+@router.get("/tickets/search", response_model=TicketSearchPageSchema)
+async def search_tickets(
+    q: str = Query(min_length=1, max_length=200),
+    page: Optional[int] = 0,
+    pageSize: Optional[int] = 10,
+    account_id=Depends(JWTBearer()),
+    account_service: AccountService = Depends(get_account_service),
+):
+    # Matches title, description and reply text; any query word matches and
+    # results come best match first. pageSize is capped at SEARCH_PAGE_MAX.
+    page_size = min(max(1, pageSize), settings.SEARCH_PAGE_MAX)
+    results = await account_service.search_tickets(
+        account_id, q, max(0, page), page_size
+    )
+    return json_response(results)
+
+
+@router.get("/ticket/{ticket_id}", response_model=TicketDetailSchema)
 async def get_ticket_details(
     ticket_id: int,
+    request: Request,
+    repliesLimit: Optional[int] = None,
+    account_id=Depends(JWTBearer()),
+    account_service: AccountService = Depends(get_account_service),
+):
+    # repliesLimit returns only the newest replies plus `repliesNextCursor`
+    # for paging through the rest with /ticket/{ticket_id}/replies/.
+    if repliesLimit is not None:
+        repliesLimit = min(max(1, repliesLimit), settings.REPLY_PAGE_MAX)
+
+    # Revalidation only reads the ticket's version; unconditional reads take
+    # it from the (possibly cached) thread instead.
+    min_version = 0
+    if is_conditional(request):
+        current = await account_service.get_ticket_version(ticket_id, account_id)
+        etag = make_etag("ticket", ticket_id, current["version"], repliesLimit)
+        if is_not_modified(request, etag, current["updatedAt"]):
+            return not_modified(etag, current["updatedAt"])
+        min_version = current["version"]
+
+    ticket, version = await account_service.get_ticket_details(
+        ticket_id, account_id, repliesLimit, min_version
+    )
+    # The cached thread is already in TicketDetailSchema's shape; skip
+    # re-validating it. response_model only documents the route.
+    response = json_response(ticket)
+    set_validators(
+        response,
+        make_etag("ticket", ticket_id, version["version"], repliesLimit),
+        version["updatedAt"],
+    )
+    return response
+
+
+@router.post("/tickets/batch", response_model=TicketBatchSchema)
+async def get_ticket_details_batch(
+    request: TicketBatchRequestSchema,
     account_id=Depends(JWTBearer()),
     account_service: AccountService = Depends(get_account_service),
 ):
-    return await account_service.get_ticket_details(ticket_id, account_id)
+    """Several tickets with their replies, keyed by id.
+
+    Ids the caller may not see, or that do not exist, are reported under
+    ``errors`` instead of failing the whole request.
+    """
+    tickets = await account_service.get_ticket_details_batch(
+        request.ticketIds, account_id
+    )
+    return json_response(tickets)
@@ -0,0 +1,157 @@
+"""Bytes saved vs CPU spent by response compression.
+
+Compresses typical response bodies with every coding this process can
+produce (gzip always; br and zstd when brotli/zstandard are installed) at
+a few levels, the way core.compression.CompressionMiddleware does:
+
+* ``ticket_page``: one /tickets/ page of projected tickets
+* ``ticket_thread``: /ticket/{id} with a long reply thread
+* ``export_csv``: a staff CSV export, streamed in EXPORT_BATCH_SIZE chunks
+  that are each flushed
+
+Run from the application directory:
+
+    python -m benchmark.compression --page-size 100 --replies 200 --rows 10000
+"""
+import argparse
+import datetime
+import json
+import sys
+import time
+from types import SimpleNamespace
+
+import orjson
+
+from core.compression import (
+    BrotliEncoder,
+    GzipEncoder,
+    ZstdEncoder,
+    brotli,
+    zstandard,
+)
+from core.date_utils import DateUtils
+from repositories.ticket_repository import project_reply, project_ticket
+
+LEVELS = {
+    "gzip": (GzipEncoder, [1, 4, 6, 9]),
+    "br": (BrotliEncoder, [1, 4, 6]),
+    "zstd": (ZstdEncoder, [1, 3, 9]),
+}
+
+
+def ticket_rows(count: int) -> list:
+    start = datetime.datetime(2024, 1, 1)
+    return [
+        SimpleNamespace(
+            id=ticket_id,
+            title=f"Printer on floor {ticket_id % 7} is jammed again",
+            description=(
+                f"Ticket {ticket_id}: the printer shows error E{ticket_id % 40} "
+                "after the second page and needs a restart every time."
+            ),
+            user_name=f"customer_{ticket_id % 500}",
+            created_date=start + datetime.timedelta(minutes=ticket_id),
+        )
+        for ticket_id in range(count, 0, -1)
+    ]
+
+
+def payloads(args) -> dict:
+    page = {
+        "data": [project_ticket(row) for row in ticket_rows(args.page_size)],
+        "nextCursor": "WyIyMDI0LTAxLTAxVDAwOjAwOjAwIiwxXQ",
+        "hasMore": True,
+    }
+    start = datetime.datetime(2024, 1, 1)
+    replies = [
+        project_reply(
+            SimpleNamespace(
+                id=reply_id,
+                content=f"Reply {reply_id}: tried again, still failing at step "
+                f"{reply_id % 9}.",
+                user_name="support_agent" if reply_id % 2 else "customer_1",
+                created_at=start + datetime.timedelta(minutes=reply_id),
+            ),
+            1,
+        )
+        for reply_id in range(args.replies, 0, -1)
+    ]
+    thread = project_ticket(ticket_rows(1)[0], replies)
+
+    lines = ["ticketId,title,description,createdDate,createdBy"]
+    for row in ticket_rows(args.rows):
+        lines.append(
+            f'{row.id},{row.title},"{row.description}",'
+            f"{DateUtils.format_full_datetime(row.created_date)},{row.user_name}"
+        )
+    csv = ("\n".join(lines) + "\n").encode()
+    chunk = max(1, len(csv) * args.batch_size // args.rows)
+    return {
+        "ticket_page": [orjson.dumps(page)],
+        "ticket_thread": [orjson.dumps(thread)],
+        "export_csv": [csv[i : i + chunk] for i in range(0, len(csv), chunk)],
+    }
+
+
+def compress(encoder_class, level: int, chunks: list) -> int:
+    encoder = encoder_class(level)
+    if len(chunks) == 1:
+        return len(encoder.finish(chunks[0]))
+    size = sum(len(encoder.compress(chunk)) for chunk in chunks[:-1])
+    return size + len(encoder.finish(chunks[-1]))
+
+
+def measure(encoder_class, level: int, chunks: list, iterations: int) -> dict:
+    size = compress(encoder_class, level, chunks)
+    started = time.process_time()
+    for _ in range(iterations):
+        compress(encoder_class, level, chunks)
+    cpu = (time.process_time() - started) / iterations
+    raw = sum(len(chunk) for chunk in chunks)
+    return {
+        "bytes": size,
+        "saved_pct": round(100 * (1 - size / raw), 1),
+        "cpu_us": round(cpu * 1_000_000, 1),
+        "mb_per_cpu_s": round(raw / cpu / 1_000_000, 1),
+    }
+
+
+def main(args) -> dict:
+    available = {"gzip"}
+    if brotli is not None:
+        available.add("br")
+    if zstandard is not None:
+        available.add("zstd")
+    results = {}
+    for name, chunks in payloads(args).items():
+        results[name] = {"raw_bytes": sum(len(chunk) for chunk in chunks)}
+        for coding, (encoder_class, levels) in LEVELS.items():
+            if coding not in available:
+                continue
+            for level in levels:
+                iterations = max(1, args.iterations // len(chunks))
+                results[name][f"{coding}-{level}"] = measure(
+                    encoder_class, level, chunks, iterations
+                )
+    return {"config": vars(args), "results": results}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--replies", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--output", help="also write the JSON report here")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    _args = parse_args()
+    report = main(_args)
+    output = json.dumps(report, indent=2)
+    if _args.output:
+        with open(_args.output, "w") as report_file:
+            report_file.write(output)
+    sys.stdout.write(output + "\n")
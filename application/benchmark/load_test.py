@@ -0,0 +1,359 @@
+"""Load test for the ticket API.
+
+Seeds a database with accounts, tickets and replies, then drives login,
+ticket listing (shallow and deep pages, and by last activity), ticket detail
+and reply creation at a fixed concurrency and prints per-endpoint throughput
+and latency percentiles as JSON.
+
+Run from the application directory:
+
+    # in-process ASGI app on a fresh SQLite database
+    python -m benchmark.load_test --tickets 20000 --concurrency 32
+
+    # seed a database, then load a server that is running against it
+    python -m benchmark.load_test --database-url mysql+aiomysql://... --seed-only
+    python -m benchmark.load_test --base-url http://localhost:8080 --no-seed
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import math
+import sys
+import time
+from typing import Callable, Dict, List
+
+import httpx
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from core.auth import get_hashed_password
+from db.base import Base
+from db.tables.account import Account
+from db.tables.reply import Reply
+from db.tables.ticket import Ticket
+
+PASSWORD = "benchmark"
+STAFF_USER = "bench_staff"
+BATCH_SIZE = 5000
+
+
+def customer_name(index: int) -> str:
+    return f"bench_user_{index}"
+
+
+async def seed(engine, accounts: int, tickets: int, replies_per_ticket: int):
+    """Recreate the schema and bulk insert a deterministic data set.
+
+    Account 1 is staff, accounts 2..accounts+1 are customers; ticket ``i`` is
+    owned by customer ``i % accounts`` so every customer owns tickets.
+    """
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+
+    password = get_hashed_password(PASSWORD)
+    start = datetime.datetime(2024, 1, 1)
+    async with engine.begin() as connection:
+        rows = [
+            {
+                "id": 1,
+                "user_name": STAFF_USER,
+                "email": f"{STAFF_USER}@bench.local",
+                "password": password,
+                "is_admin": True,
+            }
+        ]
+        rows += [
+            {
+                "id": index + 2,
+                "user_name": customer_name(index),
+                "email": f"{customer_name(index)}@bench.local",
+                "password": password,
+                "is_admin": False,
+            }
+            for index in range(accounts)
+        ]
+        await connection.execute(insert(Account), rows)
+
+        for offset in range(0, tickets, BATCH_SIZE):
+            ticket_rows, reply_rows = [], []
+            last_id = min(offset + BATCH_SIZE, tickets)
+            for ticket_id in range(offset + 1, last_id + 1):
+                created = start + datetime.timedelta(minutes=ticket_id)
+                owner_id = (ticket_id % accounts) + 2
+                last_reply = replies_per_ticket - 1
+                last_reply_at = (
+                    created + datetime.timedelta(seconds=last_reply)
+                    if replies_per_ticket
+                    else None
+                )
+                ticket_rows.append(
+                    {
+                        "id": ticket_id,
+                        "title": f"Ticket {ticket_id}",
+                        "description": f"Benchmark ticket {ticket_id} " * 4,
+                        "created_by_id": owner_id,
+                        "created_date": created,
+                        "reply_count": replies_per_ticket,
+                        "last_reply_at": last_reply_at,
+                        "last_reply_by_id": (
+                            (owner_id if last_reply % 2 else 1)
+                            if replies_per_ticket
+                            else None
+                        ),
+                        "last_activity_at": last_reply_at or created,
+                    }
+                )
+                for reply in range(replies_per_ticket):
+                    reply_rows.append(
+                        {
+                            "content": f"Reply {reply} on ticket {ticket_id}",
+                            "ticket_id": ticket_id,
+                            "created_by_id": owner_id if reply % 2 else 1,
+                            "created_at": created
+                            + datetime.timedelta(seconds=reply),
+                        }
+                    )
+            await connection.execute(insert(Ticket), ticket_rows)
+            if reply_rows:
+                await connection.execute(insert(Reply), reply_rows)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    index = max(0, math.ceil(pct / 100 * len(samples)) - 1)
+    return samples[index]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    total = len(latencies) + errors
+    return {
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3)
+        if latencies
+        else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    make_request: Callable[[int], tuple],
+    requests: int,
+    concurrency: int,
+) -> dict:
+    """Issue ``requests`` calls from ``concurrency`` workers; return a summary."""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for index in counter:
+            method, url, kwargs = make_request(index)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            if failed:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def login(client: httpx.AsyncClient, username: str, staff: bool = False):
+    prefix = "staff" if staff else "user"
+    response = await client.post(
+        f"/api/{prefix}/login",
+        json={"usernameOrEmail": username, "password": PASSWORD},
+    )
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['accessToken']}"}
+
+
+async def run_benchmarks(client: httpx.AsyncClient, args) -> Dict[str, dict]:
+    users = min(args.concurrency, args.accounts)
+    customer_headers = [
+        await login(client, customer_name(index)) for index in range(users)
+    ]
+    staff_headers = await login(client, STAFF_USER, staff=True)
+    deep_page = max(0, args.tickets // args.page_size - 1)
+
+    def own_ticket(index: int) -> int:
+        # Customer k owns tickets k, k + accounts, k + 2 * accounts, ...
+        user = index % users
+        rounds = max(1, args.tickets // args.accounts)
+        ticket_id = user + args.accounts * (index % rounds)
+        return ticket_id or args.accounts
+
+    scenarios = {
+        "login": lambda i: (
+            "POST",
+            "/api/user/login",
+            {
+                "json": {
+                    "usernameOrEmail": customer_name(i % users),
+                    "password": PASSWORD,
+                }
+            },
+        ),
+        "list_tickets_shallow": lambda i: (
+            "GET",
+            "/api/tickets/",
+            {"headers": staff_headers, "params": {"pageSize": args.page_size}},
+        ),
+        "list_tickets_activity": lambda i: (
+            "GET",
+            "/api/tickets/",
+            {
+                "headers": staff_headers,
+                "params": {"pageSize": args.page_size, "sort": "activity"},
+            },
+        ),
+        "list_tickets_deep": lambda i: (
+            "GET",
+            "/api/tickets/",
+            {
+                "headers": staff_headers,
+                "params": {"page": deep_page, "pageSize": args.page_size},
+            },
+        ),
+        "ticket_detail": lambda i: (
+            "GET",
+            f"/api/ticket/{own_ticket(i)}",
+            {"headers": customer_headers[i % users]},
+        ),
+        "create_reply": lambda i: (
+            "POST",
+            f"/api/ticket/{own_ticket(i)}/replies/",
+            {
+                "headers": customer_headers[i % users],
+                "json": {"content": f"Benchmark reply {i}"},
+            },
+        ),
+    }
+    selected = args.scenarios or list(scenarios)
+    results = {}
+    for name in selected:
+        requests = args.login_requests if name == "login" else args.requests
+        results[name] = await run_scenario(
+            client, scenarios[name], requests, args.concurrency
+        )
+    return results
+
+
+def in_process_client(engine) -> httpx.AsyncClient:
+    from dependencies.session import get_db
+    from main import app, include_app
+
+    session_factory = async_sessionmaker(
+        bind=engine, autoflush=False, expire_on_commit=False
+    )
+
+    async def override_get_db():
+        async with session_factory() as db:
+            yield db
+
+    if not any(getattr(r, "path", "") == "/api/tickets/" for r in app.routes):
+        include_app(app)
+    app.dependency_overrides[get_db] = override_get_db
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://benchmark"
+    )
+
+
+async def main(args) -> dict:
+    engine = create_async_engine(args.database_url)
+    try:
+        if not args.no_seed:
+            started = time.perf_counter()
+            await seed(engine, args.accounts, args.tickets, args.replies)
+            seed_seconds = round(time.perf_counter() - started, 3)
+        else:
+            seed_seconds = None
+        if args.seed_only:
+            return {"seed_seconds": seed_seconds}
+
+        if args.base_url:
+            client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+        else:
+            client = in_process_client(engine)
+        async with client:
+            results = await run_benchmarks(client, args)
+    finally:
+        await engine.dispose()
+
+    return {
+        "config": {
+            "target": args.base_url or "in-process",
+            "database_url": args.database_url if not args.base_url else None,
+            "accounts": args.accounts,
+            "tickets": args.tickets,
+            "replies_per_ticket": args.replies,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "page_size": args.page_size,
+        },
+        "seed_seconds": seed_seconds,
+        "results": results,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--database-url",
+        default="sqlite+aiosqlite:///./benchmark.db",
+        help="async SQLAlchemy URL to seed (and serve, when in-process)",
+    )
+    parser.add_argument(
+        "--base-url", help="load a running server instead of the in-process app"
+    )
+    parser.add_argument("--accounts", type=int, default=100)
+    parser.add_argument("--tickets", type=int, default=10000)
+    parser.add_argument("--replies", type=int, default=3, help="replies per ticket")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="per scenario")
+    parser.add_argument("--login-requests", type=int, default=100)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument(
+        "--scenario",
+        dest="scenarios",
+        action="append",
+        choices=[
+            "login",
+            "list_tickets_shallow",
+            "list_tickets_activity",
+            "list_tickets_deep",
+            "ticket_detail",
+            "create_reply",
+        ],
+        help="run only this scenario (repeatable)",
+    )
+    parser.add_argument("--no-seed", action="store_true")
+    parser.add_argument("--seed-only", action="store_true")
+    parser.add_argument("--output", help="also write the JSON report here")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    _args = parse_args()
+    report = asyncio.run(main(_args))
+    output = json.dumps(report, indent=2)
+    if _args.output:
+        with open(_args.output, "w") as report_file:
+            report_file.write(output)
+    sys.stdout.write(output + "\n")
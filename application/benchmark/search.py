@@ -0,0 +1,108 @@
+"""In-process ticket search index at scale.
+
+Builds ``core.search.InMemorySearchIndex`` over synthetic tickets (a title,
+a description and a couple of replies each, drawn from a Zipf-like
+vocabulary) and reports build time, memory and query latency for common,
+rare and multi-word queries, across all tickets and for one owner.
+
+Run from the application directory:
+
+    python -m benchmark.search --tickets 1000000
+"""
+import argparse
+import itertools
+import json
+import random
+import resource
+import statistics
+import sys
+import time
+
+from core.search import InMemorySearchIndex
+
+WORDS = [f"w{rank}" for rank in range(20000)]
+# Zipf-ish: a few words are everywhere, most are rare.
+CUM_WEIGHTS = list(
+    itertools.accumulate(1 / (rank + 1) for rank in range(len(WORDS)))
+)
+
+
+def build_index(args, rng: random.Random) -> InMemorySearchIndex:
+    index = InMemorySearchIndex()
+    for ticket_id in range(1, args.tickets + 1):
+        words = rng.choices(
+            WORDS, cum_weights=CUM_WEIGHTS, k=6 + 30 + 20 * args.replies
+        )
+        index.add_ticket(
+            ticket_id,
+            ticket_id % args.owners,
+            " ".join(words[:6]),
+            " ".join(words[6:36]),
+        )
+        for reply in range(args.replies):
+            start = 36 + reply * 20
+            index.add_text(ticket_id, " ".join(words[start : start + 20]))
+    return index
+
+
+def time_queries(index, queries, owner_id, repeat: int) -> dict:
+    timings = []
+    for query in queries:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            index.search(query, owner_id, limit=20)
+            timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+    }
+
+
+def main(args) -> dict:
+    rng = random.Random(args.seed)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    index = build_index(args, rng)
+    build_seconds = time.perf_counter() - started
+    # ru_maxrss is in KiB on Linux; the growth is mostly the index itself.
+    rss_growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+
+    queries = {
+        "common": ["w1", "w2", "w5"],
+        "mid": ["w100", "w250", "w500"],
+        "rare": ["w15000", "w17000", "w19000"],
+        "multi_word": ["w3 w400 w9000", "w20 w2000", "w7 w70 w700 w7000"],
+    }
+    results = {}
+    for name, group in queries.items():
+        results[name] = time_queries(index, group, None, args.repeat)
+        results[f"{name}_one_owner"] = time_queries(index, group, 1, args.repeat)
+    return {
+        "config": vars(args),
+        "build_seconds": round(build_seconds, 1),
+        "memory_mb": round(rss_growth / 1024),
+        "index": index.stats(),
+        "results": results,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickets", type=int, default=1_000_000)
+    parser.add_argument("--replies", type=int, default=2)
+    parser.add_argument("--owners", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the JSON report here")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    _args = parse_args()
+    report = main(_args)
+    output = json.dumps(report, indent=2)
+    if _args.output:
+        with open(_args.output, "w") as report_file:
+            report_file.write(output)
+    sys.stdout.write(output + "\n")
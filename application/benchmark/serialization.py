@@ -0,0 +1,143 @@
+"""Serialization cost of one /tickets/ page.
+
+Times how long FastAPI takes to turn what ``TicketRepository.get_tickets``
+returns into response bytes, without any I/O:
+
+* ``untyped_json``: no response_model, ``jsonable_encoder`` + JSONResponse
+  (the old /tickets/ route)
+* ``typed_json``: ``TicketPageSchema`` response_model + JSONResponse
+* ``typed_orjson``: ``TicketPageSchema`` response_model + ORJSONResponse
+* ``projected_orjson``: rows projected straight to dicts and rendered by
+  ORJSONResponse without response_model validation (the current /tickets/)
+
+Run from the application directory:
+
+    python -m benchmark.serialization --page-size 100
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import sys
+import time
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from core.date_utils import DateUtils
+from core.pagination import encode_cursor
+from repositories.ticket_repository import project_ticket
+from schemas.ticket_schema import TicketPageSchema, TicketSchema
+
+
+def build_rows(page_size: int) -> list:
+    start = datetime.datetime(2024, 1, 1)
+    return [
+        SimpleNamespace(
+            id=ticket_id,
+            title=f"Ticket {ticket_id}",
+            description=f"Benchmark ticket {ticket_id} " * 4,
+            user_name=f"bench_user_{ticket_id % 100}",
+            created_date=start + datetime.timedelta(minutes=ticket_id),
+        )
+        for ticket_id in range(page_size, 0, -1)
+    ]
+
+
+def schema_page(rows: list) -> dict:
+    """A page shaped like the repository's old return value."""
+    return {
+        "data": [
+            TicketSchema(
+                ticketId=row.id,
+                title=row.title,
+                description=row.description,
+                createdBy=row.user_name,
+                createdDate=DateUtils.full_datetime_to_str(row.created_date),
+            )
+            for row in rows
+        ],
+        "nextCursor": encode_cursor(rows[-1].created_date, rows[-1].id),
+        "hasMore": True,
+        "total": 1_000_000,
+    }
+
+
+def projected_page(rows: list) -> dict:
+    """A page shaped like the repository's current return value."""
+    return {
+        "data": [project_ticket(row) for row in rows],
+        "nextCursor": encode_cursor(rows[-1].created_date, rows[-1].id),
+        "hasMore": True,
+        "total": 1_000_000,
+    }
+
+
+async def measure(build, render, iterations: int) -> dict:
+    """Time building the page from rows plus rendering it to bytes."""
+    body = await render(build())
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await render(build())
+    elapsed = time.perf_counter() - started
+    return {
+        "us_per_page": round(elapsed / iterations * 1_000_000, 1),
+        "bytes": len(body),
+    }
+
+
+async def main(args) -> dict:
+    rows = build_rows(args.page_size)
+    field = create_response_field(name="response", type_=TicketPageSchema)
+
+    async def untyped(page):
+        return JSONResponse(jsonable_encoder(page)).body
+
+    def typed(response_class):
+        async def render(page):
+            content = await serialize_response(field=field, response_content=page)
+            return response_class(content).body
+
+        return render
+
+    async def direct(page):
+        return ORJSONResponse(page).body
+
+    variants = {
+        "untyped_json": (schema_page, untyped),
+        "typed_json": (schema_page, typed(JSONResponse)),
+        "typed_orjson": (schema_page, typed(ORJSONResponse)),
+        "projected_orjson": (projected_page, direct),
+    }
+    results = {
+        name: await measure(lambda: build(rows), render, args.iterations)
+        for name, (build, render) in variants.items()
+    }
+    baseline = results["untyped_json"]["us_per_page"]
+    for result in results.values():
+        result["speedup"] = round(baseline / result["us_per_page"], 2)
+    return {
+        "config": {"page_size": args.page_size, "iterations": args.iterations},
+        "results": results,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--output", help="also write the JSON report here")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    _args = parse_args()
+    report = asyncio.run(main(_args))
+    output = json.dumps(report, indent=2)
+    if _args.output:
+        with open(_args.output, "w") as report_file:
+            report_file.write(output)
+    sys.stdout.write(output + "\n")
@@ -0,0 +1,53 @@
+"""Repair tickets whose activity summary drifted from their replies.
+
+reply_count, last_reply_at, last_reply_by_id and last_activity_at are kept
+up to date by the API's reply writes; rows written any other way (manual
+SQL, restores, old workers) can disagree with ``replies``. This recomputes
+them for every ticket and rewrites the ones that differ, logging each.
+Safe to run against a live database.
+
+Run from the application directory:
+
+    python -m commands.repair_ticket_activity --dry-run
+    python -m commands.repair_ticket_activity --batch-size 5000
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from core.settings import settings
+from repositories.ticket_repository import TicketRepository
+
+
+async def main(args) -> dict:
+    engine = create_async_engine(args.database_url or settings.async_database_url)
+    session_factory = async_sessionmaker(
+        bind=engine, autoflush=False, expire_on_commit=False
+    )
+    try:
+        async with session_factory() as session:
+            return await TicketRepository(session).repair_ticket_activity(
+                args.batch_size, args.dry_run
+            )
+    finally:
+        await engine.dispose()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--database-url", help="async SQLAlchemy URL (default: from settings)"
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument(
+        "--dry-run", action="store_true", help="only count drifted tickets"
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    report = asyncio.run(main(parse_args()))
+    sys.stdout.write(json.dumps(report) + "\n")
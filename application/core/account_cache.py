@@ -0,0 +1,34 @@
+from typing import NamedTuple, Optional
+
+from core.cache import TTLCache
+from core.settings import settings
+
+
+class AccountSummary(NamedTuple):
+    user_name: str
+    is_admin: bool
+
+
+# account id -> AccountSummary, shared by every request in this process.
+# Only ever filled from the accounts table. Anything that changes a user
+# name or role must call forget_account (AccountRepository.update_account
+# does); other workers see the change within ACCOUNT_CACHE_TTL.
+account_summary_cache = TTLCache(
+    maxsize=settings.ACCOUNT_CACHE_SIZE, ttl=settings.ACCOUNT_CACHE_TTL
+)
+
+
+def get_cached_account(account_id: int) -> Optional[AccountSummary]:
+    return account_summary_cache.get(account_id)
+
+
+def remember_account(
+    account_id: int, user_name: str, is_admin: bool
+) -> AccountSummary:
+    summary = AccountSummary(user_name, bool(is_admin))
+    account_summary_cache.set(account_id, summary)
+    return summary
+
+
+def forget_account(account_id: int) -> None:
+    account_summary_cache.pop(account_id)
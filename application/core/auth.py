@@ -1,9 +1,24 @@
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from passlib.context import CryptContext
 
+from core.errors_handler import ErrorMessage
+from core.settings import settings
+
 password_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# bcrypt releases the GIL while hashing, so a small thread pool is enough to
+# keep the 100-300 ms of work per call off the event loop.
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+_password_jobs = 0
+
 
 def get_hashed_password(password: str) -> str:
     return password_context.hash(password)
@@ -11,3 +26,40 @@ def get_hashed_password(password: str) -> str:
 
 def verify_password(password: str, hashed_pass: str) -> bool:
     return password_context.verify(password, hashed_pass)
+
+
+def password_pool_stats() -> dict:
+    in_flight = _password_jobs
+    return {
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "in_flight": in_flight,
+        "queued": max(0, in_flight - settings.PASSWORD_HASH_WORKERS),
+    }
+
+
+async def _run_password_job(func, *args):
+    global _password_jobs
+    max_pending = settings.PASSWORD_HASH_MAX_PENDING
+    if max_pending and _password_jobs >= max_pending:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=ErrorMessage.PASSWORD_QUEUE_FULL.value,
+        )
+    _password_jobs += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(password_executor, func, *args)
+    finally:
+        _password_jobs -= 1
+
+
+async def hash_password(password: str) -> str:
+    return await _run_password_job(get_hashed_password, password)
+
+
+async def check_password(password: str, hashed_pass: str) -> bool:
+    return await _run_password_job(verify_password, password, hashed_pass)
+
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
@@ -1,18 +1,34 @@
+import time
+
 import jwt
 from fastapi import Request, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jwt.exceptions import InvalidTokenError
 
+from core.auth import hash_token
+from core.cache import TTLCache
 from core.settings import settings
 
+# Verified claims keyed by token digest, each kept until the token's own exp.
+jwt_cache = TTLCache(
+    maxsize=settings.JWT_CACHE_SIZE, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
+
 
 def decode_jwt(jwt_token: str):
+    cache_key = hash_token(jwt_token)
+    payload = jwt_cache.get(cache_key)
+    if payload is not None:
+        return payload
     try:
         # Decode and verify the token
         payload = jwt.decode(jwt_token, settings.JWT_SECRET_KEY, settings.ALGORITHM)
-        return payload
     except InvalidTokenError:
         return None
+    ttl = payload.get("exp", 0) - time.time()
+    if ttl > 0:
+        jwt_cache.set(cache_key, payload, ttl=ttl)
+    return payload
 
 
 class JWTBearer(HTTPBearer):
@@ -28,11 +44,12 @@ class JWTBearer(HTTPBearer):
                 raise HTTPException(
                     status_code=403, detail="Invalid authentication scheme."
                 )
-            if not self.verify_jwt(credentials.credentials):
+            payload = decode_jwt(credentials.credentials)
+            if not payload:
                 raise HTTPException(
                     status_code=401, detail="Invalid token or expired token."
                 )
-            account = int(decode_jwt(credentials.credentials).get("sub"))
+            account = int(payload.get("sub"))
             return account
         else:
             raise HTTPException(status_code=403, detail="Invalid authorization code.")
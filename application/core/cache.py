@@ -0,0 +1,167 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+from core.settings import settings
+
+
+class TTLCache:
+    """Bounded in-process LRU cache whose entries expire after ``ttl`` seconds.
+
+    Only ever touched from the event loop thread, so no locking is done.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def incr(self, key: Hashable, delta: int = 1) -> None:
+        """Adjust a cached number in place; missing/expired keys are left alone."""
+        entry = self._data.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._data[key] = (entry[0], entry[1] + delta)
+
+    def stats(self) -> dict:
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class CacheBackend:
+    """Shared cache for serialized (string) values, e.g. ticket threads.
+
+    Implementations must treat their own failures as misses rather than
+    raising, since every caller can fall back to the database.
+    """
+
+    async def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """The cached values for ``keys``; misses are left out."""
+        values = {}
+        for key in keys:
+            value = await self.get(key)
+            if value is not None:
+                values[key] = value
+        return values
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class InMemoryCacheBackend(CacheBackend):
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        self._cache.set(key, value, ttl=ttl)
+
+    async def delete(self, key: str) -> None:
+        self._cache.pop(key)
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+class RedisCacheBackend(CacheBackend):
+    """Backend over any client with redis-py's asyncio get/set/delete API."""
+
+    def __init__(self, client, ttl: float = 60.0, prefix: str = "tickets:"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            value = await self.client.get(self.prefix + key)
+        except Exception as err:
+            logging.warning("Cache get failed for %s: %s", key, err)
+            value = None
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value.decode() if isinstance(value, bytes) else value
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        keys = list(keys)
+        try:
+            values = await self.client.mget([self.prefix + key for key in keys])
+        except Exception as err:
+            logging.warning("Cache mget failed for %d keys: %s", len(keys), err)
+            values = [None] * len(keys)
+        found = {}
+        for key, value in zip(keys, values):
+            if value is None:
+                self.misses += 1
+                continue
+            self.hits += 1
+            found[key] = value.decode() if isinstance(value, bytes) else value
+        return found
+
+    async def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        try:
+            await self.client.set(
+                self.prefix + key, value, ex=int(self.ttl if ttl is None else ttl)
+            )
+        except Exception as err:
+            logging.warning("Cache set failed for %s: %s", key, err)
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self.client.delete(self.prefix + key)
+        except Exception as err:
+            logging.warning("Cache delete failed for %s: %s", key, err)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def create_cache_backend(maxsize: int, ttl: float) -> CacheBackend:
+    """Build the backend selected by settings.CACHE_BACKEND (memory | redis)."""
+    if settings.CACHE_BACKEND == "redis":
+        import redis.asyncio as redis
+
+        return RedisCacheBackend(redis.from_url(settings.REDIS_URL), ttl=ttl)
+    return InMemoryCacheBackend(maxsize=maxsize, ttl=ttl)
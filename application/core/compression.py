@@ -0,0 +1,225 @@
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from core.settings import settings
+
+try:
+    import brotli
+except ImportError:  # optional: br is simply not offered
+    brotli = None
+try:
+    import zstandard
+except ImportError:  # optional: zstd is simply not offered
+    zstandard = None
+
+
+class GzipEncoder:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        # A sync flush sends every chunk on at once, at a small cost in ratio.
+        return self._compressor.compress(data) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class BrotliEncoder:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+class ZstdEncoder:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(
+            zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        )
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+def available_encoders() -> Dict[str, Tuple[type, int]]:
+    """Content codings this process can produce, with their levels."""
+    encoders = {"gzip": (GzipEncoder, settings.COMPRESSION_GZIP_LEVEL)}
+    if brotli is not None:
+        encoders["br"] = (BrotliEncoder, settings.COMPRESSION_BROTLI_LEVEL)
+    if zstandard is not None:
+        encoders["zstd"] = (ZstdEncoder, settings.COMPRESSION_ZSTD_LEVEL)
+    return encoders
+
+
+def choose_encoding(accept_encoding: str, preference: Iterable[str]) -> Optional[str]:
+    """The first coding in ``preference`` the client accepts (q > 0), if any."""
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding.strip():
+            accepted[coding.strip()] = quality
+    for coding in preference:
+        if accepted.get(coding, accepted.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+class CompressionStats:
+    """Bytes before and after compression, per coding, for /metrics."""
+
+    def __init__(self):
+        self.bytes_in: Dict[str, int] = {}
+        self.bytes_out: Dict[str, int] = {}
+
+    def record(self, coding: str, bytes_in: int, bytes_out: int) -> None:
+        self.bytes_in[coding] = self.bytes_in.get(coding, 0) + bytes_in
+        self.bytes_out[coding] = self.bytes_out.get(coding, 0) + bytes_out
+
+    def samples(self, field: str) -> List[Tuple[Dict[str, str], float]]:
+        return [
+            ({"encoding": coding}, value)
+            for coding, value in sorted(getattr(self, field).items())
+        ]
+
+
+compression_stats = CompressionStats()
+
+
+class CompressionMiddleware:
+    """Compress responses with the best coding the client accepts.
+
+    Only content types in ``content_types`` (matched on the media type,
+    parameters ignored) are touched, and already-encoded responses,
+    304s and 204s pass through as is. A complete body smaller than
+    ``minimum_size`` is sent uncompressed. Streaming bodies (exports) are
+    compressed chunk by chunk, each chunk flushed, so the client still
+    receives data as it is produced and memory stays at one chunk.
+    """
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        content_types: Iterable[str] = ("application/json",),
+        preference: Iterable[str] = ("zstd", "br", "gzip"),
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = frozenset(content_types)
+        encoders = available_encoders()
+        self.encoders = {
+            coding: encoders[coding] for coding in preference if coding in encoders
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.encoders:
+            await self.app(scope, receive, send)
+            return
+        coding = choose_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), self.encoders
+        )
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingResponder(self, coding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    def __init__(self, middleware: CompressionMiddleware, coding: str, send):
+        self.middleware = middleware
+        self.coding = coding
+        self._send = send
+        self.start_message = None
+        # None until the first body message decides: True/False after.
+        self.compressing: Optional[bool] = None
+        self.encoder = None
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def _eligible(self, headers: Headers) -> bool:
+        if self.start_message["status"] in (204, 304) or "content-encoding" in headers:
+            return False
+        media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return media_type in self.middleware.content_types
+
+    async def send(self, message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk shows how big the body is.
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressing is None:
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            if more_body:
+                # Streamed: only a declared length tells the size up front.
+                size = int(headers.get("content-length", self.middleware.minimum_size))
+            else:
+                size = len(body)
+            small = size < self.middleware.minimum_size
+            self.compressing = self._eligible(headers) and not small
+            if self.compressing:
+                encoder_class, level = self.middleware.encoders[self.coding]
+                self.encoder = encoder_class(level)
+                headers["Content-Encoding"] = self.coding
+                headers.add_vary_header("Accept-Encoding")
+                # A strong ETag names one exact byte sequence.
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+                if more_body:
+                    del headers["content-length"]
+                else:
+                    body = self._encode(body, final=True)
+                    headers["Content-Length"] = str(len(body))
+                    await self._send(self.start_message)
+                    await self._send({"type": "http.response.body", "body": body})
+                    self._record()
+                    return
+            elif self._eligible(headers):
+                headers.add_vary_header("Accept-Encoding")
+            await self._send(self.start_message)
+
+        if not self.compressing:
+            await self._send(message)
+            return
+        body = self._encode(body, final=not more_body)
+        await self._send(
+            {"type": "http.response.body", "body": body, "more_body": more_body}
+        )
+        if not more_body:
+            self._record()
+
+    def _encode(self, body: bytes, final: bool) -> bytes:
+        self.bytes_in += len(body)
+        encoded = self.encoder.finish(body) if final else self.encoder.compress(body)
+        self.bytes_out += len(encoded)
+        return encoded
+
+    def _record(self) -> None:
+        compression_stats.record(self.coding, self.bytes_in, self.bytes_out)
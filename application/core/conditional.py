@@ -0,0 +1,71 @@
+import datetime
+import hashlib
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts) -> str:
+    """A strong ETag derived from whatever identifies the representation."""
+    digest = hashlib.sha1(":".join(str(part) for part in parts).encode())
+    return f'"{digest.hexdigest()[:20]}"'
+
+
+def http_date(value: datetime.datetime) -> str:
+    """Format a naive UTC datetime (as stored in the database) for HTTP."""
+    return format_datetime(value.replace(tzinfo=datetime.timezone.utc), usegmt=True)
+
+
+def is_conditional(request: Request) -> bool:
+    headers = request.headers
+    return "if-none-match" in headers or "if-modified-since" in headers
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: Optional[datetime.datetime] = None
+) -> bool:
+    """Whether a GET can be answered with 304 (RFC 9110 section 13.2.2).
+
+    If-None-Match wins when present; If-Modified-Since is only consulted
+    without it, at the one-second resolution of HTTP dates.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison: a W/ prefix added by a proxy still matches.
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            return False
+        modified = last_modified.replace(tzinfo=datetime.timezone.utc, microsecond=0)
+        return modified <= since
+    return False
+
+
+def set_validators(
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime.datetime] = None,
+) -> None:
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(last_modified)
+    # Private, per-account representations: revalidate before each reuse.
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.headers["Vary"] = "Authorization"
+
+
+def not_modified(
+    etag: str, last_modified: Optional[datetime.datetime] = None
+) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_validators(response, etag, last_modified)
+    return response
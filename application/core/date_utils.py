@@ -1,15 +1,39 @@
 import datetime
+from functools import lru_cache
+
+FULL_DATETIME_FORMAT = "%Y%m%d %H:%M:%S"
+
+
+@lru_cache(maxsize=4096)
+def _day_prefix(day: datetime.date) -> str:
+    return day.strftime("%Y%m%d")
 
 
 class DateUtils:
     @staticmethod
-    def full_datetime_to_str(_dt, _format="%Y%m%d %H:%M:%S"):
+    def full_datetime_to_str(_dt, _format=FULL_DATETIME_FORMAT):
         if _dt in (None, ""):
             return None
         if isinstance(_dt, str):
             return _dt
         return _dt.strftime(_format)
 
+    @staticmethod
+    def format_full_datetime(_dt):
+        """full_datetime_to_str() with the default format, for bulk use.
+
+        Rows in a page share a handful of days, so the date part is cached
+        and only the time is formatted per call.
+        """
+        if _dt in (None, ""):
+            return None
+        if isinstance(_dt, str):
+            return _dt
+        return (
+            f"{_day_prefix(_dt.date())} "
+            f"{_dt.hour:02d}:{_dt.minute:02d}:{_dt.second:02d}"
+        )
+
     @staticmethod
     def str_to_datetime(_str, _format="%Y/%m/%d"):
         if _str in (None, ""):
@@ -10,3 +10,6 @@ class ErrorMessage(Enum):
     ACCOUNT_EXISTED = "Account already registered."
     ACCOUNT_NOT_FOUND = "Account not found."
     Permission_Error = "Permission denied or reply not found"
+    TICKET_NOT_FOUND = "Ticket not found."
+    INVALID_CURSOR = "Invalid pagination cursor."
+    PASSWORD_QUEUE_FULL = "Too many concurrent logins, please retry shortly."
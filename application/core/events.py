@@ -0,0 +1,312 @@
+import asyncio
+import itertools
+import json
+import logging
+import time
+from collections import deque
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from core.settings import settings
+
+# Every reply event goes to its ticket's channel and to the staff inbox.
+STAFF_INBOX = "staff"
+
+
+def ticket_channel(ticket_id: int) -> str:
+    return f"ticket:{ticket_id}"
+
+
+class Event(NamedTuple):
+    id: str
+    type: str
+    data: dict
+    channels: Tuple[str, ...]
+
+
+class Subscription:
+    """One stream's queue of live events for a channel.
+
+    The queue is bounded; a subscriber that falls that far behind is marked
+    ``overflowed`` and should end its stream, so the client reconnects with
+    Last-Event-ID and catches up from the broker's history instead.
+    """
+
+    def __init__(self, channel: str, maxsize: int):
+        self.channel = channel
+        self.overflowed = False
+        self._queue: "asyncio.Queue[Event]" = asyncio.Queue(maxsize)
+
+    def deliver(self, event: Event) -> None:
+        if self.overflowed:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout: float) -> Optional[Event]:
+        """The next event, or None if none arrived within ``timeout`` seconds."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBroker:
+    """In-process pub/sub for ticket events.
+
+    Events fan out to this process's subscribers and are kept in a bounded
+    history, oldest dropped first, for Last-Event-ID resume. Ids are
+    consecutive, so a resume that reaches back past the history (or comes
+    from before a restart) is detected and answered with a reset. Like the
+    caches it is only touched from the event loop thread. Subclasses
+    replace ``publish``/``replay`` to share events between workers.
+    """
+
+    def __init__(self, history_size: int = 1000, queue_size: int = 100):
+        self.queue_size = queue_size
+        self.published = 0
+        self._history: "deque[Event]" = deque(maxlen=history_size)
+        self._ids = itertools.count(1)
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, channels: Iterable[str], event_type: str, data: dict):
+        """Send an event to ``channels``. Never raises: a lost event only
+        delays clients until their next reconnect or refetch."""
+        event = Event(str(next(self._ids)), event_type, data, tuple(channels))
+        self._history.append(event)
+        self._dispatch(event)
+
+    def _dispatch(self, event: Event) -> None:
+        self.published += 1
+        for channel in event.channels:
+            for subscription in self._subscribers.get(channel, ()):
+                subscription.deliver(event)
+
+    def subscribe(self, channel: str) -> Subscription:
+        subscription = Subscription(channel, self.queue_size)
+        self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.channel)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.channel]
+
+    async def replay(
+        self, channel: str, last_event_id: str
+    ) -> Tuple[List[Event], bool]:
+        """Events on ``channel`` after ``last_event_id``, oldest first, and
+        whether some may be missing (the client should refetch instead)."""
+        try:
+            last = int(last_event_id)
+        except ValueError:
+            return [], True
+        newest = int(self._history[-1].id) if self._history else 0
+        oldest = int(self._history[0].id) if self._history else newest + 1
+        if last > newest or last + 1 < oldest:
+            return [], True
+        events = [
+            event
+            for event in self._history
+            if int(event.id) > last and channel in event.channels
+        ]
+        return events, False
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": sum(len(subs) for subs in self._subscribers.values()),
+            "published": self.published,
+        }
+
+
+class RedisEventBroker(EventBroker):
+    """Shares events between workers through one Redis stream.
+
+    ``publish`` only appends to the stream (trimmed to roughly the history
+    size); each worker runs one reader task that hands new entries to its
+    own subscribers, so a worker needs a single Redis connection however
+    many streams it serves. Event ids are the stream entry ids, and resume
+    reads the stream itself. Needs Redis 6.2+ and the redis package.
+    """
+
+    def __init__(
+        self,
+        client,
+        history_size: int = 1000,
+        queue_size: int = 100,
+        stream: str = "tickets:events",
+    ):
+        super().__init__(history_size=history_size, queue_size=queue_size)
+        self.client = client
+        self.stream = stream
+        self.history_size = history_size
+        self._reader: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._reader is None:
+            self._reader = asyncio.create_task(self._read())
+
+    async def stop(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+
+    async def publish(self, channels: Iterable[str], event_type: str, data: dict):
+        try:
+            await self.client.xadd(
+                self.stream,
+                {
+                    "channels": json.dumps(list(channels)),
+                    "type": event_type,
+                    "data": json.dumps(data),
+                },
+                maxlen=self.history_size,
+                approximate=True,
+            )
+        except Exception as err:
+            logging.warning("Event publish failed for %s: %s", event_type, err)
+
+    async def _read(self) -> None:
+        last_id = "$"
+        while True:
+            try:
+                response = await self.client.xread(
+                    {self.stream: last_id}, block=5000, count=100
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                logging.warning("Event stream read failed: %s", err)
+                await asyncio.sleep(1)
+                continue
+            for _, entries in response or ():
+                for entry_id, fields in entries:
+                    event = self._to_event(entry_id, fields)
+                    last_id = event.id
+                    self._dispatch(event)
+
+    @staticmethod
+    def _to_event(entry_id, fields) -> Event:
+        fields = {
+            (k.decode() if isinstance(k, bytes) else k): (
+                v.decode() if isinstance(v, bytes) else v
+            )
+            for k, v in fields.items()
+        }
+        return Event(
+            entry_id.decode() if isinstance(entry_id, bytes) else entry_id,
+            fields["type"],
+            json.loads(fields["data"]),
+            tuple(json.loads(fields["channels"])),
+        )
+
+    async def replay(
+        self, channel: str, last_event_id: str
+    ) -> Tuple[List[Event], bool]:
+        try:
+            info = await self.client.xinfo_stream(self.stream)
+            first = info.get("first-entry")
+            if first is None or _stream_id(first[0]) > _stream_id(last_event_id):
+                # Trimmed past the client's position, or a foreign id.
+                return [], True
+            entries = await self.client.xrange(self.stream, min=f"({last_event_id}")
+        except Exception as err:
+            logging.warning("Event replay failed after %s: %s", last_event_id, err)
+            return [], True
+        events = [self._to_event(entry_id, fields) for entry_id, fields in entries]
+        return [event for event in events if channel in event.channels], False
+
+
+def _stream_id(value) -> Tuple[int, int]:
+    """Order Redis stream ids ("<ms>-<seq>"); raises ValueError if malformed."""
+    if isinstance(value, bytes):
+        value = value.decode()
+    milliseconds, _, sequence = value.partition("-")
+    return int(milliseconds), int(sequence or 0)
+
+
+def create_event_broker() -> EventBroker:
+    """Build the broker selected by settings.EVENT_BACKEND (memory | redis)."""
+    if settings.EVENT_BACKEND == "redis":
+        import redis.asyncio as redis
+
+        return RedisEventBroker(
+            redis.from_url(settings.REDIS_URL),
+            history_size=settings.EVENT_HISTORY_SIZE,
+            queue_size=settings.EVENT_QUEUE_SIZE,
+        )
+    return EventBroker(
+        history_size=settings.EVENT_HISTORY_SIZE,
+        queue_size=settings.EVENT_QUEUE_SIZE,
+    )
+
+
+event_broker = create_event_broker()
+
+
+def format_sse(event: Event) -> bytes:
+    data = json.dumps(event.data, separators=(",", ":"))
+    return f"id: {event.id}\nevent: {event.type}\ndata: {data}\n\n".encode()
+
+
+async def sse_stream(
+    broker: EventBroker,
+    channel: str,
+    last_event_id: Optional[str],
+    is_disconnected: Callable[[], Awaitable[bool]],
+) -> AsyncIterator[bytes]:
+    """Server-Sent Events for ``channel``, resuming after ``last_event_id``.
+
+    Sends a ``reset`` event when the missed events are no longer known, a
+    comment every SSE_KEEPALIVE_SECONDS so proxies keep the connection
+    open, and ends after SSE_MAX_STREAM_SECONDS or when the subscriber
+    overflows; EventSource clients reconnect on their own.
+    """
+    # Subscribe before replaying so nothing published in between is lost;
+    # live events the replay already covered are skipped by id.
+    subscription = broker.subscribe(channel)
+    try:
+        yield f"retry: {settings.SSE_RETRY_MS}\n\n".encode()
+        replayed = set()
+        if last_event_id:
+            events, reset = await broker.replay(channel, last_event_id)
+            if reset:
+                yield b"event: reset\ndata: {}\n\n"
+            for event in events:
+                replayed.add(event.id)
+                yield format_sse(event)
+
+        deadline = time.monotonic() + settings.SSE_MAX_STREAM_SECONDS
+        while not subscription.overflowed:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or await is_disconnected():
+                break
+            event = await subscription.get(
+                min(settings.SSE_KEEPALIVE_SECONDS, remaining)
+            )
+            if event is None:
+                yield b": keepalive\n\n"
+            elif event.id not in replayed:
+                yield format_sse(event)
+    finally:
+        broker.unsubscribe(subscription)
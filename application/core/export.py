@@ -0,0 +1,61 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, List
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to the stdlib encoder
+    orjson = None
+
+TICKET_COLUMNS = ["ticketId", "title", "description", "createdDate", "createdBy"]
+REPLY_COLUMNS = ["replyId", "replyContent", "replyCreatedDate", "replyCreatedBy"]
+
+
+def _dumps(record: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(record)
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+async def ndjson_chunks(batches: AsyncIterator[List[dict]]) -> AsyncIterator[bytes]:
+    """One JSON object per line; one chunk per batch."""
+    async for batch in batches:
+        yield b"".join(_dumps(record) + b"\n" for record in batch)
+
+
+async def csv_chunks(
+    batches: AsyncIterator[List[dict]], include_replies: bool = False
+) -> AsyncIterator[bytes]:
+    """A header row, then one row per ticket.
+
+    With replies there is one row per reply, the ticket columns repeated; a
+    ticket without replies still gets a single row with empty reply columns.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(TICKET_COLUMNS + (REPLY_COLUMNS if include_replies else []))
+    yield buffer.getvalue().encode()
+
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        for record in batch:
+            ticket = [record[column] for column in TICKET_COLUMNS]
+            if not include_replies:
+                writer.writerow(ticket)
+                continue
+            for reply in record["replies"] or [None]:
+                if reply is None:
+                    writer.writerow(ticket + [""] * len(REPLY_COLUMNS))
+                else:
+                    writer.writerow(
+                        ticket
+                        + [
+                            reply["replyId"],
+                            reply["content"],
+                            reply["createdDate"],
+                            reply["createdBy"],
+                        ]
+                    )
+        yield buffer.getvalue().encode()
@@ -0,0 +1,113 @@
+import codecs
+import json
+from typing import Any, AsyncIterator, Tuple
+
+_WHITESPACE = " \t\r\n"
+
+
+class JsonStreamError(ValueError):
+    """The stream cannot be parsed any further (e.g. a broken JSON array)."""
+
+
+class JsonRecordError(ValueError):
+    """One record is not valid JSON; the records around it are still read."""
+
+
+async def iter_json_records(
+    chunks: AsyncIterator[bytes], ndjson: bool, max_record_bytes: int
+) -> AsyncIterator[Tuple[int, Any]]:
+    """Yield ``(index, record)`` from a streamed JSON array or NDJSON body.
+
+    Only the record being parsed is buffered. A malformed NDJSON line yields
+    a JsonRecordError in place of its record; malformed array syntax and
+    records over ``max_record_bytes`` raise JsonStreamError.
+    """
+    if ndjson:
+        records = _iter_ndjson(chunks, max_record_bytes)
+    else:
+        records = _iter_array(chunks, max_record_bytes)
+    index = 0
+    async for record in records:
+        yield index, record
+        index += 1
+
+
+async def _iter_ndjson(chunks, max_record_bytes):
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _loads_line(line)
+        if len(buffer) > max_record_bytes:
+            raise JsonStreamError(f"Record larger than {max_record_bytes} bytes.")
+    if buffer.strip():
+        yield _loads_line(buffer)
+
+
+def _loads_line(line: bytes):
+    try:
+        return json.loads(line)
+    except ValueError as err:
+        return JsonRecordError(f"Invalid JSON: {err}")
+
+
+async def _iter_array(chunks, max_record_bytes):
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer, position = "", 0
+    # start -> first -> (value <-> delimiter) -> done
+    state = "start"
+    eof = False
+    chunks = chunks.__aiter__()
+
+    while state != "done":
+        try:
+            chunk = await chunks.__anext__()
+            buffer = buffer[position:] + text_decoder.decode(chunk)
+        except StopAsyncIteration:
+            buffer = buffer[position:] + text_decoder.decode(b"", final=True)
+            eof = True
+        position = 0
+
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            if position == len(buffer):
+                break
+            char = buffer[position]
+            if state == "start":
+                if char != "[":
+                    raise JsonStreamError("Expected a JSON array or NDJSON.")
+                state, position = "first", position + 1
+            elif char == "]" and state in ("first", "delimiter"):
+                state, position = "done", position + 1
+                break
+            elif state == "delimiter":
+                if char != ",":
+                    raise JsonStreamError("Expected ',' or ']' between records.")
+                state, position = "value", position + 1
+            else:
+                try:
+                    record, end = decoder.raw_decode(buffer, position)
+                except ValueError as err:
+                    if eof:
+                        raise JsonStreamError(f"Invalid JSON: {err}")
+                    break  # probably a record cut off mid-chunk
+                if end == len(buffer) and not eof:
+                    break  # a trailing number may still have digits to come
+                state, position = "delimiter", end
+                yield record
+
+        if state != "done":
+            if eof:
+                raise JsonStreamError("Unexpected end of JSON array.")
+            if len(buffer) - position > max_record_bytes:
+                raise JsonStreamError(f"Record larger than {max_record_bytes} bytes.")
+
+    if buffer[position:].strip():
+        raise JsonStreamError("Unexpected data after the JSON array.")
+    async for chunk in chunks:
+        if chunk.strip():
+            raise JsonStreamError("Unexpected data after the JSON array.")
@@ -0,0 +1,135 @@
+import atexit
+import copy
+import datetime
+import json
+import logging
+import os
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
+from core.settings import settings
+from core.slow_query import slow_query_logger
+
+access_logger = logging.getLogger("access")
+
+# Attributes every LogRecord has; anything else was passed through ``extra``.
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with ``extra`` fields as top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.datetime.fromtimestamp(
+                record.created, datetime.timezone.utc
+            ).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hands records to the listener thread without formatting them.
+
+    Only the %-merge of msg/args happens on the caller's thread (args may be
+    mutated after the call returns); timestamps, JSON encoding and disk I/O
+    all happen on the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _LoggerFilter(logging.Filter):
+    def __init__(self, name: str, exclude: bool = False):
+        super().__init__()
+        self.logger_name = name
+        self.exclude = exclude
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return (record.name == self.logger_name) != self.exclude
+
+
+def configure_logging() -> QueueListener:
+    """Route all logging through a queue drained by one writer thread.
+
+    ``logs/app.log`` gets JSON lines for everything except slow queries,
+    which go to ``logs/slow_query.log`` only; the console keeps the plain
+    text format. Safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    os.makedirs(settings.LOG_DIR, exist_ok=True)
+    json_formatter = JsonFormatter()
+
+    app_handler = RotatingFileHandler(
+        os.path.join(settings.LOG_DIR, "app.log"),
+        maxBytes=settings.LOG_MAX_BYTES,
+        backupCount=settings.LOG_BACKUP_COUNT,
+    )
+    app_handler.setFormatter(json_formatter)
+    app_handler.addFilter(_LoggerFilter(slow_query_logger.name, exclude=True))
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(
+        logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    )
+    console_handler.addFilter(_LoggerFilter(slow_query_logger.name, exclude=True))
+
+    slow_query_handler = RotatingFileHandler(
+        os.path.join(settings.LOG_DIR, "slow_query.log"),
+        maxBytes=settings.LOG_MAX_BYTES,
+        backupCount=settings.LOG_BACKUP_COUNT,
+    )
+    slow_query_handler.setFormatter(json_formatter)
+    slow_query_handler.addFilter(_LoggerFilter(slow_query_logger.name))
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(settings.LOG_LEVEL)
+    root.addHandler(NonBlockingQueueHandler(log_queue))
+    slow_query_logger.propagate = True
+
+    _listener = QueueListener(
+        log_queue,
+        app_handler,
+        console_handler,
+        slow_query_handler,
+        respect_handler_level=True,
+    )
+    _listener.start()
+    # Flush whatever is still queued when the process exits.
+    atexit.register(_listener.stop)
+    return _listener
+
+
+def should_log_access(status_code: int, duration: float) -> bool:
+    """Errors and slow requests are always kept; the rest is sampled."""
+    if not access_logger.isEnabledFor(logging.INFO):
+        return False
+    if status_code >= 400 or duration * 1000 >= settings.ACCESS_LOG_SLOW_MS:
+        return True
+    rate = settings.ACCESS_LOG_SAMPLE_RATE
+    return rate >= 1 or random.random() < rate
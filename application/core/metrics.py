@@ -0,0 +1,187 @@
+from bisect import bisect_left
+from typing import Callable, Dict, List, Tuple
+
+# Upper bounds (seconds) of the request latency histogram buckets.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "unmatched"
+
+Sample = Tuple[Dict[str, str], float]
+
+
+def route_template(request) -> str:
+    """The path template of the route that handled ``request``.
+
+    Labelling by template (``/api/ticket/{ticket_id}``) instead of the raw URL
+    keeps the number of series bounded.
+    """
+    route = request.scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+    return "{" + inner + "}"
+
+
+def _number(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class RouteStats:
+    __slots__ = ("statuses", "buckets", "duration_sum", "count")
+
+    def __init__(self, bucket_count: int):
+        self.statuses: Dict[int, int] = {}
+        self.buckets = [0] * bucket_count
+        self.duration_sum = 0.0
+        self.count = 0
+
+
+class Metrics:
+    """Request metrics rendered in the Prometheus text exposition format.
+
+    Counters are plain integers updated from the event loop thread, so the
+    per-request cost is a dict lookup, a bisect and a few increments - no
+    locks. Gauges owned by other components (pool, caches) are read through
+    collectors only when /metrics is scraped.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.bucket_bounds = tuple(buckets)
+        self.in_flight = 0
+        self._routes: Dict[Tuple[str, str], RouteStats] = {}
+        self._collectors: List[Tuple[str, str, str, Callable[[], List[Sample]]]] = []
+
+    def observe(self, method: str, route: str, status_code: int, duration: float):
+        key = (method, route)
+        stats = self._routes.get(key)
+        if stats is None:
+            stats = self._routes[key] = RouteStats(len(self.bucket_bounds) + 1)
+        stats.statuses[status_code] = stats.statuses.get(status_code, 0) + 1
+        stats.buckets[bisect_left(self.bucket_bounds, duration)] += 1
+        stats.duration_sum += duration
+        stats.count += 1
+
+    def register(
+        self,
+        name: str,
+        kind: str,
+        help_text: str,
+        collect: Callable[[], List[Sample]],
+    ) -> None:
+        """Add a metric whose ``(labels, value)`` samples are read at scrape time."""
+        self._collectors.append((name, kind, help_text, collect))
+
+    def reset(self) -> None:
+        self.in_flight = 0
+        self._routes.clear()
+
+    def render(self) -> str:
+        lines = [
+            "# HELP http_requests_total Requests handled, by route and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        routes = sorted(self._routes.items())
+        for (method, route), stats in routes:
+            for status_code, count in sorted(stats.statuses.items()):
+                labels = {"method": method, "route": route, "status": status_code}
+                lines.append(f"http_requests_total{_labels(labels)} {count}")
+
+        lines += [
+            "# HELP http_request_duration_seconds Request latency, by route.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), stats in routes:
+            cumulative = 0
+            for bound, count in zip(self.bucket_bounds + ("+Inf",), stats.buckets):
+                cumulative += count
+                labels = {"method": method, "route": route, "le": bound}
+                lines.append(
+                    f"http_request_duration_seconds_bucket{_labels(labels)} {cumulative}"
+                )
+            labels = _labels({"method": method, "route": route})
+            lines.append(
+                f"http_request_duration_seconds_sum{labels} {_number(stats.duration_sum)}"
+            )
+            lines.append(f"http_request_duration_seconds_count{labels} {stats.count}")
+
+        lines += [
+            "# HELP http_requests_in_flight Requests currently being handled.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+        ]
+
+        for name, kind, help_text, collect in self._collectors:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in collect():
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def register_pool_metrics(stats: Callable[[], dict]) -> None:
+    """Expose a pool's ``stats()`` (see db.pool.InstrumentedQueuePool)."""
+    gauges = {
+        "db_pool_size": ("size", "Configured pool size."),
+        "db_pool_checked_out": ("checked_out", "Connections in use."),
+        "db_pool_checked_in": ("checked_in", "Idle connections in the pool."),
+        "db_pool_overflow": ("overflow", "Connections opened beyond pool_size."),
+        "db_pool_checkout_wait_seconds_max": (
+            "checkout_wait_seconds_max",
+            "Longest wait for a connection.",
+        ),
+    }
+    counters = {
+        "db_pool_checkouts_total": ("checkouts", "Connection checkouts."),
+        "db_pool_checkout_timeouts_total": (
+            "checkout_timeouts",
+            "Checkouts that timed out waiting for a connection.",
+        ),
+        "db_pool_checkout_wait_seconds_total": (
+            "checkout_wait_seconds_total",
+            "Total time spent waiting for connections.",
+        ),
+    }
+    for kind, group in (("gauge", gauges), ("counter", counters)):
+        for name, (field, help_text) in group.items():
+            metrics.register(
+                name, kind, help_text, lambda field=field: [({}, stats()[field])]
+            )
+
+
+def register_cache_metrics(caches: Dict[str, Callable[[], dict]]) -> None:
+    """Expose hit/miss counters and the hit ratio of named caches.
+
+    Each value is a callable returning a dict with ``hits`` and ``misses``.
+    """
+
+    def samples(field: str):
+        def collect():
+            return [({"cache": name}, stats()[field]) for name, stats in caches.items()]
+
+        return collect
+
+    def ratios():
+        result = []
+        for name, stats in caches.items():
+            current = stats()
+            lookups = current["hits"] + current["misses"]
+            result.append(({"cache": name}, current["hits"] / lookups if lookups else 0.0))
+        return result
+
+    metrics.register("cache_hits_total", "counter", "Cache hits.", samples("hits"))
+    metrics.register("cache_misses_total", "counter", "Cache misses.", samples("misses"))
+    metrics.register(
+        "cache_hit_ratio", "gauge", "Hits over lookups since start.", ratios
+    )
@@ -0,0 +1,39 @@
+import base64
+import datetime
+import json
+from typing import Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(sort_value: Optional[datetime.datetime], row_id: int) -> str:
+    """Build an opaque keyset cursor from the last row of a page."""
+    if sort_value is not None:
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime.datetime], int]:
+    """Reverse encode_cursor; raises ValueError on anything malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if sort_value is not None:
+            sort_value = datetime.datetime.fromisoformat(sort_value)
+        return sort_value, int(row_id)
+    except (TypeError, ValueError) as err:
+        raise ValueError(f"Invalid cursor: {cursor}") from err
+
+
+def keyset_before(sort_column, id_column, sort_value, row_id):
+    """Rows that follow ``(sort_value, row_id)`` in ``(sort, id) DESC`` order.
+
+    Equivalent to ``sort < v OR (sort = v AND id < i)``; the leading
+    ``sort <= v`` gives the database a range on the index to seek to,
+    which the OR alone does not.
+    """
+    return and_(
+        sort_column <= sort_value,
+        or_(sort_column < sort_value, id_column < row_id),
+    )
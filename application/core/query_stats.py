@@ -0,0 +1,84 @@
+import re
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from core.slow_query import slow_query_log
+
+
+class QueryStats:
+    """Statements executed and time spent in the database for one request."""
+
+    __slots__ = ("count", "duration", "request_id")
+
+    def __init__(self, request_id: Optional[str] = None):
+        self.count = 0
+        self.duration = 0.0
+        self.request_id = request_id
+
+    def server_timing(self, total_duration: float) -> str:
+        return (
+            f'db;dur={self.duration * 1000:.2f};desc="{self.count} queries", '
+            f"app;dur={total_duration * 1000:.2f}"
+        )
+
+
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "query_stats", default=None
+)
+_SERVER_TIMING_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+def start_query_stats(request_id: Optional[str] = None) -> QueryStats:
+    """Start counting statements for the current request (context)."""
+    stats = QueryStats(request_id)
+    _query_stats.set(stats)
+    return stats
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _query_stats.get()
+
+
+def query_count_from_header(server_timing: str) -> Optional[int]:
+    match = _SERVER_TIMING_QUERIES.search(server_timing or "")
+    return int(match.group(1)) if match else None
+
+
+# Registered on the Engine class, so every engine (including the async
+# engines' sync core and the test engine) is counted. Start times are keyed
+# by cursor: a failed statement never reaches after_cursor_execute, so its
+# entry is dropped in handle_error instead of being left on the pooled
+# connection for a later statement to pick up.
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", {})[id(cursor)] = time.perf_counter()
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # ExceptionContext.cursor is never filled in; the execution context
+    # holds the cursor the statement ran on.
+    conn = exception_context.connection
+    context = exception_context.execution_context
+    if conn is not None and context is not None:
+        conn.info.get("query_start_time", {}).pop(id(context.cursor), None)
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start_time"].pop(id(cursor))
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += duration
+    if duration >= slow_query_log.threshold:
+        slow_query_log.record(
+            statement,
+            duration,
+            cursor.rowcount,
+            stats.request_id if stats is not None else None,
+        )
@@ -0,0 +1,46 @@
+from typing import AsyncIterator
+
+from fastapi.responses import (
+    JSONResponse,
+    ORJSONResponse,
+    Response,
+    StreamingResponse,
+)
+
+from core.settings import settings
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to the stdlib encoder
+    orjson = None
+
+
+def default_response_class():
+    """Response class for routes that do not pick one themselves.
+
+    ORJSONResponse encodes several times faster than the stdlib-based
+    JSONResponse; it is used unless JSON_RESPONSE=json or orjson is missing.
+    """
+    if settings.JSON_RESPONSE == "orjson" and orjson is not None:
+        return ORJSONResponse
+    return JSONResponse
+
+
+def json_response(content) -> Response:
+    """Render JSON-ready content as is.
+
+    Returning a Response from a route skips FastAPI's response_model
+    validation, so only use this for content already built in the
+    response_model's exact shape (see the row projections in
+    repositories.ticket_repository).
+    """
+    return default_response_class()(content)
+
+
+def sse_response(events: AsyncIterator[bytes]) -> StreamingResponse:
+    """A text/event-stream response that proxies pass through unbuffered."""
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
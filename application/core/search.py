@@ -0,0 +1,148 @@
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+
+_TOKEN = re.compile(r"\w+")
+# Title terms count this many times over description/reply terms.
+TITLE_WEIGHT = 3
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercased word tokens; single characters are dropped."""
+    if not text:
+        return []
+    return [token for token in _TOKEN.findall(text.lower()) if len(token) > 1]
+
+
+class InMemorySearchIndex:
+    """Inverted index over tickets, ranked with BM25.
+
+    Every ticket is one document made of its title (weighted), description
+    and replies. Postings hold weighted term frequencies only, so removing
+    text (an edited or deleted reply) needs the old text passed back in.
+    Like TTLCache it is only touched from the event loop thread and is local
+    to one process, which makes it fit single-process (SQLite, test)
+    deployments; MySQL deployments use FULLTEXT indexes instead.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._lengths: Dict[int, int] = {}
+        self._owners: Dict[int, int] = {}
+        self._tickets_by_owner: Dict[int, Set[int]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add_ticket(
+        self, ticket_id: int, owner_id: int, title: str, description: Optional[str]
+    ) -> None:
+        self._owners[ticket_id] = owner_id
+        self._tickets_by_owner.setdefault(owner_id, set()).add(ticket_id)
+        self._lengths.setdefault(ticket_id, 0)
+        self.add_text(ticket_id, title, TITLE_WEIGHT)
+        self.add_text(ticket_id, description)
+
+    def add_text(self, ticket_id: int, text: Optional[str], weight: int = 1) -> None:
+        self._update(ticket_id, text, weight)
+
+    def remove_text(
+        self, ticket_id: int, text: Optional[str], weight: int = 1
+    ) -> None:
+        self._update(ticket_id, text, -weight)
+
+    def _update(self, ticket_id: int, text: Optional[str], weight: int) -> None:
+        if ticket_id not in self._lengths:
+            # Written by another process, or before the index was built.
+            return
+        terms = Counter(tokenize(text))
+        for term, count in terms.items():
+            postings = self._postings.setdefault(term, {})
+            frequency = postings.get(ticket_id, 0) + count * weight
+            if frequency > 0:
+                postings[ticket_id] = frequency
+            else:
+                postings.pop(ticket_id, None)
+                if not postings:
+                    del self._postings[term]
+        delta = sum(terms.values()) * weight
+        self._lengths[ticket_id] += delta
+        self._total_length += delta
+
+    def search(
+        self,
+        query: str,
+        owner_id: Optional[int] = None,
+        limit: int = 10,
+        offset: int = 0,
+    ) -> Tuple[List[Tuple[int, float]], int]:
+        """Ranked ``(ticket_id, score)`` pairs for one page, plus the match count.
+
+        Any query term matches (OR); documents matching more or rarer terms
+        rank higher. Ties go to the newer (higher) ticket id. With
+        ``owner_id`` only that owner's tickets are scored, so the cost
+        follows the size of their ticket set rather than of the postings.
+        """
+        documents = len(self._lengths)
+        if not documents:
+            return [], 0
+        lengths = self._lengths
+        # BM25 length normalisation, K1 * (1 - B + B * length / average),
+        # split into a constant and a per-length factor.
+        norm_base = K1 * (1 - B)
+        norm_per_length = K1 * B * documents / (self._total_length or 1)
+        owned = None
+        if owner_id is not None:
+            owned = self._tickets_by_owner.get(owner_id)
+            if not owned:
+                return [], 0
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            matching = len(postings)
+            idf = math.log(1 + (documents - matching + 0.5) / (matching + 0.5))
+            boost = idf * (K1 + 1)
+            if owned is not None and len(owned) < len(postings):
+                matches = [
+                    (ticket_id, postings[ticket_id])
+                    for ticket_id in owned
+                    if ticket_id in postings
+                ]
+            elif owned is not None:
+                matches = [
+                    (ticket_id, frequency)
+                    for ticket_id, frequency in postings.items()
+                    if ticket_id in owned
+                ]
+            else:
+                matches = postings.items()
+            for ticket_id, frequency in matches:
+                norm = norm_base + norm_per_length * lengths[ticket_id]
+                scores[ticket_id] = scores.get(ticket_id, 0.0) + boost * frequency / (
+                    frequency + norm
+                )
+        top = heapq.nlargest(
+            offset + limit, scores.items(), key=lambda item: (item[1], item[0])
+        )
+        return top[offset:], len(scores)
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._lengths.clear()
+        self._owners.clear()
+        self._tickets_by_owner.clear()
+        self._total_length = 0
+
+    def stats(self) -> dict:
+        return {"documents": len(self._lengths), "terms": len(self._postings)}
+
+
+search_index = InMemorySearchIndex()
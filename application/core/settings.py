@@ -1,4 +1,5 @@
 import os
+from typing import Literal
 
 from pydantic_settings import BaseSettings
 
@@ -28,6 +29,100 @@ class Settings(BaseSettings):
     MYSQL_PORT: str = os.environ.get("MYSQL_PORT", "3306")
     DB_URI: str = os.environ.get("DB_URI", "")
     DB_ECHO_LOG: bool = True if os.environ.get("DEBUG") else False
+    DB_POOL_SIZE: int = int(os.environ.get("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.environ.get("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT: int = int(os.environ.get("DB_POOL_TIMEOUT", "30"))
+    # Recycle well below MySQL's wait_timeout (8h by default)
+    DB_POOL_RECYCLE: int = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = os.environ.get("DB_POOL_PRE_PING", "1") == "1"
+    DB_POOL_WARMUP: bool = os.environ.get("DB_POOL_WARMUP", "1") == "1"
+    SLOW_QUERY_THRESHOLD_MS: float = float(
+        os.environ.get("SLOW_QUERY_THRESHOLD_MS", "200")
+    )
+    SLOW_QUERY_MAX_FINGERPRINTS: int = int(
+        os.environ.get("SLOW_QUERY_MAX_FINGERPRINTS", "1000")
+    )
+    # Largest pageSize of /tickets/; bigger requests are clamped to it
+    TICKET_PAGE_MAX: int = int(os.environ.get("TICKET_PAGE_MAX", "100"))
+    # exact | cached | estimate | none, see TicketRepository.count_tickets;
+    # anything else fails at startup
+    TICKET_TOTAL_STRATEGY: Literal["exact", "cached", "estimate", "none"] = (
+        os.environ.get("TICKET_TOTAL_STRATEGY", "exact")
+    )
+    TICKET_COUNT_CACHE_TTL: int = int(os.environ.get("TICKET_COUNT_CACHE_TTL", "300"))
+    TICKET_COUNT_CACHE_SIZE: int = int(
+        os.environ.get("TICKET_COUNT_CACHE_SIZE", "10000")
+    )
+    # memory | redis; redis needs the redis package and REDIS_URL
+    CACHE_BACKEND: str = os.environ.get("CACHE_BACKEND", "memory")
+    REDIS_URL: str = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+    TICKET_CACHE_SIZE: int = int(os.environ.get("TICKET_CACHE_SIZE", "5000"))
+    TICKET_CACHE_TTL: int = int(os.environ.get("TICKET_CACHE_TTL", "300"))
+    ACCOUNT_CACHE_SIZE: int = int(os.environ.get("ACCOUNT_CACHE_SIZE", "10000"))
+    ACCOUNT_CACHE_TTL: int = int(os.environ.get("ACCOUNT_CACHE_TTL", "300"))
+    JWT_CACHE_SIZE: int = int(os.environ.get("JWT_CACHE_SIZE", "10000"))
+    PASSWORD_HASH_WORKERS: int = int(os.environ.get("PASSWORD_HASH_WORKERS", "4"))
+    # Password jobs allowed in flight before login/register answer 503; 0 = no cap
+    PASSWORD_HASH_MAX_PENDING: int = int(
+        os.environ.get("PASSWORD_HASH_MAX_PENDING", "256")
+    )
+    # Default and maximum page size of /ticket/{id}/replies/
+    REPLY_PAGE_SIZE: int = int(os.environ.get("REPLY_PAGE_SIZE", "50"))
+    REPLY_PAGE_MAX: int = int(os.environ.get("REPLY_PAGE_MAX", "500"))
+    # Rows fetched per round trip by the staff ticket export
+    EXPORT_BATCH_SIZE: int = int(os.environ.get("EXPORT_BATCH_SIZE", "1000"))
+    # Tickets inserted (and committed) per batch by the staff bulk import
+    IMPORT_BATCH_SIZE: int = int(os.environ.get("IMPORT_BATCH_SIZE", "500"))
+    IMPORT_MAX_RECORD_BYTES: int = int(
+        os.environ.get("IMPORT_MAX_RECORD_BYTES", str(1024 * 1024))
+    )
+    # Per-row errors listed in an import report; the rest are only counted
+    IMPORT_MAX_ERRORS: int = int(os.environ.get("IMPORT_MAX_ERRORS", "1000"))
+    # auto | memory | mysql; auto uses FULLTEXT on MySQL, the in-process index
+    # elsewhere. The in-process index is built at startup unless disabled.
+    SEARCH_BACKEND: str = os.environ.get("SEARCH_BACKEND", "auto")
+    SEARCH_REBUILD_ON_STARTUP: bool = (
+        os.environ.get("SEARCH_REBUILD_ON_STARTUP", "1") == "1"
+    )
+    SEARCH_PAGE_MAX: int = int(os.environ.get("SEARCH_PAGE_MAX", "100"))
+    # memory | redis; memory only reaches clients connected to the same worker
+    EVENT_BACKEND: str = os.environ.get("EVENT_BACKEND", "memory")
+    # Recent events kept for Last-Event-ID resume, and per-stream backlog
+    EVENT_HISTORY_SIZE: int = int(os.environ.get("EVENT_HISTORY_SIZE", "1000"))
+    EVENT_QUEUE_SIZE: int = int(os.environ.get("EVENT_QUEUE_SIZE", "100"))
+    SSE_KEEPALIVE_SECONDS: float = float(
+        os.environ.get("SSE_KEEPALIVE_SECONDS", "15")
+    )
+    # Streams end after this long; clients reconnect with Last-Event-ID
+    SSE_MAX_STREAM_SECONDS: float = float(
+        os.environ.get("SSE_MAX_STREAM_SECONDS", "300")
+    )
+    SSE_RETRY_MS: int = int(os.environ.get("SSE_RETRY_MS", "3000"))
+    COMPRESSION_ENABLED: bool = os.environ.get("COMPRESSION_ENABLED", "1") == "1"
+    # Complete bodies below this many bytes go out uncompressed
+    COMPRESSION_MIN_SIZE: int = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+    # Server preference; br and zstd are skipped unless brotli/zstandard are installed
+    COMPRESSION_ENCODINGS: str = os.environ.get("COMPRESSION_ENCODINGS", "zstd,br,gzip")
+    COMPRESSION_CONTENT_TYPES: str = os.environ.get(
+        "COMPRESSION_CONTENT_TYPES",
+        "application/json,application/x-ndjson,text/csv,text/plain",
+    )
+    # Levels: see benchmark/compression.py; gzip above 1 buys <1% for 2-3x CPU
+    COMPRESSION_GZIP_LEVEL: int = int(os.environ.get("COMPRESSION_GZIP_LEVEL", "1"))
+    COMPRESSION_BROTLI_LEVEL: int = int(os.environ.get("COMPRESSION_BROTLI_LEVEL", "4"))
+    COMPRESSION_ZSTD_LEVEL: int = int(os.environ.get("COMPRESSION_ZSTD_LEVEL", "3"))
+    # orjson | json; orjson needs the orjson package, otherwise json is used
+    JSON_RESPONSE: str = os.environ.get("JSON_RESPONSE", "orjson")
+    LOG_LEVEL: str = os.environ.get("LOG_LEVEL", "INFO")
+    LOG_DIR: str = os.environ.get("LOG_DIR", "logs")
+    LOG_MAX_BYTES: int = int(os.environ.get("LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+    LOG_BACKUP_COUNT: int = int(os.environ.get("LOG_BACKUP_COUNT", "10"))
+    # Fraction of successful, fast requests written to the access log
+    ACCESS_LOG_SAMPLE_RATE: float = float(
+        os.environ.get("ACCESS_LOG_SAMPLE_RATE", "1.0")
+    )
+    # Requests slower than this are always logged, as are 4xx/5xx responses
+    ACCESS_LOG_SLOW_MS: float = float(os.environ.get("ACCESS_LOG_SLOW_MS", "1000"))
 
     @property
     def database_url(self) -> str:
@@ -0,0 +1,137 @@
+import logging
+import os
+import re
+import sys
+import time
+from typing import List, Optional
+
+import greenlet
+
+from core.settings import settings
+
+slow_query_logger = logging.getLogger("slow_query")
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_BIND_PARAM = re.compile(r"%\([^)]+\)s|%s|:\w+|\?")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+_REPOSITORY_DIR = f"{os.sep}repositories{os.sep}"
+
+
+def fingerprint(statement: str) -> str:
+    """Normalize a statement so that only its shape is left.
+
+    Literals and bind parameters become ``?``, lists of them (IN clauses,
+    multi-row VALUES) collapse to ``(...)`` and whitespace is squashed.
+    """
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _BIND_PARAM.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _VALUE_LIST.sub("(...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def _iter_frames():
+    frame = sys._getframe()
+    while frame is not None:
+        yield frame
+        frame = frame.f_back
+    # The async engine runs the DBAPI call in a child greenlet; the awaiting
+    # repository coroutine is on the parent greenlet's stack.
+    parent = greenlet.getcurrent().parent
+    frame = parent.gr_frame if parent is not None else None
+    while frame is not None:
+        yield frame
+        frame = frame.f_back
+
+
+def query_origin() -> Optional[str]:
+    """The repository method (``Class.method``) that issued the statement."""
+    for frame in _iter_frames():
+        if _REPOSITORY_DIR in frame.f_code.co_filename:
+            owner = frame.f_locals.get("self")
+            name = frame.f_code.co_name
+            return f"{type(owner).__name__}.{name}" if owner is not None else name
+    return None
+
+
+class SlowQueryLog:
+    """Logs statements slower than a threshold and keeps per-fingerprint totals.
+
+    Only slow statements reach ``record``, so the fingerprinting and stack
+    walk never run on the fast path.
+    """
+
+    def __init__(self, threshold_ms: float, max_fingerprints: int = 1000):
+        self.threshold = threshold_ms / 1000
+        self.max_fingerprints = max_fingerprints
+        self._aggregates = {}
+
+    def record(
+        self,
+        statement: str,
+        duration: float,
+        rowcount: int,
+        request_id: Optional[str] = None,
+    ) -> None:
+        normalized = fingerprint(statement)
+        origin = query_origin()
+        slow_query_logger.warning(
+            "slow query %.2fms rows=%s origin=%s request_id=%s fingerprint=%s",
+            duration * 1000,
+            rowcount,
+            origin,
+            request_id,
+            normalized,
+            extra={
+                "duration_ms": round(duration * 1000, 3),
+                "rows": rowcount,
+                "origin": origin,
+                "request_id": request_id,
+                "fingerprint": normalized,
+            },
+        )
+
+        aggregate = self._aggregates.get(normalized)
+        if aggregate is None:
+            if len(self._aggregates) >= self.max_fingerprints:
+                # Drop the cheapest fingerprint to make room.
+                cheapest = min(
+                    self._aggregates, key=lambda key: self._aggregates[key]["total_ms"]
+                )
+                del self._aggregates[cheapest]
+            aggregate = self._aggregates[normalized] = {
+                "fingerprint": normalized,
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "origins": [],
+            }
+        duration_ms = duration * 1000
+        aggregate["count"] += 1
+        aggregate["total_ms"] += duration_ms
+        aggregate["max_ms"] = max(aggregate["max_ms"], duration_ms)
+        aggregate["last_seen"] = time.time()
+        aggregate["last_request_id"] = request_id
+        if origin and origin not in aggregate["origins"]:
+            aggregate["origins"].append(origin)
+
+    def top(self, limit: int = 20) -> List[dict]:
+        """Fingerprints with the most total time spent, slowest first."""
+        ranked = sorted(
+            self._aggregates.values(), key=lambda item: item["total_ms"], reverse=True
+        )
+        return [
+            dict(item, avg_ms=item["total_ms"] / item["count"])
+            for item in ranked[:limit]
+        ]
+
+    def clear(self) -> None:
+        self._aggregates.clear()
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    max_fingerprints=settings.SLOW_QUERY_MAX_FINGERPRINTS,
+)
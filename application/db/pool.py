@@ -0,0 +1,46 @@
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection.
+
+    The wait covers queueing for a free slot, opening a new connection and
+    the pre-ping. Counters live on the pool itself so each engine reports its
+    own numbers; recreate() (engine.dispose()) starts them from zero.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.checkout_timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.checkouts += 1
+            self.checkout_wait_total += waited
+            if waited > self.checkout_wait_max:
+                self.checkout_wait_max = waited
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": self.overflow(),
+            "checkouts": self.checkouts,
+            "checkout_timeouts": self.checkout_timeouts,
+            "checkout_wait_seconds_total": self.checkout_wait_total,
+            "checkout_wait_seconds_max": self.checkout_wait_max,
+        }
@@ -21,5 +21,7 @@ class Account(Base):
     is_admin = Column(Boolean(), default=False)
     last_login = Column(TIMESTAMP(timezone=True), nullable=True)
     created_date = Column(DateTime, default=datetime.datetime.utcnow)
-    tickets = relationship("Ticket", back_populates="account")
+    tickets = relationship(
+        "Ticket", back_populates="account", foreign_keys="Ticket.created_by_id"
+    )
     replies = relationship("Reply", back_populates="account")
@@ -3,6 +3,7 @@ from db.tables.ticket import Ticket
 from sqlalchemy import (
     Column,
     ForeignKey,
+    Index,
     Text, DateTime, Integer,
 )
 from sqlalchemy.orm import relationship, mapped_column
@@ -20,3 +21,10 @@ class Reply(Base):
 
     ticket = relationship("Ticket", back_populates="replies")
     account = relationship("Account", back_populates="replies")
+
+    __table_args__ = (
+        Index("ix_replies_ticket_id_created_at", "ticket_id", "created_at"),
+        Index("ft_replies_content", "content", mysql_prefix="FULLTEXT").ddl_if(
+            dialect="mysql"
+        ),
+    )
@@ -3,13 +3,20 @@ import datetime
 from sqlalchemy import (
     Column,
     ForeignKey,
+    Index,
     String,
     Text, DateTime, Integer,
 )
+from sqlalchemy.dialects import mysql
 from sqlalchemy.orm import mapped_column, relationship
 from db.base_class import Base
 
 
+def _created_date(context):
+    # A ticket's last activity starts out as its creation.
+    return context.get_current_parameters()["created_date"]
+
+
 class Ticket(Base):
     __tablename__ = "tickets"
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
@@ -17,6 +24,57 @@ class Ticket(Base):
     description = Column(Text)
     created_by_id = mapped_column(ForeignKey("accounts.id"), nullable=False)
     created_date = Column(DateTime, default=datetime.datetime.utcnow)
+    # Bumped by every reply write; ETags of the ticket's thread derive from it.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Microseconds on MySQL too: the /tickets/ ETag follows max(updated_at).
+    updated_at = Column(
+        DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql"),
+        nullable=False,
+        default=datetime.datetime.utcnow,
+    )
+    # Activity summary, kept in step with replies by create_reply and
+    # delete_reply so listings need no aggregate over replies.
+    # last_activity_at is the newest reply's time, or created_date.
+    reply_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_reply_at = Column(DateTime)
+    last_reply_by_id = mapped_column(
+        ForeignKey("accounts.id", name="fk_tickets_last_reply_by_id")
+    )
+    last_activity_at = Column(DateTime, nullable=False, default=_created_date)
 
-    account = relationship("Account", back_populates="tickets")
+    account = relationship(
+        "Account", back_populates="tickets", foreign_keys=[created_by_id]
+    )
     replies = relationship("Reply", back_populates="ticket")
+
+    # Keyset pagination walks (created_date, id) newest first, either across
+    # all tickets (staff) or within one author's tickets (customers), and
+    # (last_activity_at, id) the same way for sort=activity. updated_at
+    # serves the staff listing's max(updated_at). The FULLTEXT indexes back
+    # ticket search on MySQL only.
+    __table_args__ = (
+        Index("ix_tickets_created_date_id", "created_date", "id"),
+        Index(
+            "ix_tickets_created_by_id_created_date_id",
+            "created_by_id",
+            "created_date",
+            "id",
+        ),
+        Index("ix_tickets_last_activity_at_id", "last_activity_at", "id"),
+        Index(
+            "ix_tickets_created_by_id_last_activity_at_id",
+            "created_by_id",
+            "last_activity_at",
+            "id",
+        ),
+        Index("ix_tickets_updated_at", "updated_at"),
+        Index(
+            "ft_tickets_title_description",
+            "title",
+            "description",
+            mysql_prefix="FULLTEXT",
+        ).ddl_if(dialect="mysql"),
+        Index("ft_tickets_title", "title", mysql_prefix="FULLTEXT").ddl_if(
+            dialect="mysql"
+        ),
+    )
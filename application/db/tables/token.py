@@ -11,5 +11,8 @@ class Token(Base):
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     account_id = mapped_column(ForeignKey("accounts.id"))
     refresh_token = Column(String(450), nullable=False)
+    # sha256 hex digest of refresh_token; lookups go through this unique index
+    # since the token itself is too wide to index usefully.
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)
     revoked = Column(Boolean, default=False)
     expires_at = Column(DateTime)
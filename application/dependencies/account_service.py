@@ -1,5 +1,5 @@
 from fastapi import Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from dependencies.session import get_db
 from repositories.account_repository import AccountRepository
@@ -7,7 +7,7 @@ from repositories.ticket_repository import TicketRepository
 from services.account_services import AccountService
 
 
-def get_account_service(db: Session = Depends(get_db)) -> AccountService:
+def get_account_service(db: AsyncSession = Depends(get_db)) -> AccountService:
     account_repository = AccountRepository(db)
     ticket_repository = TicketRepository(db)
     return AccountService(account_repository, ticket_repository)
@@ -1,23 +1,46 @@
+import asyncio
+import logging
+
 from fastapi import Depends
-from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
 from core.settings import settings
+from db.pool import InstrumentedQueuePool
 
-engine = create_engine(settings.database_url, future=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-# engine = create_engine(settings.database_url)
-# engine = create_engine(settings.async_database_url)
-# AsyncSessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+engine = create_async_engine(
+    settings.async_database_url,
+    echo=settings.DB_ECHO_LOG,
+    future=True,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
 
 
 async def get_db():
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+def get_session_factory() -> async_sessionmaker:
+    """For responses that query while streaming their body.
+
+    A get_db session is closed once the route returns, before a
+    StreamingResponse body runs, so such routes open their own session
+    from this factory inside the body generator.
+    """
+    return AsyncSessionLocal
 
 
 def get_repository(repository):
@@ -25,3 +48,21 @@ def get_repository(repository):
         return repository(session)
 
     return _get_repository
+
+
+def pool_stats(_engine: AsyncEngine = engine) -> dict:
+    return _engine.pool.stats()
+
+
+async def warm_up_pool(_engine: AsyncEngine = engine) -> None:
+    """Open pool_size connections up front so early requests don't pay for it."""
+    results = await asyncio.gather(
+        *(_engine.connect() for _ in range(settings.DB_POOL_SIZE)),
+        return_exceptions=True,
+    )
+    errors = [result for result in results if isinstance(result, Exception)]
+    for result in results:
+        if not isinstance(result, Exception):
+            await result.close()
+    if errors:
+        logging.warning("Database pool warm-up failed: %s", errors[0])
@@ -1,22 +1,47 @@
+import asyncio
 import logging
-import os
 import time
-from logging.handlers import RotatingFileHandler
+import uuid
 
 from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 from api.user import routes as account_routes
 from api.staff import routes as staff_routes
 from api.ticket import routes as ticket_routes
+from core.account_cache import account_summary_cache
+from core.auth import password_pool_stats
+from core.auth_bearer import jwt_cache
+from core.compression import CompressionMiddleware, compression_stats
+from core.events import event_broker
+from core.logging_config import access_logger, configure_logging, should_log_access
+from core.metrics import (
+    metrics,
+    register_cache_metrics,
+    register_pool_metrics,
+    route_template,
+)
+from core.query_stats import start_query_stats
+from core.responses import default_response_class
 from core.settings import settings
 from db.base_class import Base
-from dependencies.session import engine
+from dependencies.session import (
+    AsyncSessionLocal,
+    engine,
+    pool_stats,
+    warm_up_pool,
+)
+from repositories.search_repository import SearchRepository, uses_memory_index
+from repositories.ticket_repository import ticket_cache, ticket_count_cache
 
-app = FastAPI(title="User Management", version="0.0.1")
+app = FastAPI(
+    title="User Management",
+    version="0.0.1",
+    default_response_class=default_response_class(),
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -24,6 +49,13 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        content_types=settings.COMPRESSION_CONTENT_TYPES.split(","),
+        preference=settings.COMPRESSION_ENCODINGS.split(","),
+    )
 
 
 def include_app(_app):
@@ -32,44 +64,137 @@ def include_app(_app):
     _app.include_router(ticket_routes.router, tags=["ticket"], prefix="/api")
 
 
-def create_tables():  # new
-    Base.metadata.create_all(engine)
+register_pool_metrics(pool_stats)
+register_cache_metrics(
+    {
+        "jwt": jwt_cache.stats,
+        "account_summary": account_summary_cache.stats,
+        "ticket_thread": ticket_cache.stats,
+        "ticket_count": ticket_count_cache.stats,
+    }
+)
+metrics.register(
+    "response_compression_bytes_in_total",
+    "counter",
+    "Response bytes before compression, by encoding.",
+    lambda: compression_stats.samples("bytes_in"),
+)
+metrics.register(
+    "response_compression_bytes_out_total",
+    "counter",
+    "Response bytes after compression, by encoding.",
+    lambda: compression_stats.samples("bytes_out"),
+)
+metrics.register(
+    "sse_subscribers",
+    "gauge",
+    "Open Server-Sent Events streams in this process.",
+    lambda: [({}, event_broker.stats()["subscribers"])],
+)
+metrics.register(
+    "password_hash_in_flight",
+    "gauge",
+    "Password hash jobs running or queued.",
+    lambda: [({}, password_pool_stats()["in_flight"])],
+)
+metrics.register(
+    "password_hash_queued",
+    "gauge",
+    "Password hash jobs waiting for a worker.",
+    lambda: [({}, password_pool_stats()["queued"])],
+)
+
+
+async def create_tables():  # new
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    # Connections opened here belong to this short-lived loop, not uvicorn's.
+    await engine.dispose()
+
+
+@app.on_event("startup")
+async def warm_up_database():
+    if settings.DB_POOL_WARMUP:
+        await warm_up_pool()
+
+
+@app.on_event("startup")
+async def build_search_index():
+    # MySQL keeps its FULLTEXT indexes itself; the in-process index starts empty.
+    if settings.SEARCH_REBUILD_ON_STARTUP and uses_memory_index(engine.dialect.name):
+        async with AsyncSessionLocal() as session:
+            indexed = await SearchRepository(session).rebuild_index()
+        logging.info("Search index built with %d tickets", indexed)
+
+
+@app.on_event("startup")
+async def start_event_broker():
+    await event_broker.start()
+
+
+@app.on_event("shutdown")
+async def stop_event_broker():
+    await event_broker.stop()
 
 
 @app.middleware("http")
 async def middleware(request: Request, call_next):
-    start_time = time.time()
+    start_time = time.perf_counter()
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    query_stats = start_query_stats(request_id)
+    status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+    metrics.in_flight += 1
     try:
-        logging.info(f"Request: {request.method} {request.url}")
         response = await call_next(request)
+        status_code = response.status_code
+        response.headers["Server-Timing"] = query_stats.server_timing(
+            time.perf_counter() - start_time
+        )
+        response.headers["X-Request-ID"] = request_id
         return response
     except Exception as err:
-        logging.info(f"Request: {request.url} failed - Details: {err} ")
+        status_code = status.HTTP_400_BAD_REQUEST
+        logger.info("Request: %s failed - Details: %s", request.url, err)
         return JSONResponse(status_code=400, content={"message": err})
     finally:
-        process_time = time.time() - start_time
-        logging.info(f"Request: {request.url} finished in {process_time}")
-
+        process_time = time.perf_counter() - start_time
+        metrics.in_flight -= 1
+        route = route_template(request)
+        metrics.observe(request.method, route, status_code, process_time)
+        if should_log_access(status_code, process_time):
+            access_logger.info(
+                "%s %s %s %.1fms",
+                request.method,
+                request.url.path,
+                status_code,
+                process_time * 1000,
+                extra={
+                    "request_id": request_id,
+                    "method": request.method,
+                    "route": route,
+                    "path": request.url.path,
+                    "status": status_code,
+                    "duration_ms": round(process_time * 1000, 3),
+                    "queries": query_stats.count,
+                },
+            )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
 
-if not os.path.exists("logs"):
-    os.makedirs("logs")
 
-# Logging configuration
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        RotatingFileHandler("logs/app.log", maxBytes=100000, backupCount=10),
-        logging.StreamHandler(),
-    ],
-)
+configure_logging()
 
 logger = logging.getLogger(__name__)
 
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    logger.error(f"Unhandled exception occurred: {exc}", exc_info=True)
+    logger.error("Unhandled exception occurred: %s", exc, exc_info=True)
     errors = [{"field": e["loc"][1], "error": e["msg"]} for e in exc.errors()]
     return JSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -79,7 +204,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 
 @app.exception_handler(Exception)
 async def generic_exception_handler(request: Request, exc: Exception):
-    logger.error(f"Unhandled exception occurred: {exc}", exc_info=True)
+    logger.error("Unhandled exception occurred: %s", exc, exc_info=True)
     return JSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={"detail": "An unexpected error occurred."},
@@ -88,7 +213,7 @@ async def generic_exception_handler(request: Request, exc: Exception):
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
-    logger.error(f"Unhandled exception occurred: {exc}", exc_info=True)
+    logger.error("Unhandled exception occurred: %s", exc, exc_info=True)
     return JSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail},
@@ -97,7 +222,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
 
 @app.exception_handler(IntegrityError)
 async def integrity_error_handler(request: Request, exc: IntegrityError):
-    logger.error(f"Unhandled exception occurred: {exc}", exc_info=True)
+    logger.error("Unhandled exception occurred: %s", exc, exc_info=True)
     return JSONResponse(
         status_code=status.HTTP_400_BAD_REQUEST,
         content={"detail": "Data integrity error."},
@@ -106,7 +231,7 @@ async def integrity_error_handler(request: Request, exc: IntegrityError):
 
 @app.exception_handler(SQLAlchemyError)
 async def sqlalchemy_error_handler(request: Request, exc: SQLAlchemyError):
-    logger.error(f"Unhandled exception occurred: {exc}", exc_info=True)
+    logger.error("Unhandled exception occurred: %s", exc, exc_info=True)
     return JSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={"detail": "Database error."},
@@ -115,7 +240,7 @@ async def sqlalchemy_error_handler(request: Request, exc: SQLAlchemyError):
 
 if __name__ == "__main__":
     include_app(app)
-    create_tables()
+    asyncio.run(create_tables())
     import uvicorn
 
     uvicorn.run(app, host="0.0.0.0", port=settings.APP_PORT)
@@ -1,10 +1,18 @@
 import datetime
 import logging
+from typing import Dict, Iterable, Optional
 
 from fastapi import HTTPException, status
+from sqlalchemy import select, update
 from sqlalchemy.exc import SQLAlchemyError
 
-from core.auth import get_hashed_password
+from core.account_cache import (
+    AccountSummary,
+    forget_account,
+    get_cached_account,
+    remember_account,
+)
+from core.auth import hash_password, hash_token
 from core.errors_handler import ErrorMessage, ApiStatusMessage
 from db.tables.account import Account
 from db.tables.token import Token
@@ -18,17 +26,15 @@ class AccountRepository:
     async def create_account(self, request: AccountCreateSchema):
         try:
             user_name = request.username
-            account = (
-                self.session.query(Account)
-                .filter(Account.user_name == user_name)
-                .first()
+            result = await self.session.execute(
+                select(Account.id).where(Account.user_name == user_name)
             )
-            if account:
+            if result.first():
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=ErrorMessage.ACCOUNT_EXISTED.value,
                 )
-            encrypted_password = get_hashed_password(request.password)
+            encrypted_password = await hash_password(request.password)
             new_account = Account(
                 user_name=user_name,
                 email=request.email,
@@ -36,68 +42,116 @@ class AccountRepository:
                 is_admin=request.isAdmin,
             )
             self.session.add(new_account)
-            self.session.commit()
+            await self.session.commit()
             return ShowAccountSchema(
                 username=user_name,
                 email=request.email,
                 isAdmin=request.isAdmin,
             )
+        except HTTPException:
+            raise
         except SQLAlchemyError as err:
             err = str(err.__dict__["orig"])
-            self.session.rollback()
-            logging.error(f"{err}")
+            await self.session.rollback()
+            logging.error("%s", err)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=err
             )
         except Exception as e:
-            self.session.rollback()
-            logging.info(f"{str(e)}")
+            await self.session.rollback()
+            logging.info("%s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=str(e),
             )
 
-    async def update_account(self, account_id: str, request):
-        pass
+    async def update_account(self, account_id: int, values: dict):
+        """Update account columns (e.g. ``{"is_admin": False}``) and drop the
+        cached summary, so this worker sees the change on its next request."""
+        try:
+            await self.session.execute(
+                update(Account).where(Account.id == account_id).values(**values)
+            )
+            await self.session.commit()
+            forget_account(int(account_id))
+        except SQLAlchemyError as err:
+            await self.session.rollback()
+            err = str(err.__dict__["orig"])
+            logging.error("%s", err)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=err
+            )
 
-    async def delete_account(self, account_id: str):
+    async def delete_account(self, account_id: int):
         try:
+            forget_account(int(account_id))
             return {"message": ApiStatusMessage.SUCCESS.value}
         except SQLAlchemyError as err:
-            self.session.rollback()
+            await self.session.rollback()
             err = str(err.__dict__["orig"])
-            logging.error(f"{err}")
+            logging.error("%s", err)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=err
             )
 
     async def get_account(self, account_id) -> Account:
-        return self.session.query(Account).filter(Account.id == account_id).first()
+        result = await self.session.execute(
+            select(Account).where(Account.id == account_id)
+        )
+        return result.scalars().first()
+
+    async def get_account_summary(self, account_id) -> Optional[AccountSummary]:
+        summary = get_cached_account(account_id)
+        if summary is not None:
+            return summary
+        result = await self.session.execute(
+            select(Account.user_name, Account.is_admin).where(Account.id == account_id)
+        )
+        account = result.first()
+        if account is None:
+            return None
+        return remember_account(account_id, account.user_name, account.is_admin)
+
+    async def get_account_ids(self, user_names: Iterable[str]) -> Dict[str, int]:
+        """Map user names to account ids in one query; unknown names are left out."""
+        try:
+            result = await self.session.execute(
+                select(Account.user_name, Account.id).where(
+                    Account.user_name.in_(set(user_names))
+                )
+            )
+            return dict(result.all())
+        except SQLAlchemyError as err:
+            err = str(err.__dict__["orig"])
+            logging.error("%s", err)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=err
+            )
 
     async def get_user_by_username_or_email(self, username_or_email):
         try:
-            account = (
-                self.session.query(Account)
-                .filter(
+            result = await self.session.execute(
+                select(Account).where(
                     (Account.user_name == username_or_email)
                     | (Account.email == username_or_email)
                 )
-                .first()
             )
+            account = result.scalars().first()
+            remember_account(account.id, account.user_name, account.is_admin)
             account.last_login = datetime.datetime.utcnow()
             self.session.add(account)
-            self.session.commit()
+            await self.session.commit()
             return account
         except SQLAlchemyError as err:
             err = str(err.__dict__["orig"])
-            self.session.rollback()
-            logging.error(f"{err}")
+            await self.session.rollback()
+            logging.error("%s", err)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=err
             )
         except Exception as e:
-            logging.info(f"{str(e)}")
-            self.session.rollback()
+            logging.info("%s", e)
+            await self.session.rollback()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=str(e),
@@ -108,21 +162,24 @@ class AccountRepository:
     ):
         try:
             new_refresh_token = Token(
-                account_id=account_id, refresh_token=token, expires_at=expires_at
+                account_id=account_id,
+                refresh_token=token,
+                token_hash=hash_token(token),
+                expires_at=expires_at,
             )
             self.session.add(new_refresh_token)
-            self.session.commit()
+            await self.session.commit()
             return new_refresh_token
         except SQLAlchemyError as err:
-            self.session.rollback()
+            await self.session.rollback()
             err = str(err.__dict__["orig"])
-            logging.error(f"{err}")
+            logging.error("%s", err)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=err
             )
         except Exception as e:
-            self.session.rollback()
-            logging.info(f"{str(e)}")
+            await self.session.rollback()
+            logging.info("%s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=str(e),
@@ -130,9 +187,12 @@ class AccountRepository:
 
     async def get_refresh_token(self, token: str):
         try:
-            return self.session.query(Token).filter(Token.token == token).first()
+            result = await self.session.execute(
+                select(Token).where(Token.token_hash == hash_token(token))
+            )
+            return result.scalars().first()
         except Exception as e:
-            logging.info(f"{str(e)}")
+            logging.info("%s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=str(e),
@@ -140,20 +200,20 @@ class AccountRepository:
 
     async def revoke_refresh_token(self, token: str):
         try:
-            db_token = self.get_refresh_token(token)
+            db_token = await self.get_refresh_token(token)
             if db_token:
                 db_token.revoked = True
-                self.session.commit()
+                await self.session.commit()
         except SQLAlchemyError as err:
-            self.session.rollback()
+            await self.session.rollback()
             err = str(err.__dict__["orig"])
-            logging.error(f"{err}")
+            logging.error("%s", err)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=err
             )
         except Exception as e:
-            self.session.rollback()
-            logging.info(f"{str(e)}")
+            await self.session.rollback()
+            logging.info("%s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=str(e),
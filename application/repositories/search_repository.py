@@ -0,0 +1,126 @@
+import logging
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select, union_all
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.exc import SQLAlchemyError
+
+from core.search import TITLE_WEIGHT, search_index
+from core.settings import settings
+from db.tables.reply import Reply
+from db.tables.ticket import Ticket
+
+
+def uses_memory_index(dialect_name: str) -> bool:
+    """SEARCH_BACKEND=auto: FULLTEXT on MySQL, the in-process index elsewhere."""
+    if settings.SEARCH_BACKEND == "auto":
+        return dialect_name != "mysql"
+    return settings.SEARCH_BACKEND == "memory"
+
+
+class SearchRepository:
+    """Ticket search over title, description and reply content.
+
+    On MySQL it queries the FULLTEXT indexes, which the database keeps
+    current. Otherwise it reads core.search.search_index, which the write
+    paths of TicketRepository keep current through the ``*_written`` hooks.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    @property
+    def memory_index(self) -> bool:
+        return uses_memory_index(self.session.get_bind().dialect.name)
+
+    def ticket_written(
+        self, ticket_id: int, owner_id: int, title: str, description: Optional[str]
+    ) -> None:
+        if self.memory_index:
+            search_index.add_ticket(ticket_id, owner_id, title, description)
+
+    def reply_written(
+        self, ticket_id: int, content: Optional[str], old_content: Optional[str] = None
+    ) -> None:
+        if self.memory_index:
+            search_index.remove_text(ticket_id, old_content)
+            search_index.add_text(ticket_id, content)
+
+    def reply_deleted(self, ticket_id: int, content: Optional[str]) -> None:
+        if self.memory_index:
+            search_index.remove_text(ticket_id, content)
+
+    async def search_tickets(
+        self, query: str, owner_id: Optional[int], limit: int, offset: int
+    ) -> Tuple[List[Tuple[int, float]], int]:
+        """Ranked ``(ticket_id, score)`` for one page and the total match count.
+
+        ``owner_id`` restricts the search to one author's tickets.
+        """
+        try:
+            if self.memory_index:
+                return search_index.search(query, owner_id, limit, offset)
+            return await self._search_fulltext(query, owner_id, limit, offset)
+        except SQLAlchemyError as err:
+            err = str(err.__dict__["orig"])
+            logging.error("%s", err)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=err
+            )
+
+    async def _search_fulltext(self, query, owner_id, limit, offset):
+        ticket_match = match(Ticket.title, Ticket.description, against=query)
+        title_match = match(Ticket.title, against=query)
+        reply_match = match(Reply.content, against=query)
+        ticket_hits = select(
+            Ticket.id.label("ticket_id"),
+            (ticket_match + title_match * (TITLE_WEIGHT - 1)).label("score"),
+        ).where(ticket_match)
+        reply_hits = select(
+            Reply.ticket_id.label("ticket_id"), reply_match.label("score")
+        ).where(reply_match)
+        if owner_id is not None:
+            ticket_hits = ticket_hits.where(Ticket.created_by_id == owner_id)
+            reply_hits = reply_hits.join(Ticket, Ticket.id == Reply.ticket_id).where(
+                Ticket.created_by_id == owner_id
+            )
+        hits = union_all(ticket_hits, reply_hits).subquery()
+        ranked = (
+            select(hits.c.ticket_id, func.sum(hits.c.score).label("score"))
+            .group_by(hits.c.ticket_id)
+            .subquery()
+        )
+        total = await self.session.scalar(select(func.count()).select_from(ranked))
+        result = await self.session.execute(
+            select(ranked.c.ticket_id, ranked.c.score)
+            .order_by(ranked.c.score.desc(), ranked.c.ticket_id.desc())
+            .limit(limit)
+            .offset(offset)
+        )
+        return [(row.ticket_id, float(row.score)) for row in result.all()], total
+
+    async def rebuild_index(self, batch_size: int = 1000) -> int:
+        """Load every ticket and reply into the in-process index.
+
+        Streams both tables so memory holds one batch of rows at a time.
+        Returns the number of tickets indexed.
+        """
+        search_index.clear()
+        result = await self.session.stream(
+            select(
+                Ticket.id, Ticket.created_by_id, Ticket.title, Ticket.description
+            ).execution_options(yield_per=batch_size)
+        )
+        async for ticket in result:
+            search_index.add_ticket(
+                ticket.id, ticket.created_by_id, ticket.title, ticket.description
+            )
+        result = await self.session.stream(
+            select(Reply.ticket_id, Reply.content).execution_options(
+                yield_per=batch_size
+            )
+        )
+        async for reply in result:
+            search_index.add_text(reply.ticket_id, reply.content)
+        return len(search_index)
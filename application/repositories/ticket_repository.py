@@ -1,185 +1,817 @@
+import datetime
+import json
 import logging
-from typing import Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 from fastapi import HTTPException, status
+from sqlalchemy import case, func, insert, or_, select, text, update
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import aliased
 
+from core.cache import TTLCache, create_cache_backend
 from core.date_utils import DateUtils
 from core.errors_handler import ErrorMessage
+from core.events import STAFF_INBOX, event_broker, ticket_channel
+from core.pagination import encode_cursor, keyset_before
+from core.settings import settings
 from db.tables.account import Account
 from db.tables.reply import Reply
 from db.tables.ticket import Ticket
+from repositories.account_repository import AccountRepository
+from repositories.search_repository import SearchRepository
 from schemas.reply_schema import ReplySchema
-from schemas.ticket_schema import TicketSchema
+from schemas.ticket_schema import (
+    TicketSchema,
+    TicketSort,
+    TotalStrategy,
+)
+
+# Ticket totals keyed by author id, or ALL_TICKETS for the staff listing. Kept
+# current by create_ticket in this process; the TTL bounds drift from writes
+# made by other workers.
+ALL_TICKETS = "all"
+ticket_count_cache = TTLCache(
+    maxsize=settings.TICKET_COUNT_CACHE_SIZE, ttl=settings.TICKET_COUNT_CACHE_TTL
+)
+# Serialized ticket threads (ticket + replies + owner id) for the detail view.
+# Every reply write drops the thread's entry and records the ticket's new
+# version under thread_version_key; an entry older than that is never served,
+# so a reader that loaded the thread just before the write cannot put a
+# stale copy back.
+ticket_cache = create_cache_backend(
+    maxsize=settings.TICKET_CACHE_SIZE, ttl=settings.TICKET_CACHE_TTL
+)
+# Outlives any thread entry set while the write was in flight.
+THREAD_VERSION_TTL = 2 * settings.TICKET_CACHE_TTL
+
+
+def thread_cache_key(ticket_id: int) -> str:
+    return f"ticket:{ticket_id}:thread"
+
+
+def thread_version_key(ticket_id: int) -> str:
+    return f"ticket:{ticket_id}:version"
+
+
+async def get_cached_threads(ticket_ids: List[int]) -> Tuple[Dict[int, dict], dict]:
+    """Cached threads that are current, and the version markers seen.
+
+    An entry is skipped when it predates versions or is older than the
+    ticket's marker. Both keys of every ticket come back in one get_many.
+    A marker that is not a version is dropped with its entry, so the
+    thread is reloaded rather than failing every read until it expires.
+    """
+    keys = []
+    for ticket_id in ticket_ids:
+        keys += [thread_cache_key(ticket_id), thread_version_key(ticket_id)]
+    cached = await ticket_cache.get_many(keys)
+    threads, versions = {}, {}
+    for ticket_id in ticket_ids:
+        marker = cached.get(thread_version_key(ticket_id))
+        try:
+            versions[ticket_id] = int(marker) if marker is not None else 0
+        except (TypeError, ValueError):
+            logging.warning("Bad thread version marker for %s: %r", ticket_id, marker)
+            versions[ticket_id] = 0
+            await ticket_cache.delete(thread_version_key(ticket_id))
+            await ticket_cache.delete(thread_cache_key(ticket_id))
+            continue
+        value = cached.get(thread_cache_key(ticket_id))
+        if value is None:
+            continue
+        thread = json.loads(value)
+        if "version" in thread and thread["version"] >= versions[ticket_id]:
+            threads[ticket_id] = thread
+    return threads, versions
+
+
+async def cache_thread(ticket_id: int, thread: dict, known_version: int) -> None:
+    """Store a loaded thread unless a write newer than it is already known."""
+    if thread["version"] >= known_version:
+        await ticket_cache.set(thread_cache_key(ticket_id), json.dumps(thread))
+
+
+async def expire_thread(ticket_id: int, version: int) -> None:
+    """After a reply write commits: mark ``version`` current, drop the entry."""
+    if not isinstance(version, int) or isinstance(version, bool):
+        raise TypeError(f"thread version must be an int, not {version!r}")
+    await ticket_cache.set(
+        thread_version_key(ticket_id), str(version), ttl=THREAD_VERSION_TTL
+    )
+    await ticket_cache.delete(thread_cache_key(ticket_id))
+
+
+def thread_entry(row, ticket: dict) -> dict:
+    """What ticket_cache holds per thread: the response plus what is needed
+    to authorise it and to build its ETag."""
+    return {
+        "createdById": row.created_by_id,
+        "version": row.version,
+        "updatedAt": row.updated_at.isoformat(),
+        "ticket": ticket,
+    }
+
+
+# Bulk projections from result rows straight to response dicts. They skip
+# per-row pydantic construction and must produce exactly what
+# TicketSchema/ReplySchema.model_dump() would, keys in field order.
+def project_ticket(row, replies: Optional[list] = None) -> dict:
+    return {
+        "ticketId": row.id,
+        "title": row.title,
+        "description": row.description,
+        "createdDate": DateUtils.format_full_datetime(row.created_date),
+        "createdBy": row.user_name,
+        "replies": [] if replies is None else replies,
+    }
+
+
+def project_ticket_summary(row) -> dict:
+    """project_ticket plus the activity summary, as TicketSummarySchema."""
+    ticket = project_ticket(row)
+    ticket["replyCount"] = row.reply_count
+    ticket["lastReplyDate"] = (
+        DateUtils.format_full_datetime(row.last_reply_at)
+        if row.last_reply_at is not None
+        else None
+    )
+    ticket["lastReplyBy"] = row.last_reply_by
+    ticket["lastActivityDate"] = DateUtils.format_full_datetime(row.last_activity_at)
+    return ticket
+
+
+def project_reply(row, ticket_id: int) -> dict:
+    return {
+        "replyId": row.id,
+        "ticketId": ticket_id,
+        "content": row.content,
+        "createdBy": row.user_name,
+        "createdDate": DateUtils.format_full_datetime(row.created_at),
+    }
+
+
+# Ticket columns that summarise its replies; see recomputed_activity.
+ACTIVITY_COLUMNS = (
+    "reply_count",
+    "last_reply_at",
+    "last_reply_by_id",
+    "last_activity_at",
+)
+
+
+def _newest_reply(column, excluding: Optional[int] = None):
+    """``column`` of the newest reply of the ticket row being read or updated."""
+    query = select(column).where(Reply.ticket_id == Ticket.id)
+    if excluding is not None:
+        query = query.where(Reply.id != excluding)
+    return (
+        query.order_by(Reply.created_at.desc(), Reply.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def recomputed_activity(excluding: Optional[int] = None) -> dict:
+    """ACTIVITY_COLUMNS as correlated subqueries over the ticket's replies,
+    optionally leaving one reply out; each reads ix_replies_ticket_id_created_at.
+    """
+    count = select(func.count(Reply.id)).where(Reply.ticket_id == Ticket.id)
+    if excluding is not None:
+        count = count.where(Reply.id != excluding)
+    last_reply_at = _newest_reply(Reply.created_at, excluding)
+    return {
+        "reply_count": count.scalar_subquery(),
+        "last_reply_at": last_reply_at,
+        "last_reply_by_id": _newest_reply(Reply.created_by_id, excluding),
+        "last_activity_at": func.coalesce(last_reply_at, Ticket.created_date),
+    }
 
 
 class TicketRepository:
     def __init__(self, session):
         self.session = session
+        self.accounts = AccountRepository(session)
+        self.search = SearchRepository(session)
+
+    async def _get_account_name(self, account_id: int) -> Optional[str]:
+        summary = await self.accounts.get_account_summary(account_id)
+        return summary.user_name if summary else None
 
     async def create_ticket(self, account_id, ticket_data):
         try:
             new_ticket = Ticket(**ticket_data.dict(), created_by_id=account_id)
-            (account_name,) = (
-                self.session.query(Account.user_name)
-                .filter(Account.id == account_id)
-                .first()
-            )
+            account_name = await self._get_account_name(account_id)
             self.session.add(new_ticket)
-            self.session.commit()
-            self.session.refresh(new_ticket)
-            return TicketSchema(
+            await self.session.commit()
+            ticket_count_cache.incr(account_id)
+            ticket_count_cache.incr(ALL_TICKETS)
+            self.search.ticket_written(
+                new_ticket.id, account_id, new_ticket.title, new_ticket.description
+            )
+            ticket = TicketSchema(
                 ticketId=new_ticket.id,
                 title=new_ticket.title,
                 description=new_ticket.description,
                 createdDate=DateUtils.full_datetime_to_str(new_ticket.created_date),
                 createdBy=account_name,
             )
+            await event_broker.publish(
+                [STAFF_INBOX], "ticket.created", ticket.model_dump()
+            )
+            return ticket
         except SQLAlchemyError as err:
-            self.session.rollback()
+            await self.session.rollback()
             err = str(err.__dict__["orig"])
-            logging.error(f"{err}")
+            logging.error("%s", err)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=err
             )
         except Exception as e:
-            self.session.rollback()
-            logging.info(f"{str(e)}")
+            await self.session.rollback()
+            logging.info("%s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=str(e),
             )
 
+    async def insert_tickets(self, rows: List[dict]) -> Dict[int, str]:
+        """Insert ticket rows (column values) as one batch and commit.
+
+        The batch goes in as a single executemany; if that fails it is
+        retried row by row, so a bad row only fails itself. Returns the
+        errors keyed by position in ``rows``.
+        """
+        errors = {}
+        try:
+            ids = await self._insert_ticket_rows(rows)
+            await self.session.commit()
+            inserted = list(zip(ids, rows))
+        except SQLAlchemyError as err:
+            await self.session.rollback()
+            logging.warning("Ticket batch insert failed, retrying per row: %s", err)
+            inserted = []
+            for position, row in enumerate(rows):
+                try:
+                    ids = await self._insert_ticket_rows([row])
+                    await self.session.commit()
+                    inserted.extend(zip(ids, [row]))
+                except SQLAlchemyError as row_err:
+                    await self.session.rollback()
+                    errors[position] = str(getattr(row_err, "orig", None) or row_err)
+
+        for ticket_id, row in inserted:
+            ticket_count_cache.incr(row["created_by_id"])
+            if ticket_id is not None:
+                self.search.ticket_written(
+                    ticket_id, row["created_by_id"], row["title"], row["description"]
+                )
+        ticket_count_cache.incr(ALL_TICKETS, len(inserted))
+        return errors
+
+    async def _insert_ticket_rows(self, rows: List[dict]) -> list:
+        """Execute the insert; returns the new ids in row order when the
+        in-process search index needs them, otherwise one None per row.
+
+        MySQL has no INSERT ... RETURNING, but there the FULLTEXT indexes
+        need no ids.
+        """
+        statement = insert(Ticket)
+        dialect = self.session.get_bind().dialect
+        if not (self.search.memory_index and dialect.insert_returning):
+            await self.session.execute(statement, rows)
+            return [None] * len(rows)
+        result = await self.session.execute(
+            statement.returning(Ticket.id, sort_by_parameter_order=True), rows
+        )
+        return result.scalars().all()
+
     async def get_ticket(self, ticket_id):
         try:
-            return self.session.query(Ticket).filter(Ticket.id == ticket_id).first()
+            result = await self.session.execute(
+                select(Ticket).where(Ticket.id == ticket_id)
+            )
+            return result.scalars().first()
         except SQLAlchemyError as err:
-            self.session.rollback()
+            await self.session.rollback()
             err = str(err.__dict__["orig"])
-            logging.error(f"{err}")
+            logging.error("%s", err)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=err
             )
         except Exception as e:
-            logging.info(f"{str(e)}")
+            logging.info("%s", e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e),
+            )
+
+    async def get_ticket_details(
+        self,
+        ticket_id: int,
+        with_replies: bool = True,
+        min_version: int = 0,
+    ) -> Tuple[dict, dict]:
+        """A ticket with its replies, newest first, and its version.
+
+        The ticket is a dict in TicketDetailSchema's dumped shape, taken
+        from the cached thread as is; see json_response.
+
+        Without ``with_replies`` the full thread is neither loaded nor
+        cached, though a cached one still saves the ticket query. A cached
+        thread older than ``min_version`` is reloaded. The version is
+        ``{"createdById", "version", "updatedAt"}`` as returned by
+        get_ticket_version; the caller authorises the read with it.
+        """
+        try:
+            threads, versions = await get_cached_threads([ticket_id])
+            thread = threads.get(ticket_id)
+            if thread is None or thread["version"] < min_version:
+                if not with_replies:
+                    thread = await self._load_ticket_header(ticket_id)
+                else:
+                    thread = await self._load_thread(ticket_id)
+                    if thread is not None:
+                        await cache_thread(ticket_id, thread, versions[ticket_id])
+            if thread is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=ErrorMessage.TICKET_NOT_FOUND.value,
+                )
+            version = {
+                "createdById": thread["createdById"],
+                "version": thread["version"],
+                "updatedAt": datetime.datetime.fromisoformat(thread["updatedAt"]),
+            }
+            return thread["ticket"], version
+        except HTTPException:
+            raise
+        except Exception as e:
+            logging.info("%s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=str(e),
             )
 
-    async def get_ticket_details(self, ticket_id: int, account_id: int):
+    async def _load_ticket_header(self, ticket_id: int) -> Optional[dict]:
+        """Like _load_thread, without the replies."""
+        result = await self.session.execute(
+            select(
+                Ticket.id,
+                Ticket.title,
+                Ticket.description,
+                Ticket.created_by_id,
+                Ticket.created_date,
+                Ticket.version,
+                Ticket.updated_at,
+                Account.user_name,
+            ).where(Ticket.id == ticket_id, Account.id == Ticket.created_by_id)
+        )
+        ticket = result.first()
+        if ticket is None:
+            return None
+        return thread_entry(ticket, project_ticket(ticket))
+
+    async def get_ticket_version(self, ticket_id: int) -> Optional[dict]:
+        """``{"createdById", "version", "updatedAt"}`` by primary key only,
+        so conditional requests can be answered without loading the thread."""
         try:
-            ticket = (
-                self.session.query(
+            result = await self.session.execute(
+                select(
+                    Ticket.created_by_id, Ticket.version, Ticket.updated_at
+                ).where(Ticket.id == ticket_id)
+            )
+            ticket = result.first()
+            if ticket is None:
+                return None
+            return {
+                "createdById": ticket.created_by_id,
+                "version": ticket.version,
+                "updatedAt": ticket.updated_at,
+            }
+        except Exception as e:
+            logging.info("%s", e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e),
+            )
+
+    async def get_ticket_owner_id(self, ticket_id: int) -> Optional[int]:
+        """The ticket's author id, or None if there is no such ticket."""
+        try:
+            cached = await ticket_cache.get(thread_cache_key(ticket_id))
+            if cached is not None:
+                return json.loads(cached)["createdById"]
+            header = await self._load_ticket_header(ticket_id)
+            return header["createdById"] if header else None
+        except Exception as e:
+            logging.info("%s", e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e),
+            )
+
+    async def _load_thread(self, ticket_id: int) -> Optional[dict]:
+        """Load a ticket and its replies in the shape stored in ticket_cache."""
+        return (await self._load_threads([ticket_id])).get(ticket_id)
+
+    async def _load_threads(self, ticket_ids: List[int]) -> Dict[int, dict]:
+        """Load several threads with two queries; missing ids are left out."""
+        result = await self.session.execute(
+            select(
+                Ticket.id,
+                Ticket.title,
+                Ticket.description,
+                Ticket.created_by_id,
+                Ticket.created_date,
+                Ticket.version,
+                Ticket.updated_at,
+                Account.user_name,
+            ).where(
+                Ticket.id.in_(ticket_ids),
+                Account.id == Ticket.created_by_id,
+            )
+        )
+        tickets = result.all()
+        if not tickets:
+            return {}
+
+        result = await self.session.execute(
+            select(
+                Reply.id,
+                Reply.ticket_id,
+                Reply.content,
+                Reply.created_by_id,
+                Reply.created_at,
+                Account.user_name,
+            )
+            .where(
+                Reply.ticket_id.in_([ticket.id for ticket in tickets]),
+                Account.id == Reply.created_by_id,
+            )
+            .order_by(Reply.ticket_id, Reply.created_at.desc(), Reply.id.desc())
+        )
+        replies = {ticket.id: [] for ticket in tickets}
+        for reply in result.all():
+            replies[reply.ticket_id].append(project_reply(reply, reply.ticket_id))
+        return {
+            ticket.id: thread_entry(ticket, project_ticket(ticket, replies[ticket.id]))
+            for ticket in tickets
+        }
+
+    async def get_ticket_details_batch(
+        self, ticket_ids: List[int], account_id: int, is_staff: bool
+    ) -> dict:
+        """Threads for several tickets, read through ticket_cache.
+
+        Cache misses are loaded together (two queries in all). The owner or
+        staff check runs per ticket; a failing id lands in ``errors`` with
+        the status and detail the single-ticket endpoint would give.
+        """
+        try:
+            ticket_ids = list(dict.fromkeys(ticket_ids))
+            threads, versions = await get_cached_threads(ticket_ids)
+            missing = [ticket_id for ticket_id in ticket_ids if ticket_id not in threads]
+            if missing:
+                loaded = await self._load_threads(missing)
+                for ticket_id, thread in loaded.items():
+                    await cache_thread(ticket_id, thread, versions[ticket_id])
+                threads.update(loaded)
+
+            response = {"data": {}, "errors": {}}
+            for ticket_id in ticket_ids:
+                thread = threads.get(ticket_id)
+                if thread is None:
+                    error = (
+                        status.HTTP_404_NOT_FOUND,
+                        ErrorMessage.TICKET_NOT_FOUND.value,
+                    )
+                elif not is_staff and thread["createdById"] != account_id:
+                    error = (
+                        status.HTTP_403_FORBIDDEN,
+                        ErrorMessage.Permission_Error.value,
+                    )
+                else:
+                    response["data"][str(ticket_id)] = thread["ticket"]
+                    continue
+                response["errors"][str(ticket_id)] = {
+                    "status": error[0],
+                    "detail": error[1],
+                }
+            return response
+        except Exception as e:
+            logging.info("%s", e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e),
+            )
+
+    async def get_tickets(
+        self,
+        is_staff: bool,
+        account_id: int,
+        page: int,
+        page_size: int,
+        after: Optional[Tuple[datetime.datetime, int]] = None,
+        total_strategy: TotalStrategy = TotalStrategy.EXACT,
+        sort: TicketSort = TicketSort.CREATED,
+    ):
+        """List tickets newest first, by creation or by last activity.
+
+        When ``after`` (a decoded cursor) is given the page starts right after
+        that ``(created_date, id)`` key, or ``(last_activity_at, id)`` for
+        ``sort=activity``, instead of at ``page * page_size``, so the cost of
+        a page does not depend on how deep it is. Either order has its own
+        index; the activity summary comes from the ticket row itself.
+        """
+        try:
+            sort_column = (
+                Ticket.last_activity_at
+                if sort == TicketSort.ACTIVITY
+                else Ticket.created_date
+            )
+            last_replier = aliased(Account)
+            query = (
+                select(
+                    Ticket.id,
                     Ticket.title,
                     Ticket.description,
-                    Ticket.created_by_id,
+                    Ticket.created_date,
+                    Ticket.reply_count,
+                    Ticket.last_reply_at,
+                    Ticket.last_activity_at,
                     Account.user_name,
+                    last_replier.user_name.label("last_reply_by"),
                 )
-                .filter(
-                    Ticket.id == ticket_id,
-                    Account.id == Ticket.created_by_id,
-                )
-                .first()
+                .join(Account, Account.id == Ticket.created_by_id)
+                .outerjoin(last_replier, last_replier.id == Ticket.last_reply_by_id)
             )
+            if not is_staff:
+                query = query.where(Ticket.created_by_id == account_id)
 
-            if ticket.created_by_id != account_id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail=ErrorMessage.Permission_Error.value,
+            response = {"data": [], "nextCursor": None, "hasMore": False}
+            if total_strategy != TotalStrategy.NONE:
+                response["total"] = await self.count_tickets(
+                    is_staff, account_id, total_strategy
                 )
 
-            replies = (
-                self.session.query(
-                    Reply.id,
-                    Reply.content,
-                    Reply.created_by_id,
-                    Reply.created_at,
-                    Account.user_name,
+            query = query.order_by(sort_column.desc(), Ticket.id.desc())
+            if after:
+                sort_value, ticket_id = after
+                query = query.where(
+                    keyset_before(sort_column, Ticket.id, sort_value, ticket_id)
                 )
-                .filter(Reply.ticket_id == ticket_id, Account.id == Reply.created_by_id)
-                .order_by(Reply.created_at.desc())
-                .all()
-            )
-            return TicketSchema(
-                ticketId=ticket_id,
-                title=ticket.title,
-                description=ticket.title,
-                createdDate=DateUtils.full_datetime_to_str(ticket.title),
-                createdBy=ticket.user_name,
-                replies=[
-                    ReplySchema(
-                        replyId=reply.id,
-                        ticketId=ticket_id,
-                        content=reply.content,
-                        createdBy=reply.user_name,
-                        createdDate=DateUtils.full_datetime_to_str(reply.created_at),
-                    )
-                    for reply in replies
-                ],
-            )
+            else:
+                query = query.offset(page * page_size)
+            # One extra row tells us whether there is a next page.
+            result = await self.session.execute(query.limit(page_size + 1))
+            tickets = result.all()
+            if len(tickets) > page_size:
+                tickets = tickets[:page_size]
+                last = tickets[-1]
+                sort_value = (
+                    last.last_activity_at
+                    if sort == TicketSort.ACTIVITY
+                    else last.created_date
+                )
+                response["nextCursor"] = encode_cursor(sort_value, last.id)
+                response["hasMore"] = True
+            response["data"] = [project_ticket_summary(ticket) for ticket in tickets]
+            return response
         except Exception as e:
-            logging.info(f"{str(e)}")
+            logging.info("%s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=str(e),
             )
 
-    async def get_tickets(
-        self, is_staff: bool, account_id: int, page: int, page_size: int
-    ):
+    async def search_tickets(
+        self, query: str, owner_id: Optional[int], page: int, page_size: int
+    ) -> dict:
+        """Tickets matching ``query`` best first, with their ``score``.
+
+        The search backend ranks and pages the ids; the page's rows are then
+        loaded in one query. ``owner_id`` limits the search to that author.
+        """
+        ranked, total = await self.search.search_tickets(
+            query, owner_id, page_size, page * page_size
+        )
         try:
-            offset = page * page_size
-            limit = page_size
-            query = self.session.query(
+            rows = {}
+            if ranked:
+                result = await self.session.execute(
+                    select(
+                        Ticket.id,
+                        Ticket.title,
+                        Ticket.description,
+                        Ticket.created_date,
+                        Account.user_name,
+                    ).where(
+                        Ticket.id.in_([ticket_id for ticket_id, _ in ranked]),
+                        Account.id == Ticket.created_by_id,
+                    )
+                )
+                rows = {row.id: row for row in result.all()}
+            data = []
+            for ticket_id, score in ranked:
+                if ticket_id in rows:
+                    ticket = project_ticket(rows[ticket_id])
+                    ticket["score"] = round(score, 4)
+                    data.append(ticket)
+            return {
+                "data": data,
+                "total": total,
+                "hasMore": (page + 1) * page_size < total,
+            }
+        except Exception as e:
+            logging.info("%s", e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e),
+            )
+
+    async def export_tickets(
+        self,
+        created_from: Optional[datetime.datetime] = None,
+        created_to: Optional[datetime.datetime] = None,
+        author: Optional[str] = None,
+        include_replies: bool = False,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[List[dict]]:
+        """Yield every matching ticket, oldest first, in batches.
+
+        The rows come from one server-side cursor (``yield_per``), so memory
+        stays bounded by ``batch_size`` whatever the table size. Replies are
+        outer-joined onto the same cursor and regrouped per ticket; a ticket
+        whose replies straddle two fetches is emitted with the later batch.
+        """
+        reply_author = aliased(Account)
+        query = (
+            select(
                 Ticket.id,
                 Ticket.title,
                 Ticket.description,
                 Ticket.created_date,
                 Account.user_name,
-            ).filter(Account.id == Ticket.created_by_id)
-            if not is_staff:
-                query = query.filter(Ticket.created_by_id == account_id)
-
-            total = query.count()
-            response = {"total": total, "data": []}
-            tickets = (
-                query.order_by(Ticket.created_date.desc())
-                .offset(offset)
-                .limit(limit)
-                .all()
-            )
-            for ticket in tickets:
-                response["data"].append(
-                    TicketSchema(
-                        ticketId=ticket.id,
-                        title=ticket.title,
-                        description=ticket.description,
-                        createdBy=ticket.user_name,
-                        createdDate=DateUtils.full_datetime_to_str(ticket.created_date),
-                    )
+            )
+            .join(Account, Account.id == Ticket.created_by_id)
+            .order_by(Ticket.created_date, Ticket.id)
+        )
+        if created_from:
+            query = query.where(Ticket.created_date >= created_from)
+        if created_to:
+            query = query.where(Ticket.created_date < created_to)
+        if author:
+            query = query.where(Account.user_name == author)
+        if include_replies:
+            query = (
+                query.add_columns(
+                    Reply.id.label("reply_id"),
+                    Reply.content,
+                    Reply.created_at,
+                    reply_author.user_name.label("reply_user_name"),
                 )
-            return response
+                .outerjoin(Reply, Reply.ticket_id == Ticket.id)
+                .outerjoin(reply_author, reply_author.id == Reply.created_by_id)
+                .order_by(Reply.created_at, Reply.id)
+            )
+
+        try:
+            result = await self.session.stream(
+                query.execution_options(yield_per=batch_size)
+            )
+            current = None
+            async for rows in result.partitions():
+                batch = []
+                for row in rows:
+                    if current is None or current["ticketId"] != row.id:
+                        if current is not None:
+                            batch.append(current)
+                        current = project_ticket(row)
+                        if not include_replies:
+                            del current["replies"]
+                    if include_replies and row.reply_id is not None:
+                        current["replies"].append(
+                            {
+                                "replyId": row.reply_id,
+                                "ticketId": row.id,
+                                "content": row.content,
+                                "createdBy": row.reply_user_name,
+                                "createdDate": DateUtils.format_full_datetime(
+                                    row.created_at
+                                ),
+                            }
+                        )
+                if batch:
+                    yield batch
+            if current is not None:
+                yield [current]
+        except SQLAlchemyError as err:
+            # Headers are already sent; all we can do is log and cut the body.
+            logging.error("Ticket export failed: %s", err)
+            raise
+
+    async def get_tickets_version(
+        self, is_staff: bool, account_id: int
+    ) -> Tuple[int, Optional[datetime.datetime]]:
+        """The newest ticket id and latest ``updated_at`` the account can list.
+
+        Tickets are never deleted and every reply write, which changes the
+        listed activity summary, moves updated_at, so a listing only changes
+        when one of these does. Both maxima are read from indexes: the
+        primary key and ix_tickets_updated_at for staff, the author's index
+        entries for a customer.
+        """
+        try:
+            newest_id = select(func.max(Ticket.id))
+            updated_at = select(func.max(Ticket.updated_at))
+            if not is_staff:
+                newest_id = newest_id.where(Ticket.created_by_id == account_id)
+                updated_at = updated_at.where(Ticket.created_by_id == account_id)
+            # One aggregate per subquery, so each stays a single index probe.
+            result = await self.session.execute(
+                select(newest_id.scalar_subquery(), updated_at.scalar_subquery())
+            )
+            newest_id, updated_at = result.one()
+            return newest_id or 0, updated_at
         except Exception as e:
-            logging.info(f"{str(e)}")
+            logging.info("%s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=str(e),
             )
 
+    async def count_tickets(
+        self, is_staff: bool, account_id: int, strategy: TotalStrategy
+    ) -> int:
+        """Count the tickets visible to an account.
+
+        ``exact`` always runs COUNT(*). ``cached`` serves the count from
+        ``ticket_count_cache`` and only counts on a miss. ``estimate`` reads
+        table statistics for the unfiltered staff listing and behaves like
+        ``cached`` for a single author.
+        """
+        if strategy == TotalStrategy.ESTIMATE and is_staff:
+            return await self._estimate_ticket_count()
+
+        key = ALL_TICKETS if is_staff else account_id
+        if strategy in (TotalStrategy.CACHED, TotalStrategy.ESTIMATE):
+            total = ticket_count_cache.get(key)
+            if total is not None:
+                return total
+
+        query = select(func.count(Ticket.id))
+        if not is_staff:
+            query = query.where(Ticket.created_by_id == account_id)
+        total = await self.session.scalar(query)
+        ticket_count_cache.set(key, total)
+        return total
+
+    async def _estimate_ticket_count(self) -> int:
+        if self.session.get_bind().dialect.name == "mysql":
+            estimate = await self.session.scalar(
+                text(
+                    "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table"
+                ),
+                {"table": Ticket.__tablename__},
+            )
+        else:
+            # Tickets are never deleted, so the highest id is a close bound.
+            estimate = await self.session.scalar(select(func.max(Ticket.id)))
+        return int(estimate or 0)
+
     async def create_reply(self, ticket_id, reply_data, account_id):
         try:
+            # Stamped here so the ticket's summary can be updated before the
+            # reply is inserted (see _touch_ticket).
+            created_at = datetime.datetime.utcnow()
             new_reply = Reply(
-                **reply_data.dict(), ticket_id=ticket_id, created_by_id=account_id
-            )
-            (account_name,) = (
-                self.session.query(Account.user_name)
-                .filter(Account.id == account_id)
-                .first()
+                **reply_data.dict(),
+                ticket_id=ticket_id,
+                created_by_id=account_id,
+                created_at=created_at,
             )
+            account_name = await self._get_account_name(account_id)
             self.session.add(new_reply)
-            self.session.commit()
-            self.session.refresh(new_reply)
+            # Concurrent replies may commit out of order; keep the newest.
+            newer = or_(
+                Ticket.last_reply_at.is_(None), Ticket.last_reply_at <= created_at
+            )
+            version = await self._touch_ticket(
+                ticket_id,
+                reply_count=Ticket.reply_count + 1,
+                last_reply_at=case((newer, created_at), else_=Ticket.last_reply_at),
+                last_reply_by_id=case(
+                    (newer, account_id), else_=Ticket.last_reply_by_id
+                ),
+                last_activity_at=case(
+                    (Ticket.last_activity_at <= created_at, created_at),
+                    else_=Ticket.last_activity_at,
+                ),
+            )
+            await self.session.commit()
+            await expire_thread(ticket_id, version)
+            self.search.reply_written(ticket_id, new_reply.content)
             new_reply = ReplySchema(
                 replyId=new_reply.id,
                 ticketId=new_reply.ticket_id,
@@ -187,47 +819,127 @@ class TicketRepository:
                 createdBy=account_name,
                 createdDate=DateUtils.full_datetime_to_str(new_reply.created_at),
             )
+            await event_broker.publish(
+                [ticket_channel(ticket_id), STAFF_INBOX],
+                "reply.created",
+                new_reply.model_dump(),
+            )
             return new_reply
+        except HTTPException:
+            await self.session.rollback()
+            raise
         except SQLAlchemyError as err:
-            self.session.rollback()
+            await self.session.rollback()
             err = str(err.__dict__["orig"])
-            logging.error(f"{err}")
+            logging.error("%s", err)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=err
             )
         except Exception as e:
-            logging.info(f"{str(e)}")
-            self.session.rollback()
+            logging.info("%s", e)
+            await self.session.rollback()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=str(e),
             )
 
-    async def get_replies_for_ticket(self, ticket_id: int):
+    async def _touch_ticket(self, ticket_id: int, **values) -> int:
+        """Bump the ticket's version in the reply write's transaction, which
+        changes the ETag of its thread, and set any other ``values``.
+        Returns the new version, for expire_thread; raises 404 if there is
+        no such ticket, before anything else of the write is flushed.
+
+        Reply writes run this before touching ``replies``: the ticket's row
+        lock then orders all writes to one thread, and on MySQL two replies
+        cannot deadlock upgrading the shared lock their foreign key check
+        takes on it.
+        """
+        statement = (
+            update(Ticket)
+            .where(Ticket.id == ticket_id)
+            .values(
+                version=Ticket.version + 1,
+                updated_at=datetime.datetime.utcnow(),
+                **values,
+            )
+            # No Ticket objects are loaded here; skip fetching what changed.
+            .execution_options(synchronize_session=False)
+        )
+        if self.session.get_bind().dialect.update_returning:
+            version = await self.session.scalar(statement.returning(Ticket.version))
+        else:
+            # MySQL: the row is locked by the update, so this reads our version.
+            await self.session.execute(statement)
+            version = await self.session.scalar(
+                select(Ticket.version).where(Ticket.id == ticket_id)
+            )
+        if version is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=ErrorMessage.TICKET_NOT_FOUND.value,
+            )
+        return version
+
+    async def get_all_replies_for_ticket(self, ticket_id: int) -> List[dict]:
+        """Every reply of a ticket, oldest first, in ReplySchema's shape."""
         try:
-            replies = (
-                self.session.query(
+            result = await self.session.execute(
+                select(
                     Reply.id,
                     Reply.ticket_id,
                     Reply.content,
                     Reply.created_at,
                     Account.user_name,
                 )
-                .filter(Reply.ticket_id == ticket_id, Account.id == Reply.created_by_id)
-                .all()
-            )
-            return [
-                ReplySchema(
-                    replyId=reply.id,
-                    ticketId=reply.ticket_id,
-                    content=reply.content,
-                    createdBy=reply.user_name,
-                    createdDate=DateUtils.full_datetime_to_str(reply.created_at),
+                .where(Reply.ticket_id == ticket_id, Account.id == Reply.created_by_id)
+                .order_by(Reply.created_at, Reply.id)
+            )
+            return [project_reply(reply, reply.ticket_id) for reply in result.all()]
+        except Exception as e:
+            logging.info("%s", e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e),
+            )
+
+    async def get_replies_for_ticket(
+        self,
+        ticket_id: int,
+        limit: int,
+        after: Optional[Tuple[datetime.datetime, int]] = None,
+    ) -> dict:
+        """One page of a ticket's replies, newest first.
+
+        Keyset paginated on ``(created_at, id)`` like get_tickets; ``after``
+        is a decoded ``nextCursor``.
+        """
+        try:
+            query = select(
+                Reply.id,
+                Reply.ticket_id,
+                Reply.content,
+                Reply.created_at,
+                Account.user_name,
+            ).where(Reply.ticket_id == ticket_id, Account.id == Reply.created_by_id)
+            if after:
+                created_at, reply_id = after
+                query = query.where(
+                    keyset_before(Reply.created_at, Reply.id, created_at, reply_id)
                 )
-                for reply in replies
-            ]
+            query = query.order_by(Reply.created_at.desc(), Reply.id.desc())
+            result = await self.session.execute(query.limit(limit + 1))
+            replies = result.all()
+
+            page = {"data": [], "nextCursor": None, "hasMore": False}
+            if len(replies) > limit:
+                replies = replies[:limit]
+                last = replies[-1]
+                page["nextCursor"] = encode_cursor(last.created_at, last.id)
+                page["hasMore"] = True
+            page["data"] = [project_reply(reply, reply.ticket_id) for reply in replies]
+            return page
         except Exception as e:
-            logging.info(f"{str(e)}")
+            logging.info("%s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=str(e),
@@ -235,35 +947,46 @@ class TicketRepository:
 
     async def update_reply(self, reply_id: int, new_content: str, account_id: int):
         try:
-            reply = self.session.query(Reply).filter(Reply.id == reply_id).first()
+            result = await self.session.execute(
+                select(Reply).where(Reply.id == reply_id)
+            )
+            reply = result.scalars().first()
             if reply.created_by_id != account_id:
                 return None
-            (account_name,) = (
-                self.session.query(Account.user_name)
-                .filter(Account.id == account_id)
-                .first()
-            )
+            account_name = await self._get_account_name(account_id)
+            old_content = reply.content
             reply.content = new_content
             self.session.add(reply)
-            self.session.commit()
-            self.session.refresh(reply)
-            return ReplySchema(
+            version = await self._touch_ticket(reply.ticket_id)
+            await self.session.commit()
+            await expire_thread(reply.ticket_id, version)
+            self.search.reply_written(reply.ticket_id, reply.content, old_content)
+            updated_reply = ReplySchema(
                 replyId=reply.id,
                 ticketId=reply.ticket_id,
                 content=reply.content,
                 createdBy=account_name,
                 createdDate=DateUtils.full_datetime_to_str(reply.created_at),
             )
+            await event_broker.publish(
+                [ticket_channel(reply.ticket_id), STAFF_INBOX],
+                "reply.updated",
+                updated_reply.model_dump(),
+            )
+            return updated_reply
+        except HTTPException:
+            await self.session.rollback()
+            raise
         except SQLAlchemyError as err:
-            self.session.rollback()
+            await self.session.rollback()
             err = str(err.__dict__["orig"])
-            logging.error(f"{err}")
+            logging.error("%s", err)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=err
             )
         except Exception as e:
-            logging.info(f"{str(e)}")
-            self.session.rollback()
+            logging.info("%s", e)
+            await self.session.rollback()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=str(e),
@@ -271,23 +994,105 @@ class TicketRepository:
 
     async def delete_reply(self, reply_id: int, account_id: int):
         try:
-            reply = self.session.query(Reply).filter(Reply.id == reply_id).first()
+            result = await self.session.execute(
+                select(Reply).where(Reply.id == reply_id)
+            )
+            reply = result.scalars().first()
             if reply and reply.created_by_id == account_id:
-                self.session.delete(reply)
-                self.session.commit()
+                await self.session.delete(reply)
+                # The delete is flushed on commit, after this update, so the
+                # newest remaining reply is looked up without this one.
+                version = await self._touch_ticket(
+                    reply.ticket_id,
+                    **dict(
+                        recomputed_activity(excluding=reply.id),
+                        reply_count=Ticket.reply_count - 1,
+                    ),
+                )
+                await self.session.commit()
+                await expire_thread(reply.ticket_id, version)
+                self.search.reply_deleted(reply.ticket_id, reply.content)
+                await event_broker.publish(
+                    [ticket_channel(reply.ticket_id), STAFF_INBOX],
+                    "reply.deleted",
+                    {"replyId": reply.id, "ticketId": reply.ticket_id},
+                )
                 return True
             return False
+        except HTTPException:
+            await self.session.rollback()
+            raise
         except SQLAlchemyError as err:
-            self.session.rollback()
+            await self.session.rollback()
             err = str(err.__dict__["orig"])
-            logging.error(f"{err}")
+            logging.error("%s", err)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=err
             )
         except Exception as e:
-            logging.info(f"{str(e)}")
-            self.session.rollback()
+            logging.info("%s", e)
+            await self.session.rollback()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=str(e),
             )
+
+    async def repair_ticket_activity(
+        self, batch_size: int = 1000, dry_run: bool = False
+    ) -> dict:
+        """Recompute every ticket's ACTIVITY_COLUMNS from its replies.
+
+        Tickets are walked by id, ``batch_size`` at a time: one SELECT
+        compares the stored columns with recomputed_activity() and one
+        UPDATE rewrites the tickets that drifted, recomputing them again so
+        a reply written in between is not overwritten with a stale value.
+        Repaired tickets get a new updated_at, which refreshes listing
+        ETags. Returns ``{"checked", "drifted", "repaired"}``.
+        """
+        report = {"checked": 0, "drifted": 0, "repaired": 0}
+        recomputed = recomputed_activity()
+        after = 0
+        while True:
+            result = await self.session.execute(
+                select(
+                    Ticket.id,
+                    *(getattr(Ticket, name) for name in ACTIVITY_COLUMNS),
+                    *(
+                        recomputed[name].label(f"actual_{name}")
+                        for name in ACTIVITY_COLUMNS
+                    ),
+                )
+                .where(Ticket.id > after)
+                .order_by(Ticket.id)
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            after = rows[-1].id
+            report["checked"] += len(rows)
+            drifted = []
+            for row in rows:
+                stored = {name: getattr(row, name) for name in ACTIVITY_COLUMNS}
+                actual = {
+                    name: getattr(row, f"actual_{name}") for name in ACTIVITY_COLUMNS
+                }
+                if stored != actual:
+                    logging.warning(
+                        "Ticket %s activity drifted: %s != %s", row.id, stored, actual
+                    )
+                    drifted.append(row.id)
+            report["drifted"] += len(drifted)
+            if drifted and not dry_run:
+                result = await self.session.execute(
+                    update(Ticket)
+                    .where(Ticket.id.in_(drifted))
+                    .values(updated_at=datetime.datetime.utcnow(), **recomputed)
+                    .execution_options(synchronize_session=False)
+                )
+                await self.session.commit()
+                report["repaired"] += result.rowcount
+            else:
+                # Ends the read transaction between batches.
+                await self.session.rollback()
+        return report
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel
 
@@ -13,3 +13,9 @@ class ReplySchema(BaseModel):
     content: str
     createdBy: str
     createdDate: str
+
+
+class ReplyPageSchema(BaseModel):
+    data: List[ReplySchema]
+    nextCursor: Optional[str] = None
+    hasMore: bool = False
@@ -1,6 +1,8 @@
-from typing import Optional, List
+import datetime
+from enum import Enum
+from typing import Dict, Optional, List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_serializer
 
 from schemas.reply_schema import ReplySchema
 
@@ -10,6 +12,24 @@ class TicketCreateSchema(BaseModel):
     description: str
 
 
+class TicketImportSchema(BaseModel):
+    title: str = Field(min_length=1, max_length=100)
+    description: str
+    createdBy: str
+    createdDate: Optional[datetime.datetime] = None
+
+
+class TicketImportErrorSchema(BaseModel):
+    row: int
+    error: str
+
+
+class TicketImportReportSchema(BaseModel):
+    imported: int = 0
+    failed: int = 0
+    errors: List[TicketImportErrorSchema] = []
+
+
 class TicketSchema(BaseModel):
     ticketId: int
     title: str
@@ -17,3 +37,80 @@ class TicketSchema(BaseModel):
     createdDate: str
     createdBy: str
     replies: Optional[List[ReplySchema]] = []
+
+
+class TicketDetailSchema(TicketSchema):
+    # Set when the detail was asked for with repliesLimit and older replies
+    # remain; pass it as `cursor` to /ticket/{id}/replies/.
+    repliesNextCursor: Optional[str] = None
+
+    @model_serializer(mode="wrap")
+    def _omit_missing_cursor(self, handler):
+        ticket = handler(self)
+        if self.repliesNextCursor is None:
+            ticket.pop("repliesNextCursor", None)
+        return ticket
+
+
+class TicketSummarySchema(TicketSchema):
+    # Listing rows: denormalized on the ticket, so no reply aggregate.
+    replyCount: int = 0
+    lastReplyDate: Optional[str] = None
+    lastReplyBy: Optional[str] = None
+    lastActivityDate: str
+
+
+class TicketPageSchema(BaseModel):
+    data: List[TicketSummarySchema]
+    nextCursor: Optional[str] = None
+    hasMore: bool = False
+    total: Optional[int] = None
+
+    @model_serializer(mode="wrap")
+    def _omit_missing_total(self, handler):
+        # total=none requests must not see a "total" key at all.
+        page = handler(self)
+        if self.total is None:
+            page.pop("total", None)
+        return page
+
+
+class TicketSearchResultSchema(TicketSchema):
+    score: float
+
+
+class TicketSearchPageSchema(BaseModel):
+    data: List[TicketSearchResultSchema]
+    total: int
+    hasMore: bool = False
+
+
+class TicketBatchRequestSchema(BaseModel):
+    ticketIds: List[int] = Field(min_length=1, max_length=100)
+
+
+class TicketBatchErrorSchema(BaseModel):
+    status: int
+    detail: str
+
+
+class TicketBatchSchema(BaseModel):
+    data: Dict[str, TicketSchema]
+    errors: Dict[str, TicketBatchErrorSchema]
+
+
+class TotalStrategy(str, Enum):
+    EXACT = "exact"
+    CACHED = "cached"
+    ESTIMATE = "estimate"
+    NONE = "none"
+
+
+class TicketSort(str, Enum):
+    CREATED = "created"
+    ACTIVITY = "activity"
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
@@ -1,13 +1,32 @@
 import datetime
+import uuid
+from typing import Optional
 
 import jwt
 from fastapi import HTTPException, status
+from pydantic import ValidationError
 
-from core.auth import verify_password
+from core.auth import check_password
+from core.errors_handler import ErrorMessage
+from core.json_stream import JsonStreamError
 from core.settings import settings
 from repositories.account_repository import AccountRepository
 from repositories.ticket_repository import TicketRepository
 from schemas.account_schema import AccountCreateSchema, AccountLoginSchema
+from schemas.ticket_schema import (
+    TicketImportErrorSchema,
+    TicketImportReportSchema,
+    TicketImportSchema,
+    TicketSort,
+    TotalStrategy,
+)
+
+
+def validation_message(err: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, error['loc'])) or 'row'}: {error['msg']}"
+        for error in err.errors()
+    )
 
 
 class AccountService:
@@ -22,7 +41,13 @@ class AccountService:
 
     async def create_refresh_token(self, user_id: int):
         expire = datetime.datetime.utcnow() + datetime.timedelta(days=7)
-        token_payload = {"exp": expire, "sub": str(user_id)}
+        # jti keeps two tokens issued in the same second distinct, which the
+        # unique tokens.token_hash index requires.
+        token_payload = {
+            "exp": expire,
+            "sub": str(user_id),
+            "jti": str(uuid.uuid4()),
+        }
         refresh_token = jwt.encode(
             token_payload, settings.JWT_SECRET_KEY, settings.ALGORITHM
         )
@@ -54,15 +79,17 @@ class AccountService:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
             )
-        return self.create_access_token(
-            db_token.user_id
-        ), await self.create_refresh_token(db_token.user_id)
+        return await self.create_access_token(
+            db_token.account_id
+        ), await self.create_refresh_token(db_token.account_id)
 
     async def authenticate_user(self, account_schema: AccountLoginSchema):
         account = await self.account_repository.get_user_by_username_or_email(
             account_schema.usernameOrEmail
         )
-        if account and verify_password(account_schema.password, account.password):
+        if account and await check_password(
+            account_schema.password, account.password
+        ):
             return account
         return None
 
@@ -75,25 +102,108 @@ class AccountService:
     async def get_ticket(self, ticket_id: int):
         return await self.ticket_repository.get_ticket(ticket_id)
 
-    async def get_ticket_details(self, ticket_id: int, account_id: int):
-        return await self.ticket_repository.get_ticket_details(ticket_id, account_id)
+    async def get_ticket_details(
+        self,
+        ticket_id: int,
+        account_id: int,
+        replies_limit: int = None,
+        min_version: int = 0,
+    ):
+        ticket, version = await self.ticket_repository.get_ticket_details(
+            ticket_id, replies_limit is None, min_version
+        )
+        await self.authorize_ticket_read(version["createdById"], account_id)
+        if replies_limit is None:
+            return ticket, version
+        replies = await self.ticket_repository.get_replies_for_ticket(
+            ticket_id, replies_limit
+        )
+        ticket = dict(ticket, replies=replies["data"])
+        if replies["nextCursor"] is not None:
+            ticket["repliesNextCursor"] = replies["nextCursor"]
+        return ticket, version
+
+    async def get_ticket_version(self, ticket_id: int, account_id: int) -> dict:
+        """The ticket's version, with the same 404/403 as get_ticket_details."""
+        version = await self.ticket_repository.get_ticket_version(ticket_id)
+        await self.authorize_ticket_read(
+            version["createdById"] if version else None, account_id
+        )
+        return version
+
+    async def get_tickets_version(self, account_id: int):
+        is_staff = await self.is_staff(account_id)
+        return await self.ticket_repository.get_tickets_version(is_staff, account_id)
+
+    async def get_ticket_details_batch(self, ticket_ids, account_id: int):
+        is_staff = await self.is_staff(account_id)
+        return await self.ticket_repository.get_ticket_details_batch(
+            ticket_ids, account_id, is_staff
+        )
 
-    async def get_tickets(self, account_id: int, page: int, page_size: int):
+    async def get_tickets(
+        self,
+        account_id: int,
+        page: int,
+        page_size: int,
+        after=None,
+        total_strategy: TotalStrategy = TotalStrategy.EXACT,
+        sort: TicketSort = TicketSort.CREATED,
+    ):
         is_staff = await self.is_staff(account_id)
         return await self.ticket_repository.get_tickets(
             is_staff,
             account_id,
             page,
             page_size,
+            after,
+            total_strategy,
+            sort,
+        )
+
+    async def search_tickets(
+        self, account_id: int, query: str, page: int, page_size: int
+    ):
+        # Staff search every ticket, customers only their own.
+        owner_id = None if await self.is_staff(account_id) else account_id
+        return await self.ticket_repository.search_tickets(
+            query, owner_id, page, page_size
         )
 
+    async def check_ticket_access(self, ticket_id: int, account_id: int) -> None:
+        """Raise 404/403 unless the account owns the ticket or is staff."""
+        owner_id = await self.ticket_repository.get_ticket_owner_id(ticket_id)
+        await self.authorize_ticket_read(owner_id, account_id)
+
+    async def authorize_ticket_read(
+        self, owner_id: Optional[int], account_id: int
+    ) -> None:
+        """Who may read a ticket, for every route that returns one: its
+        author and staff. ``owner_id`` None means there is no such ticket.
+        get_ticket_details_batch applies the same rule per id."""
+        if owner_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=ErrorMessage.TICKET_NOT_FOUND.value,
+            )
+        if owner_id != account_id and not await self.is_staff(account_id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=ErrorMessage.Permission_Error.value,
+            )
+
     async def create_reply(self, ticket_id: int, reply_data, account_id: int):
         return await self.ticket_repository.create_reply(
             ticket_id, reply_data, account_id
         )
 
-    async def get_replies_for_ticket(self, ticket_id: int):
-        return await self.ticket_repository.get_replies_for_ticket(ticket_id)
+    async def get_all_replies_for_ticket(self, ticket_id: int):
+        return await self.ticket_repository.get_all_replies_for_ticket(ticket_id)
+
+    async def get_replies_for_ticket(self, ticket_id: int, limit: int, after=None):
+        return await self.ticket_repository.get_replies_for_ticket(
+            ticket_id, limit, after
+        )
 
     async def update_reply(self, reply_id: int, new_content: str, account_id: int):
         return await self.ticket_repository.update_reply(
@@ -104,5 +214,74 @@ class AccountService:
         return await self.ticket_repository.delete_reply(reply_id, account_id)
 
     async def is_staff(self, account_id: int) -> bool:
-        user = await self.account_repository.get_account(account_id)
-        return user.is_admin
+        summary = await self.account_repository.get_account_summary(account_id)
+        return bool(summary and summary.is_admin)
+
+    async def import_tickets(
+        self, records, batch_size: int
+    ) -> TicketImportReportSchema:
+        """Validate ``(index, record)`` pairs and insert them batch by batch.
+
+        Every batch is committed on its own, so rows before a failure stay
+        imported; bad rows are reported and skipped. Only a stream that can
+        no longer be parsed ends the job early.
+        """
+        report = TicketImportReportSchema()
+        batch = []
+
+        def fail(row: int, error: str):
+            report.failed += 1
+            if len(report.errors) < settings.IMPORT_MAX_ERRORS:
+                report.errors.append(TicketImportErrorSchema(row=row, error=error))
+
+        next_row = 0
+        try:
+            async for index, record in records:
+                next_row = index + 1
+                if isinstance(record, Exception):
+                    fail(index, str(record))
+                    continue
+                try:
+                    batch.append((index, TicketImportSchema.model_validate(record)))
+                except ValidationError as err:
+                    fail(index, validation_message(err))
+                    continue
+                if len(batch) >= batch_size:
+                    await self._import_batch(batch, report, fail)
+                    batch = []
+        except JsonStreamError as err:
+            fail(next_row, str(err))
+        if batch:
+            await self._import_batch(batch, report, fail)
+        return report
+
+    async def _import_batch(self, batch, report, fail):
+        account_ids = await self.account_repository.get_account_ids(
+            ticket.createdBy for _, ticket in batch
+        )
+        rows, row_indexes = [], []
+        for index, ticket in batch:
+            account_id = account_ids.get(ticket.createdBy)
+            if account_id is None:
+                fail(index, f"createdBy: unknown account {ticket.createdBy!r}")
+                continue
+            created_date = ticket.createdDate or datetime.datetime.utcnow()
+            if created_date.tzinfo is not None:
+                created_date = created_date.astimezone(datetime.timezone.utc).replace(
+                    tzinfo=None
+                )
+            rows.append(
+                {
+                    "title": ticket.title,
+                    "description": ticket.description,
+                    "created_by_id": account_id,
+                    "created_date": created_date,
+                }
+            )
+            row_indexes.append(index)
+        if not rows:
+            return
+        errors = await self.ticket_repository.insert_tickets(rows)
+        for position, error in sorted(errors.items()):
+            fail(row_indexes[position], error)
+        report.imported += len(rows) - len(errors)
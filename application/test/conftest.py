@@ -0,0 +1,88 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+# The app's own MySQL pool is never used here; don't try to pre-open it.
+os.environ.setdefault("DB_POOL_WARMUP", "0")
+os.environ.setdefault("SEARCH_REBUILD_ON_STARTUP", "0")
+
+from core.query_stats import query_count_from_header  # noqa: E402
+from db.base import Base  # noqa: E402
+from dependencies.session import get_db, get_session_factory  # noqa: E402
+from main import app, include_app  # noqa: E402
+
+SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite://"
+engine = create_async_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+SessionTesting = async_sessionmaker(
+    bind=engine, autoflush=False, expire_on_commit=False
+)
+
+
+async def override_get_db():
+    async with SessionTesting() as db:
+        yield db
+
+
+async def create_tables():
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+
+
+include_app(app)
+app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_session_factory] = lambda: SessionTesting
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as _client:
+        _client.portal.call(create_tables)
+        yield _client
+
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client):
+    """Register (if needed) and log in an account, returning auth headers."""
+
+    def _auth_headers(username: str, staff: bool = False) -> dict:
+        prefix = "staff" if staff else "user"
+        client.post(
+            f"/api/{prefix}/register",
+            json={
+                "username": username,
+                "email": f"{username}@abc.com",
+                "password": "testing",
+            },
+        )
+        response = client.post(
+            f"/api/{prefix}/login",
+            json={"usernameOrEmail": username, "password": "testing"},
+        )
+        return {"Authorization": f"Bearer {response.json()['accessToken']}"}
+
+    return _auth_headers
+
+
+@pytest.fixture(scope="session")
+def assert_max_queries():
+    """Fail when a response reports more SQL statements than its budget."""
+
+    def _assert_max_queries(response, budget: int):
+        count = query_count_from_header(response.headers.get("Server-Timing"))
+        assert count is not None, "response has no Server-Timing query count"
+        request = response.request
+        assert count <= budget, (
+            f"{request.method} {request.url.path} issued {count} queries, "
+            f"budget is {budget}"
+        )
+
+    return _assert_max_queries
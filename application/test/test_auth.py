@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event
+
+from core.auth import check_password, hash_password, password_pool_stats
+from core.account_cache import get_cached_account
+from core.auth_bearer import decode_jwt, jwt_cache
+from repositories.account_repository import AccountRepository
+from test.conftest import SessionTesting, engine
+
+
+@pytest.mark.asyncio
+async def test_password_hashing_runs_in_pool():
+    hashed = await asyncio.gather(*(hash_password(f"secret{i}") for i in range(3)))
+    checks = await asyncio.gather(
+        check_password("secret0", hashed[0]),
+        check_password("secret1", hashed[0]),
+    )
+    assert checks == [True, False]
+    assert password_pool_stats()["in_flight"] == 0
+
+
+def test_register_existing_account_is_rejected(client, auth_headers):
+    auth_headers("dupuser")
+    response = client.post(
+        "/api/user/register",
+        json={"username": "dupuser", "email": "dup2@abc.com", "password": "x"},
+    )
+    assert response.status_code == 400
+
+
+def test_jwt_bearer_caches_verified_claims(client, auth_headers):
+    headers = auth_headers("jwtuser")
+    client.get("/api/tickets/", headers=headers)
+    hits = jwt_cache.hits
+    response = client.get("/api/tickets/", headers=headers)
+    assert response.status_code == 200
+    assert jwt_cache.hits == hits + 1
+
+    response = client.get(
+        "/api/tickets/", headers={"Authorization": "Bearer not.a.token"}
+    )
+    assert response.status_code == 401
+
+
+def test_hot_paths_skip_account_lookups(client, auth_headers):
+    headers = auth_headers("claimuser")
+    statements = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _capture)
+    try:
+        ticket = client.post(
+            "/api/ticket/", headers=headers, json={"title": "T", "description": "D"}
+        ).json()
+        client.post(
+            f"/api/ticket/{ticket['ticketId']}/replies/",
+            headers=headers,
+            json={"content": "reply"},
+        )
+        client.get("/api/tickets/", headers=headers)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _capture)
+
+    assert not [s for s in statements if "FROM accounts \nWHERE" in s]
+
+
+def test_role_change_is_seen_with_an_existing_token(client, auth_headers):
+    headers = auth_headers("demotedstaff", staff=True)
+    assert client.get("/api/staff/slowQueries", headers=headers).status_code == 200
+    account_id = int(decode_jwt(headers["Authorization"].split()[1])["sub"])
+
+    async def set_admin(is_admin: bool):
+        async with SessionTesting() as session:
+            await AccountRepository(session).update_account(
+                account_id, {"is_admin": is_admin}
+            )
+
+    client.portal.call(set_admin, False)
+    assert get_cached_account(account_id) is None
+    # The token was issued while the account was staff; the role comes from
+    # the database, not from the token.
+    jwt_cache.clear()
+    assert client.get("/api/staff/slowQueries", headers=headers).status_code == 403
+    assert get_cached_account(account_id).is_admin is False
+
+    client.portal.call(set_admin, True)
+    assert client.get("/api/staff/slowQueries", headers=headers).status_code == 200
@@ -0,0 +1,95 @@
+import asyncio
+import zlib
+
+import pytest
+
+from core.compression import CompressionMiddleware, choose_encoding
+
+
+def test_choose_encoding_honours_quality_values():
+    preference = ["zstd", "br", "gzip"]
+    assert choose_encoding("gzip, deflate, br", preference) == "br"
+    assert choose_encoding("br;q=0, gzip;q=0.5", preference) == "gzip"
+    assert choose_encoding("*", preference) == "zstd"
+    assert choose_encoding("*;q=0, gzip", preference) == "gzip"
+    assert choose_encoding("identity", preference) is None
+    assert choose_encoding("", preference) is None
+
+
+@pytest.fixture
+def tickets(client, auth_headers):
+    headers = auth_headers("gzipuser")
+    for i in range(20):
+        client.post(
+            "/api/ticket/",
+            headers=headers,
+            json={"title": f"Compressed {i}", "description": "x" * 100},
+        )
+    return headers
+
+
+def test_large_json_is_gzipped_and_small_is_not(client, tickets):
+    gzip_headers = {**tickets, "Accept-Encoding": "gzip"}
+    response = client.get("/api/tickets/", headers=gzip_headers)
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert len(response.json()["data"]) == 10
+    # Compressed bytes carry a weak ETag, which still revalidates.
+    etag = response.headers["etag"]
+    assert etag.startswith("W/")
+    conditional = {**gzip_headers, "If-None-Match": etag}
+    assert client.get("/api/tickets/", headers=conditional).status_code == 304
+
+    plain = client.get(
+        "/api/tickets/", headers={**tickets, "Accept-Encoding": "identity"}
+    )
+    assert "content-encoding" not in plain.headers
+    assert plain.json() == response.json()
+
+    small = client.get(
+        "/api/tickets/", headers=gzip_headers, params={"pageSize": 1}
+    )
+    assert "content-encoding" not in small.headers
+
+
+def test_streamed_export_is_compressed_per_chunk(client, tickets, auth_headers):
+    staff_headers = auth_headers("gzipstaff", staff=True)
+    url = "/api/staff/tickets/export"
+    params = {"author": "gzipuser", "format": "csv"}
+    plain = client.get(
+        url, headers={**staff_headers, "Accept-Encoding": "identity"}, params=params
+    )
+    with client.stream(
+        "GET", url, headers={**staff_headers, "Accept-Encoding": "gzip"}, params=params
+    ) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        compressed = b"".join(response.iter_raw())
+    assert zlib.decompress(compressed, zlib.MAX_WBITS | 16) == plain.content
+    assert len(compressed) < len(plain.content)
+
+
+def test_other_content_types_pass_through():
+    sent = []
+
+    async def app(scope, receive, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"text/event-stream")],
+            }
+        )
+        await send({"type": "http.response.body", "body": b"x" * 4096})
+
+    async def send(message):
+        sent.append(message)
+
+    async def run():
+        middleware = CompressionMiddleware(app, content_types=["application/json"])
+        scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")]}
+        await middleware(scope, None, send)
+
+    asyncio.run(run())
+    assert dict(sent[0]["headers"]) == {b"content-type": b"text/event-stream"}
+    assert sent[1]["body"] == b"x" * 4096
@@ -0,0 +1,116 @@
+import asyncio
+import json
+
+import pytest
+
+from api.staff import routes as staff_routes
+from api.ticket import routes as ticket_routes
+from core.events import EventBroker, sse_stream
+from core.settings import settings
+from repositories import ticket_repository
+
+
+def parse_sse(body: str) -> list:
+    """``(id, event, data)`` for each event in an SSE body; comments skipped."""
+    events = []
+    for block in body.split("\n\n"):
+        fields = {}
+        for line in block.splitlines():
+            name, _, value = line.partition(": ")
+            if name in ("id", "event", "data"):
+                fields[name] = value
+        if "event" in fields:
+            events.append(
+                (fields.get("id"), fields["event"], json.loads(fields["data"]))
+            )
+    return events
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    """A fresh broker (ids from 1) and streams that end after a moment."""
+    broker = EventBroker()
+    for module in (ticket_repository, ticket_routes, staff_routes):
+        monkeypatch.setattr(module, "event_broker", broker)
+    monkeypatch.setattr(settings, "SSE_MAX_STREAM_SECONDS", 0.1)
+    monkeypatch.setattr(settings, "SSE_KEEPALIVE_SECONDS", 0.05)
+    return broker
+
+
+def test_reply_events_resume_from_last_event_id(client, auth_headers, broker):
+    headers = auth_headers("eventuser")
+    staff_headers = auth_headers("eventstaff", staff=True)
+    ticket_id = client.post(
+        "/api/ticket/", headers=headers, json={"title": "SSE", "description": "x"}
+    ).json()["ticketId"]
+    reply = client.post(
+        f"/api/ticket/{ticket_id}/replies/", headers=headers, json={"content": "a"}
+    ).json()
+    client.put(
+        f"/api/ticket/replies/{reply['replyId']}",
+        headers=headers,
+        json={"content": "b"},
+    )
+    client.delete(f"/api/replies/{reply['replyId']}", headers=headers)
+
+    def stream(url, last_event_id, headers=headers):
+        response = client.get(
+            url, headers={**headers, "Last-Event-ID": last_event_id}
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        return parse_sse(response.text)
+
+    url = f"/api/ticket/{ticket_id}/events"
+    events = stream(url, "1")
+    assert [(id, event) for id, event, _ in events] == [
+        ("2", "reply.created"),
+        ("3", "reply.updated"),
+        ("4", "reply.deleted"),
+    ]
+    assert events[1][2]["content"] == "b"
+    assert events[2][2] == {"replyId": reply["replyId"], "ticketId": ticket_id}
+    assert [id for id, _, _ in stream(url, "3")] == ["4"]
+    assert [event for _, event, _ in stream(url, "99")] == ["reset"]
+
+    inbox = stream("/api/staff/events", "0", staff_headers)
+    assert [event for _, event, _ in inbox] == [
+        "ticket.created",
+        "reply.created",
+        "reply.updated",
+        "reply.deleted",
+    ]
+    # Staff may follow any ticket; other customers may not.
+    assert [id for id, _, _ in stream(url, "3", staff_headers)] == ["4"]
+    other = auth_headers("eventother")
+    assert client.get(url, headers=other).status_code == 403
+    assert client.get("/api/ticket/999999/events", headers=other).status_code == 404
+    assert client.get("/api/staff/events", headers=headers).status_code == 403
+
+
+def test_live_events_and_overflow():
+    async def scenario():
+        broker = EventBroker(queue_size=1)
+
+        async def connected():
+            return False
+
+        stream = sse_stream(broker, "ticket:1", None, connected)
+        assert (await stream.__anext__()).startswith(b"retry:")
+        pending = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+        assert broker.stats()["subscribers"] == 1
+        await broker.publish(["ticket:1"], "reply.created", {"replyId": 7})
+        await broker.publish(["ticket:2"], "reply.created", {"replyId": 8})
+        live = parse_sse((await pending).decode())
+
+        subscription = broker.subscribe("ticket:1")
+        for reply_id in (9, 10):
+            await broker.publish(["ticket:1"], "reply.created", {"replyId": reply_id})
+        await stream.aclose()
+        return live, subscription.overflowed, broker.stats()["subscribers"]
+
+    live, overflowed, subscribers = asyncio.run(scenario())
+    assert live == [("1", "reply.created", {"replyId": 7})]
+    assert overflowed
+    assert subscribers == 1
@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+
+from core.settings import settings
+
+
+def test_export_tickets_streams_ndjson_and_csv(client, auth_headers):
+    headers = auth_headers("exportuser")
+    staff_headers = auth_headers("exportstaff", staff=True)
+    ticket_ids = []
+    for i in range(3):
+        ticket = client.post(
+            "/api/ticket/",
+            headers=headers,
+            json={"title": f"Export {i}", "description": "a, \"quoted\"\nline"},
+        ).json()
+        ticket_ids.append(ticket["ticketId"])
+    for content in ("first", "second"):
+        client.post(
+            f"/api/ticket/{ticket_ids[1]}/replies/",
+            headers=headers,
+            json={"content": content},
+        )
+
+    url = "/api/staff/tickets/export"
+    assert client.get(url, headers=headers).status_code == 403
+
+    batch_size = settings.EXPORT_BATCH_SIZE
+    # Replies of one ticket end up split across fetches.
+    settings.EXPORT_BATCH_SIZE = 2
+    try:
+        response = client.get(
+            url,
+            headers=staff_headers,
+            params={"author": "exportuser", "includeReplies": True},
+        )
+    finally:
+        settings.EXPORT_BATCH_SIZE = batch_size
+    assert response.headers["content-type"] == "application/x-ndjson"
+    tickets = [json.loads(line) for line in response.text.splitlines()]
+    assert [t["ticketId"] for t in tickets] == ticket_ids
+    assert [r["content"] for r in tickets[1]["replies"]] == ["first", "second"]
+    assert tickets[0]["replies"] == []
+
+    plain = client.get(url, headers=staff_headers, params={"author": "exportuser"})
+    assert "replies" not in json.loads(plain.text.splitlines()[0])
+
+    response = client.get(
+        url,
+        headers=staff_headers,
+        params={"author": "exportuser", "format": "csv", "includeReplies": True},
+    )
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [int(row["ticketId"]) for row in rows] == [
+        ticket_ids[0],
+        ticket_ids[1],
+        ticket_ids[1],
+        ticket_ids[2],
+    ]
+    assert rows[0]["description"] == "a, \"quoted\"\nline"
+    assert rows[2]["replyContent"] == "second"
+
+    def exported_ids(**params):
+        response = client.get(
+            url, headers=staff_headers, params={"author": "exportuser", **params}
+        )
+        return [json.loads(line)["ticketId"] for line in response.text.splitlines()]
+
+    assert exported_ids(createdFrom="2000-01-01T00:00:00") == ticket_ids
+    assert exported_ids(createdFrom="2999-01-01T00:00:00") == []
+    assert exported_ids(createdTo="2000-01-01T00:00:00") == []
+    assert exported_ids(author="nobody") == []
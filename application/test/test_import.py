@@ -0,0 +1,87 @@
+import datetime
+import json
+
+from repositories.ticket_repository import TicketRepository
+from test.conftest import SessionTesting
+
+
+def test_import_tickets_reports_per_row_errors(client, auth_headers):
+    headers = auth_headers("importuser")
+    staff_headers = auth_headers("importstaff", staff=True)
+    url = "/api/staff/tickets/import"
+    before = client.get(
+        "/api/tickets/", headers=headers, params={"total": "cached"}
+    ).json()["total"]
+
+    lines = [
+        {"title": "Old 1", "description": "a", "createdBy": "importuser"},
+        {
+            "title": "Old 2",
+            "description": "b",
+            "createdBy": "importuser",
+            "createdDate": "2020-05-01T10:00:00+02:00",
+        },
+        "{not json",
+        {"title": "Old 3", "createdBy": "importuser"},
+        {"title": "Old 4", "description": "d", "createdBy": "ghost"},
+        {"title": "Old 5", "description": "e", "createdBy": "importuser"},
+    ]
+    body = "\n".join(
+        line if isinstance(line, str) else json.dumps(line) for line in lines
+    )
+    assert client.post(url, headers=headers, content=body).status_code == 403
+
+    report = client.post(
+        url,
+        headers={**staff_headers, "Content-Type": "application/x-ndjson"},
+        params={"batchSize": 2},
+        content=body,
+    ).json()
+    assert report["imported"] == 3
+    assert report["failed"] == 3
+    assert [error["row"] for error in report["errors"]] == [2, 3, 4]
+    assert report["errors"][1]["error"].startswith("description:")
+    assert "ghost" in report["errors"][2]["error"]
+
+    tickets = client.get(
+        "/api/tickets/", headers=headers, params={"total": "cached"}
+    ).json()
+    assert tickets["total"] == before + 3
+    dates = {t["title"]: t["createdDate"] for t in tickets["data"]}
+    assert dates["Old 2"] == "20200501 08:00:00"
+
+
+def test_import_tickets_from_json_array_keeps_rows_before_a_syntax_error(
+    client, auth_headers
+):
+    auth_headers("arrayuser")
+    staff_headers = auth_headers("arraystaff", staff=True)
+    rows = [
+        {"title": f"Array {i}", "description": "x", "createdBy": "arrayuser"}
+        for i in range(3)
+    ]
+    body = json.dumps(rows)[:-1] + ", {oops]"
+
+    report = client.post(
+        "/api/staff/tickets/import", headers=staff_headers, content=body
+    ).json()
+    assert report["imported"] == 3
+    assert report["failed"] == 1
+    assert report["errors"][0]["row"] == 3
+
+
+def test_insert_tickets_isolates_bad_rows(client):
+    row = {
+        "title": "Batch",
+        "description": "ok",
+        "created_by_id": 1,
+        "created_date": datetime.datetime(2024, 1, 1),
+    }
+
+    async def insert():
+        async with SessionTesting() as session:
+            return await TicketRepository(session).insert_tickets(
+                [row, dict(row, title=None), row]
+            )
+
+    assert list(client.portal.call(insert)) == [1]
@@ -0,0 +1,62 @@
+import json
+import logging
+import queue
+import sys
+
+from core.logging_config import JsonFormatter, NonBlockingQueueHandler
+from core.settings import settings
+
+
+def test_json_formatter_includes_extra_fields_and_exception():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.getLogger("test").makeRecord(
+            "test",
+            logging.ERROR,
+            __file__,
+            1,
+            "failed %s",
+            ("job",),
+            sys.exc_info(),
+            extra={"request_id": "abc"},
+        )
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "failed job"
+    assert entry["level"] == "ERROR"
+    assert entry["request_id"] == "abc"
+    assert "ValueError: boom" in entry["exception"]
+
+
+def test_queue_handler_defers_formatting():
+    log_queue = queue.SimpleQueue()
+    handler = NonBlockingQueueHandler(log_queue)
+    args = ["mutable"]
+    handler.handle(logging.makeLogRecord({"msg": "value %s", "args": (args,)}))
+    args.append("changed")
+
+    record = log_queue.get_nowait()
+    assert record.msg == "value ['mutable']"
+    assert record.args is None
+
+
+def test_access_log_one_line_per_request_and_sampling(client, caplog):
+    with caplog.at_level(logging.INFO, logger="access"):
+        client.get("/metrics")
+    access = [r for r in caplog.records if r.name == "access"]
+    assert len(access) == 1
+    assert access[0].route == "/metrics"
+    assert access[0].status == 200
+
+    rate = settings.ACCESS_LOG_SAMPLE_RATE
+    settings.ACCESS_LOG_SAMPLE_RATE = 0.0
+    caplog.clear()
+    try:
+        with caplog.at_level(logging.INFO, logger="access"):
+            client.get("/metrics")
+            client.get("/api/tickets/")
+    finally:
+        settings.ACCESS_LOG_SAMPLE_RATE = rate
+    access = [r for r in caplog.records if r.name == "access"]
+    # Only the failed (unauthenticated) request survives sampling.
+    assert [r.status for r in access] == [403]
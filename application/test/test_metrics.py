@@ -0,0 +1,42 @@
+import re
+
+from core.metrics import Metrics
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Metrics(buckets=(0.1, 1.0))
+    registry.observe("GET", "/api/ticket/{ticket_id}", 200, 0.05)
+    registry.observe("GET", "/api/ticket/{ticket_id}", 404, 0.5)
+    registry.observe("GET", "/api/ticket/{ticket_id}", 200, 3)
+    text = registry.render()
+
+    labels = 'method="GET",route="/api/ticket/{ticket_id}"'
+    assert f'http_requests_total{{{labels},status="200"}} 2' in text
+    assert f'http_requests_total{{{labels},status="404"}} 1' in text
+    assert f'http_request_duration_seconds_bucket{{{labels},le="0.1"}} 1' in text
+    assert f'http_request_duration_seconds_bucket{{{labels},le="1.0"}} 2' in text
+    assert f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 3' in text
+    assert f"http_request_duration_seconds_count{{{labels}}} 3" in text
+
+
+def test_metrics_endpoint_uses_route_templates(client, auth_headers):
+    headers = auth_headers("metricsuser")
+    ticket = client.post(
+        "/api/ticket/", headers=headers, json={"title": "M", "description": "m"}
+    ).json()
+    client.get(f"/api/ticket/{ticket['ticketId']}", headers=headers)
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert re.search(
+        r'http_requests_total\{method="GET",route="/api/ticket/\{ticket_id\}",'
+        r'status="200"\} \d+',
+        text,
+    )
+    assert f"/api/ticket/{ticket['ticketId']}\"" not in text
+    assert "http_requests_in_flight 1" in text
+    assert "db_pool_checked_out " in text
+    assert 'cache_hit_ratio{cache="jwt"}' in text
+    assert "password_hash_queued 0" in text
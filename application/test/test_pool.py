@@ -0,0 +1,32 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from core.settings import settings
+from db.pool import InstrumentedQueuePool
+from dependencies.session import pool_stats, warm_up_pool
+
+
+@pytest.mark.asyncio
+async def test_pool_warm_up_and_checkout_metrics(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=0,
+        pool_pre_ping=True,
+    )
+    try:
+        await warm_up_pool(engine)
+        stats = pool_stats(engine)
+        assert stats["checked_in"] == settings.DB_POOL_SIZE
+        assert stats["checked_out"] == 0
+
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+            assert pool_stats(engine)["checked_out"] == 1
+        stats = pool_stats(engine)
+        assert stats["checkouts"] == settings.DB_POOL_SIZE + 1
+        assert stats["checkout_wait_seconds_max"] > 0
+    finally:
+        await engine.dispose()
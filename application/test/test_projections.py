@@ -0,0 +1,130 @@
+import datetime
+import random
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from core.date_utils import DateUtils
+from repositories.ticket_repository import (
+    project_reply,
+    project_ticket,
+    project_ticket_summary,
+)
+from schemas.reply_schema import ReplySchema
+from schemas.ticket_schema import TicketPageSchema, TicketSchema, TicketSummarySchema
+
+START = datetime.datetime(1999, 12, 31, 23, 59, 58)
+
+
+def sample_datetimes(count: int = 500):
+    rng = random.Random(16)
+    yield datetime.datetime(2024, 2, 29, 0, 0, 0, 999999)
+    yield datetime.datetime(9, 1, 2, 3, 4, 5)
+    for _ in range(count):
+        yield START + datetime.timedelta(seconds=rng.randrange(0, 10**9) / 7)
+
+
+def test_format_full_datetime_matches_strftime():
+    for value in list(sample_datetimes()) + [None, "", "20240101 00:00:00"]:
+        assert DateUtils.format_full_datetime(value) == (
+            DateUtils.full_datetime_to_str(value)
+        )
+
+
+async def render(response_model, content, response_class) -> bytes:
+    field = create_response_field(name="response", type_=response_model)
+    content = await serialize_response(field=field, response_content=content)
+    return response_class(content).body
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("response_class", [JSONResponse, ORJSONResponse])
+async def test_ticket_projection_is_byte_identical(response_class):
+    rows = [
+        SimpleNamespace(
+            id=index,
+            title=f"Tïcket \"{index}\"",
+            description="line\nbreak " * index,
+            created_date=created,
+            user_name=f"user_{index % 3}",
+            reply_count=index % 4,
+            last_reply_at=created if index % 4 else None,
+            last_reply_by=f"user_{index % 5}" if index % 4 else None,
+            last_activity_at=created,
+        )
+        for index, created in enumerate(sample_datetimes(100))
+    ]
+    schema_page = {
+        "data": [
+            TicketSummarySchema(
+                ticketId=row.id,
+                title=row.title,
+                description=row.description,
+                createdBy=row.user_name,
+                createdDate=DateUtils.full_datetime_to_str(row.created_date),
+                replyCount=row.reply_count,
+                lastReplyDate=(
+                    DateUtils.full_datetime_to_str(row.last_reply_at)
+                    if row.last_reply_at
+                    else None
+                ),
+                lastReplyBy=row.last_reply_by,
+                lastActivityDate=DateUtils.full_datetime_to_str(row.last_activity_at),
+            )
+            for row in rows
+        ],
+        "nextCursor": None,
+        "hasMore": False,
+    }
+    projected_page = dict(
+        schema_page, data=[project_ticket_summary(row) for row in rows]
+    )
+
+    expected = await render(TicketPageSchema, schema_page, response_class)
+    assert response_class(projected_page).body == expected
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("response_class", [JSONResponse, ORJSONResponse])
+async def test_reply_projection_is_byte_identical(response_class):
+    rows = [
+        SimpleNamespace(
+            id=index,
+            ticket_id=7,
+            content=f"reply ✓ {index}",
+            created_at=created,
+            user_name="staff",
+        )
+        for index, created in enumerate(sample_datetimes(100))
+    ]
+    schemas = [
+        ReplySchema(
+            replyId=row.id,
+            ticketId=row.ticket_id,
+            content=row.content,
+            createdBy=row.user_name,
+            createdDate=DateUtils.full_datetime_to_str(row.created_at),
+        )
+        for row in rows
+    ]
+    projected = [project_reply(row, row.ticket_id) for row in rows]
+
+    expected = await render(List[ReplySchema], schemas, response_class)
+    assert response_class(projected).body == expected
+    assert projected == [schema.model_dump() for schema in schemas]
+
+    ticket = SimpleNamespace(
+        id=7, title="t", description="d", created_date=START, user_name="owner"
+    )
+    assert project_ticket(ticket, projected) == TicketSchema(
+        ticketId=7,
+        title="t",
+        description="d",
+        createdBy="owner",
+        createdDate=DateUtils.full_datetime_to_str(START),
+        replies=schemas,
+    ).model_dump()
@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from core.query_stats import start_query_stats
+from test.conftest import engine
+
+
+def test_route_query_budgets(client, auth_headers, assert_max_queries):
+    headers = auth_headers("budgetuser")
+
+    response = client.post(
+        "/api/user/login",
+        json={"usernameOrEmail": "budgetuser", "password": "testing"},
+    )
+    assert_max_queries(response, 3)
+
+    response = client.post(
+        "/api/ticket/", headers=headers, json={"title": "Budget", "description": "B"}
+    )
+    assert response.json()["createdDate"]
+    assert_max_queries(response, 1)
+    ticket_id = response.json()["ticketId"]
+
+    response = client.post(
+        f"/api/ticket/{ticket_id}/replies/", headers=headers, json={"content": "r"}
+    )
+    assert response.json()["createdDate"]
+    # The reply insert plus the ticket version bump.
+    assert_max_queries(response, 2)
+    reply_id = response.json()["replyId"]
+
+    response = client.put(
+        f"/api/ticket/replies/{reply_id}", headers=headers, json={"content": "e"}
+    )
+    assert_max_queries(response, 3)
+
+    response = client.get("/api/tickets/", headers=headers)
+    assert_max_queries(response, 3)
+    # Revalidating an unchanged list only reads the newest ticket id.
+    response = client.get(
+        "/api/tickets/",
+        headers={**headers, "If-None-Match": response.headers["ETag"]},
+    )
+    assert response.status_code == 304
+    assert_max_queries(response, 1)
+    assert_max_queries(client.get(f"/api/ticket/{ticket_id}", headers=headers), 2)
+    # Second read is served from the thread cache.
+    response = client.get(f"/api/ticket/{ticket_id}", headers=headers)
+    assert_max_queries(response, 0)
+    response = client.get(
+        f"/api/ticket/{ticket_id}",
+        headers={**headers, "If-None-Match": response.headers["ETag"]},
+    )
+    assert response.status_code == 304
+    assert_max_queries(response, 1)
+    assert_max_queries(
+        client.get(f"/api/ticket/{ticket_id}/replies/", headers=headers), 1
+    )
+    assert_max_queries(client.delete(f"/api/replies/{reply_id}", headers=headers), 3)
+
+
+def test_failed_statement_leaves_no_start_time_behind(client):
+    async def fail_then_succeed():
+        async with engine.connect() as connection:
+            with pytest.raises(OperationalError):
+                await connection.execute(text("SELECT * FROM no_such_table"))
+            starts = (await connection.get_raw_connection()).info["query_start_time"]
+            assert starts == {}
+            stats = start_query_stats()
+            await connection.execute(text("SELECT 1"))
+            assert starts == {}
+            return stats
+
+    stats = client.portal.call(fail_then_succeed)
+    assert stats.count == 1
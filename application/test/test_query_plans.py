@@ -0,0 +1,201 @@
+import re
+
+from sqlalchemy import event
+
+from test.conftest import engine
+
+PLAN_STEP = re.compile(r"^(SCAN|SEARCH) (\w+)")
+INDEXED_TABLES = {"tickets", "replies", "tokens", "accounts"}
+
+
+def _plan(statement, parameters):
+    async def _explain():
+        async with engine.connect() as connection:
+            result = await connection.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            )
+            return [row[-1] for row in result.all()]
+
+    return _explain
+
+
+def _table_steps(client, make_request) -> list:
+    """Plan steps on INDEXED_TABLES of every SELECT the request issues."""
+    statements = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _capture)
+    try:
+        response = make_request()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _capture)
+    assert response.status_code == 200, response.text
+    steps = []
+    for statement, parameters in statements:
+        for step in client.portal.call(_plan(statement, parameters)):
+            match = PLAN_STEP.match(step)
+            if match and match.group(2) in INDEXED_TABLES:
+                steps.append(step)
+    return steps
+
+
+def test_repository_queries_use_indexes(client, auth_headers):
+    headers = auth_headers("planuser")
+    staff_headers = auth_headers("planstaff", staff=True)
+    ticket_ids = [
+        client.post(
+            "/api/ticket/", headers=headers, json={"title": "Plan", "description": "x"}
+        ).json()["ticketId"]
+        for _ in range(2)
+    ]
+    ticket_id = ticket_ids[-1]
+    for content in ("first", "second"):
+        client.post(
+            f"/api/ticket/{ticket_id}/replies/",
+            headers=headers,
+            json={"content": content},
+        )
+    login = client.post(
+        "/api/user/login",
+        json={"usernameOrEmail": "planuser", "password": "testing"},
+    ).json()
+
+    def tickets(headers, **params):
+        return lambda: client.get(
+            "/api/tickets/", headers=headers, params=dict(params, total="none")
+        )
+
+    def cursor(headers, **params):
+        first = tickets(headers, pageSize=1, **params)().json()
+        return first["nextCursor"]
+
+    replies_url = f"/api/ticket/{ticket_id}/replies/"
+    reply_cursor = client.get(
+        replies_url, headers=headers, params={"limit": 1}
+    ).json()["nextCursor"]
+
+    # (request, plan steps it must contain, full scans it may contain). Any
+    # other step on an indexed table has to be a SEARCH.
+    cases = [
+        (
+            lambda: client.post(
+                "/api/user/login",
+                json={"usernameOrEmail": "planuser", "password": "testing"},
+            ),
+            [
+                "SEARCH accounts USING INDEX ix_accounts_user_name (user_name=?)",
+                "SEARCH accounts USING INDEX ix_accounts_email (email=?)",
+            ],
+            [],
+        ),
+        (
+            lambda: client.post(
+                "/api/user/refresh_token/",
+                params={"_refresh_token": login["refreshToken"]},
+            ),
+            ["SEARCH tokens USING INDEX ix_tokens_token_hash (token_hash=?)"],
+            [],
+        ),
+        (
+            lambda: client.post(
+                "/api/tickets/batch", headers=headers, json={"ticketIds": ticket_ids}
+            ),
+            [
+                "SEARCH tickets USING INTEGER PRIMARY KEY (rowid=?)",
+                "SEARCH replies USING INDEX ix_replies_ticket_id_created_at "
+                "(ticket_id=?)",
+            ],
+            [],
+        ),
+        (
+            lambda: client.get(replies_url, headers=headers),
+            [
+                "SEARCH replies USING INDEX ix_replies_ticket_id_created_at "
+                "(ticket_id=?)"
+            ],
+            [],
+        ),
+        (
+            lambda: client.get(
+                replies_url,
+                headers=headers,
+                params={"limit": 1, "cursor": reply_cursor},
+            ),
+            [
+                "SEARCH replies USING INDEX ix_replies_ticket_id_created_at "
+                "(ticket_id=? AND created_at<?)"
+            ],
+            [],
+        ),
+        (
+            tickets(headers),
+            [
+                "SEARCH tickets USING INDEX ix_tickets_created_by_id_created_date_id "
+                "(created_by_id=?)"
+            ],
+            [],
+        ),
+        (
+            tickets(headers, cursor=cursor(headers)),
+            [
+                "SEARCH tickets USING INDEX ix_tickets_created_by_id_created_date_id "
+                "(created_by_id=? AND created_date<?)"
+            ],
+            [],
+        ),
+        (
+            tickets(headers, sort="activity", cursor=cursor(headers, sort="activity")),
+            [
+                "SEARCH tickets USING INDEX "
+                "ix_tickets_created_by_id_last_activity_at_id "
+                "(created_by_id=? AND last_activity_at<?)"
+            ],
+            [],
+        ),
+        (
+            tickets(staff_headers, cursor=cursor(staff_headers)),
+            [
+                "SEARCH tickets USING COVERING INDEX ix_tickets_id",
+                "SEARCH tickets USING COVERING INDEX ix_tickets_updated_at",
+                "SEARCH tickets USING INDEX ix_tickets_created_date_id "
+                "(created_date<?)",
+            ],
+            [],
+        ),
+        (
+            tickets(
+                staff_headers,
+                sort="activity",
+                cursor=cursor(staff_headers, sort="activity"),
+            ),
+            [
+                "SEARCH tickets USING INDEX ix_tickets_last_activity_at_id "
+                "(last_activity_at<?)"
+            ],
+            [],
+        ),
+        # The first staff page reads the newest end of the index in order
+        # and stops after pageSize + 1 rows.
+        (
+            tickets(staff_headers),
+            [],
+            ["SCAN tickets USING INDEX ix_tickets_created_date_id"],
+        ),
+        (
+            tickets(staff_headers, sort="activity"),
+            [],
+            ["SCAN tickets USING INDEX ix_tickets_last_activity_at_id"],
+        ),
+    ]
+
+    for make_request, expected, scans in cases:
+        steps = _table_steps(client, make_request)
+        for step in expected:
+            assert step in steps, f"{step!r} not in {steps}"
+        for step in steps:
+            assert step.startswith("SEARCH") or step in scans, f"{step!r}"
+        for scan in scans:
+            assert scan in steps, f"{scan!r} not in {steps}"
@@ -0,0 +1,104 @@
+import datetime
+
+from core.search import InMemorySearchIndex, search_index
+from repositories.ticket_repository import TicketRepository
+from test.conftest import SessionTesting
+
+
+def test_index_ranks_title_matches_and_removes_text():
+    index = InMemorySearchIndex()
+    index.add_ticket(1, 10, "Printer offline", "It will not print.")
+    index.add_ticket(2, 10, "Login issue", "The printer in the lobby is fine.")
+    index.add_ticket(3, 20, "Other", "Nothing relevant.")
+
+    results, total = index.search("printer")
+    assert total == 2
+    assert [ticket_id for ticket_id, _ in results] == [1, 2]
+
+    index.add_text(3, "printer printer printer")
+    assert index.search("printer", owner_id=20)[0][0][0] == 3
+    index.remove_text(3, "printer printer printer")
+    assert index.search("printer", owner_id=20) == ([], 0)
+
+
+def _search(client, headers, query, **params):
+    response = client.get(
+        "/api/tickets/search", headers=headers, params={"q": query, **params}
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_search_tickets(client, auth_headers):
+    headers = auth_headers("searchuser")
+    other_headers = auth_headers("searchother")
+    staff_headers = auth_headers("searchstaff", staff=True)
+
+    def create(headers, title, description):
+        return client.post(
+            "/api/ticket/",
+            headers=headers,
+            json={"title": title, "description": description},
+        ).json()["ticketId"]
+
+    strong = create(headers, "Zebracorn printer jam", "zebracorn stuck in tray")
+    weak = create(headers, "Paper tray", "the zebracorn sticker peeled off")
+    foreign = create(other_headers, "Zebracorn too", "someone else's ticket")
+
+    body = _search(client, headers, "zebracorn")
+    ids = [ticket["ticketId"] for ticket in body["data"]]
+    assert ids == [strong, weak]
+    assert body["total"] == 2
+    assert body["data"][0]["score"] > body["data"][1]["score"]
+    assert body["data"][0]["createdBy"] == "searchuser"
+
+    staff_body = _search(client, staff_headers, "zebracorn")
+    staff_ids = [ticket["ticketId"] for ticket in staff_body["data"]]
+    assert foreign in staff_ids and strong in staff_ids
+
+    first = _search(client, headers, "zebracorn", pageSize=1)
+    second = _search(client, headers, "zebracorn", page=1, pageSize=1)
+    assert first["hasMore"] and not second["hasMore"]
+    assert [first["data"][0]["ticketId"], second["data"][0]["ticketId"]] == ids
+
+    # Reply writes keep the index current.
+    reply = client.post(
+        f"/api/ticket/{weak}/replies/", headers=headers, json={"content": "quokkafy"}
+    ).json()
+    assert [t["ticketId"] for t in _search(client, headers, "quokkafy")["data"]] == [
+        weak
+    ]
+    client.put(
+        f"/api/ticket/replies/{reply['replyId']}",
+        headers=headers,
+        json={"content": "wombatize"},
+    )
+    assert _search(client, headers, "quokkafy")["total"] == 0
+    assert _search(client, headers, "wombatize")["total"] == 1
+    client.delete(f"/api/replies/{reply['replyId']}", headers=headers)
+    assert _search(client, headers, "wombatize")["total"] == 0
+
+
+def test_search_requires_a_query(client, auth_headers):
+    headers = auth_headers("searchuser")
+    response = client.get("/api/tickets/search", headers=headers, params={"q": ""})
+    assert response.status_code == 422
+
+
+def test_bulk_inserted_tickets_are_indexed(client):
+    row = {
+        "title": "Kangarootle",
+        "description": "bulk",
+        "created_by_id": 1,
+        "created_date": datetime.datetime(2024, 1, 1),
+    }
+
+    async def insert(rows):
+        async with SessionTesting() as session:
+            return await TicketRepository(session).insert_tickets(rows)
+
+    client.portal.call(insert, [row, row])
+    assert search_index.search("kangarootle")[1] == 2
+    # The per-row retry path indexes the rows that made it in.
+    client.portal.call(insert, [row, dict(row, title=None)])
+    assert search_index.search("kangarootle")[1] == 3
@@ -0,0 +1,37 @@
+from core.slow_query import fingerprint, slow_query_log
+
+
+def test_fingerprint_strips_literals():
+    assert fingerprint(
+        "SELECT * FROM tickets WHERE id IN (%s, %s, %s) AND title = 'a''b'\n LIMIT 10"
+    ) == "SELECT * FROM tickets WHERE id IN (...) AND title = ? LIMIT ?"
+    assert fingerprint("SELECT count_1 FROM t WHERE a = :a_1") == (
+        "SELECT count_1 FROM t WHERE a = ?"
+    )
+
+
+def test_slow_queries_are_aggregated_for_staff(client, auth_headers):
+    headers = auth_headers("slowuser")
+    staff_headers = auth_headers("slowstaff", staff=True)
+    threshold = slow_query_log.threshold
+    slow_query_log.clear()
+    slow_query_log.threshold = 0
+    try:
+        response = client.get(
+            "/api/tickets/", headers={**headers, "X-Request-ID": "req-slow-1"}
+        )
+        assert response.headers["X-Request-ID"] == "req-slow-1"
+    finally:
+        slow_query_log.threshold = threshold
+
+    assert client.get("/api/staff/slowQueries", headers=headers).status_code == 403
+    data = client.get("/api/staff/slowQueries", headers=staff_headers).json()["data"]
+    listing = [item for item in data if "ORDER BY" in item["fingerprint"]]
+    assert listing[0]["origins"] == ["TicketRepository.get_tickets"]
+    assert listing[0]["last_request_id"] == "req-slow-1"
+    assert len(data) > 1
+
+    url = "/api/staff/slowQueries"
+    for limit, expected in ((-1, 1), (0, 1), (1, 1), (10**9, len(data))):
+        response = client.get(url, headers=staff_headers, params={"limit": limit})
+        assert len(response.json()["data"]) == expected
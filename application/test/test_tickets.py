@@ -0,0 +1,501 @@
+import typing
+
+import pytest
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import ValidationError
+from sqlalchemy import update
+
+from core.auth_bearer import decode_jwt
+from core.responses import default_response_class
+from core.settings import Settings, settings
+from db.tables.ticket import Ticket
+from repositories.ticket_repository import (
+    TicketRepository,
+    expire_thread,
+    thread_version_key,
+    ticket_cache,
+)
+from schemas.reply_schema import ReplyCreateSchema
+from schemas.ticket_schema import TicketDetailSchema, TotalStrategy
+from test.conftest import SessionTesting
+
+
+def test_get_tickets_cursor_pagination(client, auth_headers):
+    headers = auth_headers("pageuser")
+    for i in range(5):
+        client.post(
+            "/api/ticket/",
+            headers=headers,
+            json={"title": f"Page {i}", "description": "paging"},
+        )
+
+    offset_ids = []
+    for page in range(3):
+        response = client.get(
+            "/api/tickets/", headers=headers, params={"page": page, "pageSize": 2}
+        )
+        offset_ids += [t["ticketId"] for t in response.json()["data"]]
+
+    cursor_ids, cursor = [], None
+    while True:
+        params = {"pageSize": 2}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/api/tickets/", headers=headers, params=params).json()
+        cursor_ids += [t["ticketId"] for t in body["data"]]
+        cursor = body["nextCursor"]
+        if not cursor:
+            break
+
+    assert len(cursor_ids) == 5
+    assert cursor_ids == offset_ids
+    assert cursor_ids == sorted(cursor_ids, reverse=True)
+
+
+def test_get_tickets_invalid_cursor(client, auth_headers):
+    headers = auth_headers("pageuser")
+    response = client.get(
+        "/api/tickets/", headers=headers, params={"cursor": "not-a-cursor"}
+    )
+    assert response.status_code == 400
+
+
+def test_get_tickets_clamps_page_and_page_size(client, auth_headers, monkeypatch):
+    headers = auth_headers("clampuser")
+    for i in range(3):
+        client.post(
+            "/api/ticket/", headers=headers, json={"title": f"C{i}", "description": "c"}
+        )
+
+    def ids(**params):
+        response = client.get("/api/tickets/", headers=headers, params=params)
+        assert response.status_code == 200
+        return [t["ticketId"] for t in response.json()["data"]]
+
+    newest = ids(pageSize=3)
+    assert ids(pageSize=0) == ids(pageSize=-1) == newest[:1]
+    assert ids(page=-1, pageSize=2) == newest[:2]
+    monkeypatch.setattr(settings, "TICKET_PAGE_MAX", 2)
+    assert ids(pageSize=10**6) == newest[:2]
+
+
+def test_get_tickets_total_strategies(client, auth_headers):
+    headers = auth_headers("countuser")
+    staff_headers = auth_headers("countstaff", staff=True)
+    client.post(
+        "/api/ticket/", headers=headers, json={"title": "One", "description": "1"}
+    )
+
+    cached = client.get("/api/tickets/", headers=headers, params={"total": "cached"})
+    assert cached.json()["total"] == 1
+    client.post(
+        "/api/ticket/", headers=headers, json={"title": "Two", "description": "2"}
+    )
+    cached = client.get("/api/tickets/", headers=headers, params={"total": "cached"})
+    exact = client.get("/api/tickets/", headers=headers, params={"total": "exact"})
+    assert cached.json()["total"] == exact.json()["total"] == 2
+
+    estimate = client.get(
+        "/api/tickets/", headers=staff_headers, params={"total": "estimate"}
+    )
+    assert estimate.json()["total"] >= 2
+
+    none = client.get(
+        "/api/tickets/", headers=headers, params={"total": "none", "pageSize": 1}
+    ).json()
+    assert "total" not in none
+    assert none["hasMore"] is True
+
+
+def test_ticket_total_strategy_setting_is_validated(monkeypatch):
+    field = Settings.model_fields["TICKET_TOTAL_STRATEGY"]
+    assert set(typing.get_args(field.annotation)) == {s.value for s in TotalStrategy}
+    monkeypatch.setenv("TICKET_TOTAL_STRATEGY", "exactt")
+    with pytest.raises(ValidationError):
+        Settings()
+
+
+def test_ticket_details_cache_invalidated_by_reply_writes(client, auth_headers):
+    headers = auth_headers("threaduser")
+    other_headers = auth_headers("threadother")
+    ticket = client.post(
+        "/api/ticket/",
+        headers=headers,
+        json={"title": "Thread", "description": "Cached thread"},
+    ).json()
+    url = f"/api/ticket/{ticket['ticketId']}"
+
+    first = client.get(url, headers=headers).json()
+    assert first["description"] == "Cached thread"
+    assert first["replies"] == []
+    assert client.get(url, headers=headers).json() == first
+    # Served from the cache, but still only to the owner and staff.
+    assert client.get(url, headers=other_headers).status_code == 403
+    staff_headers = auth_headers("threadstaff", staff=True)
+    assert client.get(url, headers=staff_headers).json() == first
+    etag = client.get(url, headers=headers).headers["ETag"]
+    revalidated = client.get(url, headers={**staff_headers, "If-None-Match": etag})
+    assert revalidated.status_code == 304
+    other_revalidation = client.get(
+        url, headers={**other_headers, "If-None-Match": etag}
+    )
+    assert other_revalidation.status_code == 403
+
+    reply = client.post(
+        f"{url}/replies/", headers=headers, json={"content": "first"}
+    ).json()
+    replies = client.get(url, headers=headers).json()["replies"]
+    assert [r["content"] for r in replies] == ["first"]
+    client.put(
+        f"/api/ticket/replies/{reply['replyId']}",
+        headers=headers,
+        json={"content": "edited"},
+    )
+    assert client.get(url, headers=headers).json()["replies"][0]["content"] == "edited"
+    client.delete(f"/api/replies/{reply['replyId']}", headers=headers)
+    assert client.get(url, headers=headers).json()["replies"] == []
+
+    assert client.get("/api/ticket/999999", headers=headers).status_code == 404
+
+
+def test_ticket_detail_body_matches_its_response_model(client, auth_headers):
+    headers = auth_headers("detailshape")
+    ticket_id = client.post(
+        "/api/ticket/", headers=headers, json={"title": "Shape", "description": "s"}
+    ).json()["ticketId"]
+    for content in ("one", "two"):
+        client.post(
+            f"/api/ticket/{ticket_id}/replies/",
+            headers=headers,
+            json={"content": content},
+        )
+    url = f"/api/ticket/{ticket_id}"
+
+    for params in ({}, {}, {"repliesLimit": 1}, {"repliesLimit": 5}):
+        response = client.get(url, headers=headers, params=params)
+        body = response.json()
+        assert body == TicketDetailSchema(**body).model_dump()
+        assert response.headers["ETag"]
+        assert response.headers["Last-Modified"]
+        assert response.headers["Cache-Control"] == "private, no-cache"
+
+
+def test_reply_to_a_missing_ticket_is_not_found(client, auth_headers):
+    headers = auth_headers("missingthread")
+    url = "/api/ticket/424242"
+
+    response = client.post(f"{url}/replies/", headers=headers, json={"content": "x"})
+    assert response.status_code == 404
+    assert client.get(url, headers=headers).status_code == 404
+    staff = auth_headers("missingstaff", staff=True)
+    assert client.get(f"{url}/replies/", headers=staff).status_code == 404
+
+
+def test_thread_loaded_before_a_reply_write_is_not_served(client, auth_headers):
+    headers = auth_headers("raceuser")
+    ticket_id = client.post(
+        "/api/ticket/", headers=headers, json={"title": "Race", "description": "r"}
+    ).json()["ticketId"]
+    account_id = int(decode_jwt(headers["Authorization"].split()[1])["sub"])
+
+    async def load_then_reply():
+        async with SessionTesting() as reader_session:
+            reader = TicketRepository(reader_session)
+            load_threads = reader._load_threads
+
+            async def _load_threads(ticket_ids):
+                # The reply commits after this reader loaded the thread and
+                # before it stores it.
+                threads = await load_threads(ticket_ids)
+                async with SessionTesting() as writer_session:
+                    await TicketRepository(writer_session).create_reply(
+                        ticket_id, ReplyCreateSchema(content="late"), account_id
+                    )
+                return threads
+
+            reader._load_threads = _load_threads
+            stale, _ = await reader.get_ticket_details(ticket_id)
+            return stale
+
+    stale = client.portal.call(load_then_reply)
+    assert stale["replies"] == []
+    url = f"/api/ticket/{ticket_id}"
+    replies = client.get(url, headers=headers).json()["replies"]
+    assert [r["content"] for r in replies] == ["late"]
+    batch = client.post(
+        "/api/tickets/batch", headers=headers, json={"ticketIds": [ticket_id]}
+    ).json()
+    assert [r["content"] for r in batch["data"][str(ticket_id)]["replies"]] == ["late"]
+
+
+def test_unreadable_thread_version_marker_is_a_cache_miss(client, auth_headers):
+    headers = auth_headers("markeruser")
+    ticket_id = client.post(
+        "/api/ticket/", headers=headers, json={"title": "Marker", "description": "m"}
+    ).json()["ticketId"]
+    url = f"/api/ticket/{ticket_id}"
+    client.get(url, headers=headers)
+
+    client.portal.call(ticket_cache.set, thread_version_key(ticket_id), "None")
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["title"] == "Marker"
+    assert client.portal.call(ticket_cache.get, thread_version_key(ticket_id)) is None
+    batch = client.post(
+        "/api/tickets/batch", headers=headers, json={"ticketIds": [ticket_id]}
+    )
+    assert batch.status_code == 200
+
+    with pytest.raises(TypeError):
+        client.portal.call(expire_thread, ticket_id, None)
+
+
+def test_orjson_is_the_default_response_class():
+    assert default_response_class() is ORJSONResponse
+    previous = settings.JSON_RESPONSE
+    settings.JSON_RESPONSE = "json"
+    try:
+        assert default_response_class() is JSONResponse
+    finally:
+        settings.JSON_RESPONSE = previous
+
+
+def test_get_ticket_details_batch(client, auth_headers, assert_max_queries):
+    headers = auth_headers("batchuser")
+    other_headers = auth_headers("batchother")
+    staff_headers = auth_headers("batchstaff", staff=True)
+    own = [
+        client.post(
+            "/api/ticket/", headers=headers, json={"title": f"B{i}", "description": "b"}
+        ).json()["ticketId"]
+        for i in range(3)
+    ]
+    other = client.post(
+        "/api/ticket/", headers=other_headers, json={"title": "O", "description": "o"}
+    ).json()["ticketId"]
+    for ticket_id in own[:2]:
+        client.post(
+            f"/api/ticket/{ticket_id}/replies/", headers=headers, json={"content": "r"}
+        )
+
+    ids = own + [other, 999999]
+    response = client.post(
+        "/api/tickets/batch", headers=headers, json={"ticketIds": ids}
+    )
+    assert_max_queries(response, 2)
+    body = response.json()
+    assert sorted(body["data"]) == sorted(str(i) for i in own)
+    assert body["data"][str(own[0])]["replies"][0]["content"] == "r"
+    assert body["data"][str(own[2])]["replies"] == []
+    assert body["errors"][str(other)]["status"] == 403
+    assert body["errors"]["999999"]["status"] == 404
+    # Same threads as the single-ticket endpoint, now from the cache.
+    single = client.get(f"/api/ticket/{own[0]}", headers=headers)
+    assert_max_queries(single, 0)
+    assert single.json() == body["data"][str(own[0])]
+
+    staff = client.post(
+        "/api/tickets/batch", headers=staff_headers, json={"ticketIds": ids}
+    ).json()
+    assert str(other) in staff["data"]
+    assert list(staff["errors"]) == ["999999"]
+
+
+def test_reply_cursor_pagination_and_replies_limit(client, auth_headers):
+    headers = auth_headers("threaduser")
+    ticket_id = client.post(
+        "/api/ticket/", headers=headers, json={"title": "Long", "description": "l"}
+    ).json()["ticketId"]
+    for i in range(5):
+        client.post(
+            f"/api/ticket/{ticket_id}/replies/",
+            headers=headers,
+            json={"content": f"reply {i}"},
+        )
+    url = f"/api/ticket/{ticket_id}/replies/"
+
+    contents, cursor = [], None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get(url, headers=headers, params=params).json()
+        assert len(page["data"]) <= 2
+        contents += [reply["content"] for reply in page["data"]]
+        cursor = page["nextCursor"]
+        assert page["hasMore"] is bool(cursor)
+        if not cursor:
+            break
+    assert contents == [f"reply {i}" for i in reversed(range(5))]
+    assert client.get(url, headers=headers, params={"cursor": "x"}).status_code == 400
+
+    detail = client.get(
+        f"/api/ticket/{ticket_id}", headers=headers, params={"repliesLimit": 2}
+    ).json()
+    assert [reply["content"] for reply in detail["replies"]] == ["reply 4", "reply 3"]
+    rest = client.get(
+        url, headers=headers, params={"cursor": detail["repliesNextCursor"]}
+    ).json()
+    assert [reply["content"] for reply in rest["data"]] == [
+        "reply 2",
+        "reply 1",
+        "reply 0",
+    ]
+    full = client.get(f"/api/ticket/{ticket_id}", headers=headers).json()
+    assert "repliesNextCursor" not in full
+    assert len(full["replies"]) == 5
+
+
+def test_replies_without_paging_params_keep_the_legacy_list(client, auth_headers):
+    headers = auth_headers("legacyreplies")
+    ticket_id = client.post(
+        "/api/ticket/", headers=headers, json={"title": "Old", "description": "o"}
+    ).json()["ticketId"]
+    for i in range(3):
+        client.post(
+            f"/api/ticket/{ticket_id}/replies/",
+            headers=headers,
+            json={"content": f"reply {i}"},
+        )
+    url = f"/api/ticket/{ticket_id}/replies/"
+
+    replies = client.get(url, headers=headers).json()
+    assert isinstance(replies, list)
+    assert [reply["content"] for reply in replies] == ["reply 0", "reply 1", "reply 2"]
+    assert {reply["ticketId"] for reply in replies} == {ticket_id}
+
+    page = client.get(url, headers=headers, params={"limit": 1}).json()
+    assert [reply["content"] for reply in page["data"]] == ["reply 2"]
+    assert page["hasMore"] is True
+
+
+def test_replies_require_ticket_access(client, auth_headers):
+    owner = auth_headers("repliesowner")
+    ticket_id = client.post(
+        "/api/ticket/", headers=owner, json={"title": "Mine", "description": "m"}
+    ).json()["ticketId"]
+    client.post(
+        f"/api/ticket/{ticket_id}/replies/", headers=owner, json={"content": "secret"}
+    )
+    url = f"/api/ticket/{ticket_id}/replies/"
+
+    other = auth_headers("repliesother")
+    assert client.get(url, headers=other).status_code == 403
+    assert client.get(url, headers=other, params={"limit": 1}).status_code == 403
+    staff = auth_headers("repliesstaff", staff=True)
+    assert client.get(url, headers=staff).status_code == 200
+    assert client.get("/api/ticket/999999/replies/", headers=owner).status_code == 404
+
+
+def test_conditional_get_of_ticket_and_list(client, auth_headers):
+    headers = auth_headers("etaguser")
+    ticket_id = client.post(
+        "/api/ticket/", headers=headers, json={"title": "ETag", "description": "e"}
+    ).json()["ticketId"]
+    url = f"/api/ticket/{ticket_id}"
+
+    def get(url, params=None, **conditions):
+        return client.get(url, headers={**headers, **conditions}, params=params)
+
+    first = get(url)
+    etag = first.headers["ETag"]
+    assert first.headers["Last-Modified"]
+    assert get(url, **{"If-None-Match": etag}).status_code == 304
+    assert get(url, **{"If-None-Match": f"W/{etag}, \"other\""}).status_code == 304
+    assert (
+        get(url, **{"If-Modified-Since": first.headers["Last-Modified"]}).status_code
+        == 304
+    )
+    assert get(url, params={"repliesLimit": 1}).headers["ETag"] != etag
+
+    # A reply write bumps the ticket's version, and with it the ETag.
+    client.post(f"{url}/replies/", headers=headers, json={"content": "new"})
+    changed = get(url, **{"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert [reply["content"] for reply in changed.json()["replies"]] == ["new"]
+
+    other = auth_headers("etagother")
+    response = client.get(url, headers={**other, "If-None-Match": etag})
+    assert response.status_code == 403
+
+    list_etag = get("/api/tickets/").headers["ETag"]
+    assert get("/api/tickets/", **{"If-None-Match": list_etag}).status_code == 304
+    client.post(
+        "/api/ticket/", headers=headers, json={"title": "More", "description": "m"}
+    )
+    assert get("/api/tickets/", **{"If-None-Match": list_etag}).status_code == 200
+
+
+def test_activity_summary_sort_and_repair(client, auth_headers):
+    headers = auth_headers("activityuser")
+    staff_headers = auth_headers("activitystaff", staff=True)
+    first, second, third = [
+        client.post(
+            "/api/ticket/", headers=headers, json={"title": title, "description": "a"}
+        ).json()["ticketId"]
+        for title in ("First", "Second", "Third")
+    ]
+    client.post(
+        f"/api/ticket/{first}/replies/", headers=staff_headers, json={"content": "s"}
+    )
+    reply_id = client.post(
+        f"/api/ticket/{first}/replies/", headers=headers, json={"content": "u"}
+    ).json()["replyId"]
+
+    def listing(**params):
+        response = client.get("/api/tickets/", headers=headers, params=params)
+        return response, {t["ticketId"]: t for t in response.json()["data"]}
+
+    response, tickets = listing(sort="activity")
+    assert list(tickets) == [first, third, second]
+    assert tickets[first]["replyCount"] == 2
+    assert tickets[first]["lastReplyBy"] == "activityuser"
+    assert tickets[first]["lastActivityDate"] == tickets[first]["lastReplyDate"]
+    assert tickets[second]["replyCount"] == 0
+    assert tickets[second]["lastReplyDate"] is None
+    assert tickets[second]["lastActivityDate"] == tickets[second]["createdDate"]
+    assert list(listing()[1]) == [third, second, first]
+
+    # Keyset pages follow the activity order too.
+    seen, cursor = [], None
+    while True:
+        params = {"sort": "activity", "pageSize": 1}
+        if cursor:
+            params["cursor"] = cursor
+        page = listing(**params)[0].json()
+        seen += [ticket["ticketId"] for ticket in page["data"]]
+        if not page["hasMore"]:
+            break
+        cursor = page["nextCursor"]
+    assert seen == [first, third, second]
+
+    # Deleting the newest reply falls back to the one before, and the list's
+    # ETag moves with it.
+    etag = response.headers["ETag"]
+    client.delete(f"/api/replies/{reply_id}", headers=headers)
+    response, tickets = listing(sort="activity")
+    assert response.headers["ETag"] != etag
+    assert tickets[first]["replyCount"] == 1
+    assert tickets[first]["lastReplyBy"] == "activitystaff"
+
+    async def drift_and_repair():
+        async with SessionTesting() as session:
+            await session.execute(
+                update(Ticket)
+                .where(Ticket.id.in_([first, second]))
+                .values(reply_count=5, last_reply_at=None, last_reply_by_id=None)
+            )
+            await session.commit()
+            repository = TicketRepository(session)
+            repaired = await repository.repair_ticket_activity(batch_size=2)
+            again = await repository.repair_ticket_activity(dry_run=True)
+            return repaired, again
+
+    repaired, again = client.portal.call(drift_and_repair)
+    assert repaired["drifted"] == repaired["repaired"] == 2
+    assert again["checked"] == repaired["checked"] and again["drifted"] == 0
+    tickets = listing(sort="activity")[1]
+    assert tickets[first]["replyCount"] == 1
+    assert tickets[first]["lastReplyBy"] == "activitystaff"
+    assert tickets[second]["replyCount"] == 0